@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from db.database import get_db
+from db.models import Itinerary, ItineraryJob
+from schemas.itinerary import ItineraryJobResponse, ItineraryResponse
+from services.job_runner import JOB_FAILED, JOB_SUCCEEDED
+
+router = APIRouter()
+
+
+def _job_response(job: ItineraryJob) -> ItineraryJobResponse:
+    return ItineraryJobResponse(
+        jobId=job.job_id,
+        sessionId=job.session_id,
+        status=job.status,
+        stage=job.stage,
+        error=job.error,
+        createdAt=job.created_at,
+        updatedAt=job.updated_at,
+    )
+
+
+@router.get("/itinerary-jobs/{job_id}", response_model=ItineraryJobResponse)
+async def get_itinerary_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Poll the progress of a queued itinerary job."""
+    job = await db.get(ItineraryJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Itinerary job not found")
+    return _job_response(job)
+
+
+@router.get("/itinerary/{session_id}", response_model=ItineraryResponse)
+async def get_itinerary(session_id: str, db: AsyncSession = Depends(get_db)):
+    """Return the generated itinerary for a session.
+
+    Responds 202 with the latest job status while the itinerary is still
+    being generated, 200 with status "failed" and the error if its job
+    failed, and 404 if nothing was ever requested for the session.
+    """
+    stmt = (
+        select(ItineraryJob)
+        .where(ItineraryJob.session_id == session_id)
+        .order_by(ItineraryJob.created_at.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    job = result.scalar_one_or_none()
+
+    if job is None or job.status == JOB_SUCCEEDED:
+        itinerary = await db.get(Itinerary, session_id)
+        if itinerary:
+            return ItineraryResponse(
+                sessionId=session_id,
+                status=JOB_SUCCEEDED,
+                itinerary=itinerary.itinerary,
+                jobId=job.job_id if job else None,
+            )
+        if job is None:
+            raise HTTPException(status_code=404, detail="Trip plan not found")
+
+    if job.status == JOB_FAILED:
+        return ItineraryResponse(
+            sessionId=session_id, status=JOB_FAILED, jobId=job.job_id, error=job.error
+        )
+
+    body = ItineraryResponse(sessionId=session_id, status=job.status, jobId=job.job_id)
+    return JSONResponse(status_code=202, content=body.model_dump())
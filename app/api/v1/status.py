@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from db.database import pool_stats
+from services.rate_limiter import rate_limit_stats
+from services.resilience import provider_stats
+
+router = APIRouter()
+
+
+@router.get("/providers/status")
+async def get_providers_status():
+    """Circuit breaker state and rate limiter queues for each upstream provider."""
+    return {"circuits": provider_stats(), "rate_limits": rate_limit_stats()}
+
+
+@router.get("/db/status")
+async def get_db_status():
+    """Connection pool usage and checkout wait times for this process."""
+    return {"pool": pool_stats()}
@@ -1,16 +1,54 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from core.cors import add_cors
 from app.api.v1.chat import router as chat_router
+from app.api.v1.itinerary import router as itinerary_router
+from app.api.v1.status import router as status_router
+from services.itinerary_archive import itinerary_archive
+from services.job_runner import job_runner
+from services.pdf_renderer import pdf_renderer
+from services.provider_client import close_provider_client
+from services.speculation import speculative_prefetch
+from services.llm_client import init_llm_client, close_llm_client
+from services.metrics import MetricsMiddleware, registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_llm_client()
+    pdf_renderer.start()
+    await job_runner.start()
+    yield
+    await speculative_prefetch.stop()
+    await job_runner.stop()
+    await itinerary_archive.stop()
+    pdf_renderer.stop()
+    await close_provider_client()
+    await close_llm_client()
 
-app = FastAPI(title="ZoomZoot Travel Planner API")
+
+app = FastAPI(title="ZoomZoot Travel Planner API", lifespan=lifespan)
 
 # Add CORS middleware
 add_cors(app)
+app.add_middleware(MetricsMiddleware)
 
 # Include API routes
 app.include_router(chat_router, prefix="/api/v1")
+app.include_router(itinerary_router, prefix="/api/v1")
+app.include_router(status_router, prefix="/api/v1")
 
 
 @app.get("/")
 async def root():
     return {"message": "ZoomZoot Travel Planner API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of stage latencies, caches and pools."""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
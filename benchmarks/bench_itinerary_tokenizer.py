@@ -0,0 +1,244 @@
+"""Micro-benchmark: `tokenize_itinerary` vs the previous line classifier.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_itinerary_tokenizer [--repeat N] [--scale N]
+
+Each file in summaries/ is parsed `--repeat` times with both parsers; the
+previous implementation (regexes compiled per call, look-back duplicate
+scans) is kept verbatim below as the baseline. `--scale` concatenates each
+sample with itself to approximate a long multi-week itinerary.
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from utils.itinerary_tokenizer import tokenize_itinerary
+
+SUMMARIES_DIR = Path(__file__).resolve().parent.parent / "summaries"
+
+
+# --- baseline: previous services.pdf_renderer implementation -----------------
+
+
+def legacy_process_structured_itinerary(text: str) -> list:
+    """Process itinerary text into structured format for beautiful PDF rendering"""
+    content_items = []
+
+    # Split into lines and process
+    lines = text.split("\n")
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Clean bullets and extra formatting first
+        original_line = line
+        line = re.sub(r"^[-•*]\s*", "", line)  # Remove bullets
+        line = re.sub(r"^Booking:\s*", "", line)  # Remove standalone "Booking:"
+
+        # Skip if line becomes empty after cleaning
+        if not line.strip():
+            continue
+
+        # Detect and format different content types
+        if "Flight Details:" in original_line or (
+            "flight" in line.lower() and ("book" in line.lower() or "https://" in line)
+        ):
+            content_items.append(
+                {"type": "section_title", "content": "✈️ FLIGHT INFORMATION"}
+            )
+            # Process flight links
+            flight_content = legacy_clean_and_format_line(
+                line.replace("Flight Details:", "").strip()
+            )
+            if flight_content and "book" in flight_content.lower():
+                content_items.append({"type": "link", "content": flight_content})
+
+        elif line.startswith("Day ") and (":" in line or "—" in line):
+            # Day headers
+            day_content = legacy_clean_and_format_line(line)
+            content_items.append({"type": "day_title", "content": f"📅 {day_content}"})
+            content_items.append({"type": "spacer", "height": 5})
+
+        elif "morning" in line.lower() and (
+            ":" in line or line.lower().startswith("morning")
+        ):
+            content = legacy_clean_and_format_line(line.replace("Morning:", "").strip())
+            if content:
+                content_items.append(
+                    {"type": "activity", "content": f"🌅 <b>Morning:</b> {content}"}
+                )
+
+        elif "afternoon" in line.lower() and (
+            ":" in line or line.lower().startswith("afternoon")
+        ):
+            content = legacy_clean_and_format_line(line.replace("Afternoon:", "").strip())
+            if content:
+                content_items.append(
+                    {"type": "activity", "content": f"☀️ <b>Afternoon:</b> {content}"}
+                )
+
+        elif "evening" in line.lower() and (
+            ":" in line or line.lower().startswith("evening")
+        ):
+            content = legacy_clean_and_format_line(line.replace("Evening:", "").strip())
+            if content:
+                content_items.append(
+                    {"type": "activity", "content": f"🌆 <b>Evening:</b> {content}"}
+                )
+
+        elif "https://" in line and (
+            "booking" in original_line.lower() or "book" in line.lower()
+        ):
+            # Booking links - avoid duplication
+            content = legacy_clean_and_format_line(line)
+            if content and not any(
+                item.get("content", "").endswith(content) for item in content_items[-3:]
+            ):
+                content_items.append({"type": "link", "content": content})
+
+        elif "overnight" in line.lower() or "stay" in line.lower():
+            # Accommodation info
+            content = legacy_clean_and_format_line(line)
+            if content:
+                content_items.append({"type": "activity", "content": f"🏨 {content}"})
+
+        else:
+            # Regular content - avoid duplicates and ensure substantial content
+            content = legacy_clean_and_format_line(line)
+            if (
+                content
+                and len(content) > 15  # Only substantial content
+                and not any(
+                    "booking" in item.get("content", "").lower()
+                    for item in content_items[-2:]
+                )  # Avoid booking duplicates
+                and content
+                not in [
+                    item.get("content", "") for item in content_items[-3:]
+                ]  # Avoid exact duplicates
+            ):
+                content_items.append({"type": "activity", "content": content})
+
+    return content_items
+
+
+def legacy_clean_and_format_line(text: str) -> str:
+    """Clean and format a line with proper link handling"""
+    if not text or text.isspace():
+        return ""
+
+    # Clean multiple bullets and extra formatting
+    text = re.sub(r"^[-•*]\s*[-•*]\s*", "", text)  # Double bullets
+    text = re.sub(r"^[-•*]\s*", "", text)  # Single bullets
+    text = re.sub(r"^Booking:\s*", "", text)  # Remove "Booking:" prefix
+    text = text.strip()
+
+    if not text:
+        return ""
+
+    # Handle bold markdown **text** first
+    text = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
+
+    # Check if text already contains processed links to avoid double processing
+    if "<a href=" in text:
+        return text
+
+    # Process links with beautiful formatting - but avoid double processing
+    def replace_link(match):
+        link_text = match.group(1)
+        url = match.group(2)
+
+        # Determine link type and apply appropriate styling
+        if (
+            "flight" in link_text.lower()
+            or "aviasales" in url.lower()
+            or "Book this flight" in link_text
+        ):
+            display_text = "✈️ Book Flight"
+            color = "#e74c3c"
+        elif any(
+            word in link_text.lower()
+            for word in [
+                "hotel",
+                "resort",
+                "spa",
+                "albar",
+                "diamond",
+                "maison",
+                "booking",
+            ]
+        ):
+            display_text = f"🏨 {link_text}"
+            color = "#27ae60"
+        else:
+            display_text = link_text
+            color = "#3498db"
+
+        # Create proper clickable link (ReportLab format) with simpler escaping
+        safe_url = url.replace("&", "&amp;")
+        return f'<a href="{safe_url}" color="{color}"><u><b>{display_text}</b></u></a>'
+
+    # Apply link processing for markdown links
+    link_pattern = r"\[([^\]]+)\]\(([^)]+)\)"
+    text = re.sub(link_pattern, replace_link, text)
+
+    # Handle direct URLs that aren't in markdown format
+    def replace_direct_url(match):
+        url = match.group(0)
+        if "aviasales" in url:
+            display_text = "✈️ Book Flight"
+            color = "#e74c3c"
+        elif "booking.com" in url or "hotel" in url.lower():
+            display_text = "🏨 Book Hotel"
+            color = "#27ae60"
+        else:
+            display_text = "🔗 Visit Link"
+            color = "#3498db"
+
+        safe_url = url.replace("&", "&amp;")
+        return f'<a href="{safe_url}" color="{color}"><u><b>{display_text}</b></u></a>'
+
+    # Process direct URLs only if no links were already processed
+    if "<a href=" not in text:
+        url_pattern = r"https?://[^\s\)\]\}]+"
+        text = re.sub(url_pattern, replace_direct_url, text)
+
+    return text
+
+
+# -----------------------------------------------------------------------------
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    def tokenized(text):
+        return list(tokenize_itinerary(text))
+
+    print(f"{'file':<40} {'lines':>6} {'legacy µs':>10} {'tokenizer µs':>13} {'speedup':>8}")
+    for path in sorted(SUMMARIES_DIR.glob("*.txt")):
+        text = "\n".join([path.read_text(encoding="utf-8")] * args.scale)
+        legacy = _time(legacy_process_structured_itinerary, text, args.repeat)
+        current = _time(tokenized, text, args.repeat)
+        print(
+            f"{path.name[:40]:<40} {text.count(chr(10)) + 1:>6} "
+            f"{legacy * 1e6:>10.1f} {current * 1e6:>13.1f} {legacy / current:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
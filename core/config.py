@@ -15,6 +15,116 @@ class Settings(BaseSettings):
     aviasales_api_key: Optional[str] = None
     travelpayouts_api_key: Optional[str] = None
 
+    # Logging (core/logging.py): level, "text" or "json" output, and how large
+    # values wrapped in Payload are cut down (chars, fraction logged in full)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"
+    LOG_PAYLOAD_MAX_CHARS: int = 500
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.01
+
+    # Database engine: SQL echo, connection pool (connections, seconds) and
+    # the asyncpg prepared-statement cache (0 when behind pgbouncer)
+    DB_ECHO: bool = False
+    DB_SSL: bool = True
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Shared OpenAI client (seconds, connections)
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_RETRIES: int = 0  # Retries are done by services/resilience.py
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Conversation history sent to the chat model (tokens / messages)
+    CONTEXT_TOKEN_BUDGET: int = 1500
+    CONTEXT_MIN_RECENT_MESSAGES: int = 6
+    CONTEXT_FETCH_MESSAGES: int = 40  # Newest messages loaded from the DB per turn
+
+    # Shared HTTP client for Travelpayouts / Hotellook (seconds, connections)
+    PROVIDER_TIMEOUT: float = 10.0
+    PROVIDER_CONNECT_TIMEOUT: float = 5.0
+    PROVIDER_MAX_CONNECTIONS: int = 50
+    PROVIDER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PROVIDER_KEEPALIVE_EXPIRY: float = 30.0
+    # Needs the `h2` package; falls back to HTTP/1.1 without it
+    PROVIDER_HTTP2: bool = True
+    # Max hotel searches in flight at once for a single itinerary
+    HOTEL_LOOKUP_CONCURRENCY: int = 4
+    # Hotels fetched per search and ranked locally (see utils/hotel_ranking.py)
+    HOTEL_CANDIDATE_LIMIT: int = 200
+
+    # Retries with jittered exponential backoff and per-provider circuit
+    # breakers for OpenAI / Travelpayouts / Hotellook (services/resilience.py)
+    LLM_RETRY_ATTEMPTS: int = 3
+    PROVIDER_RETRY_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 0.25
+    RETRY_MAX_DELAY: float = 4.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before opening
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # Seconds open before a half-open probe
+    CIRCUIT_HALF_OPEN_PROBES: int = 1
+    # Send a duplicate LLM request when the first is slower than the given
+    # latency quantile (never below LLM_HEDGE_MIN_DELAY seconds)
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_QUANTILE: float = 0.95
+    LLM_HEDGE_MIN_DELAY: float = 2.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    # Outbound calls per second allowed per provider (0 = unlimited); calls
+    # queue in order and fail with RateLimitTimeout past the max wait (seconds)
+    TRAVELPAYOUTS_RATE_LIMIT: float = 10.0
+    HOTELLOOK_RATE_LIMIT: float = 10.0
+    PROVIDER_RATE_BURST: int = 5
+    PROVIDER_RATE_MAX_WAIT: float = 15.0
+
+    # Local cache of Travelpayouts flight prices (seconds, entries)
+    FLIGHT_CACHE_TTL: float = 600.0
+    FLIGHT_CACHE_MAXSIZE: int = 1024
+    # Local cache of Hotellook search results per stay (seconds, entries)
+    HOTEL_CACHE_TTL: float = 900.0
+    HOTEL_CACHE_MAXSIZE: int = 1024
+
+    # Start extraction and flight/hotel lookups while the user confirms the
+    # summary (see services/speculation.py); results kept for TTL seconds
+    SPECULATIVE_PREFETCH: bool = True
+    SPECULATIVE_PREFETCH_TTL: float = 600.0
+
+    # Trip planner output cached by canonical trip (seconds, entries); the
+    # itinerary_cache table shares plans across processes and restarts
+    ITINERARY_CACHE_TTL: float = 7 * 24 * 3600.0
+    ITINERARY_CACHE_MAXSIZE: int = 256
+    ITINERARY_CACHE_PERSIST: bool = True
+    ITINERARY_CACHE_DB_MAX_ROWS: int = 10000
+    # The table is pruned every PRUNE_EVERY stores or PRUNE_INTERVAL seconds,
+    # whichever comes first, so it may briefly exceed DB_MAX_ROWS
+    ITINERARY_CACHE_PRUNE_EVERY: int = 100
+    ITINERARY_CACHE_PRUNE_INTERVAL: float = 600.0
+
+    # Stream the trip planner completion so hotel searches start per day
+    TRIP_PLANNER_STREAMING: bool = True
+
+    # Number of itinerary pipelines allowed to run at once on this process
+    ITINERARY_JOB_WORKERS: int = 2
+    # A running job whose row has not been touched for this long (seconds) is
+    # presumed orphaned by a dead worker and may be claimed again
+    ITINERARY_JOB_LEASE_SECONDS: float = 120.0
+
+    # Compressed append-only archive of generated itineraries (see
+    # services/itinerary_archive.py); segments rotate at SEGMENT_BYTES
+    ITINERARY_ARCHIVE_DIR: str = "archive"
+    ITINERARY_ARCHIVE_SEGMENT_BYTES: int = 8 * 1024 * 1024
+    ITINERARY_ARCHIVE_BATCH_SIZE: int = 32
+    ITINERARY_ARCHIVE_FLUSH_INTERVAL: float = 1.0  # Seconds to gather a batch
+
+    # Itinerary PDF rendering (worker processes; 0 renders on a thread instead)
+    PDF_RENDER_WORKERS: int = 2
+    PDF_CACHE_TTL: float = 3600.0
+    PDF_CACHE_MAXSIZE: int = 128
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
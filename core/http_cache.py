@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+from typing import Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+try:  # Brotli is optional (pip install brotli); gzip is always available
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_ENCODING_SUFFIX = {"br": "-br", "gzip": "-gz"}
+
+
+def strong_etag(*parts: str) -> str:
+    """Quoted strong ETag over the given content parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def weak_etag(*parts: str) -> str:
+    """Weak ETag for bodies that are equivalent but not byte-identical.
+
+    Use it when the representation embeds volatile bytes (e.g. a render
+    timestamp) that the parts do not determine.
+    """
+    return "W/" + strong_etag(*parts)
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in _ENCODING_SUFFIX.values():
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, ignoring our encoding suffix)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == wanted for tag in if_none_match.split(","))
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Preferred content-coding we can produce: "br", "gzip" or None."""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for coding in ("br", "gzip"):
+        if coding == "br" and not BROTLI_AVAILABLE:
+            continue
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    # mtime=0 keeps the output byte-identical for the same body
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _chunks(body: bytes) -> Iterator[bytes]:
+    view = memoryview(body)
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield bytes(view[start : start + STREAM_CHUNK_SIZE])
+
+
+def cached_download(
+    request: Request,
+    etag: str,
+    body: bytes,
+    media_type: str,
+    filename: str,
+    compressible: bool = True,
+) -> Response:
+    """Stream `body` from memory as an attachment with ETag and compression.
+
+    Callers that can compute the ETag without building the body should check
+    `etag_matches` first and call `not_modified`; this still honours
+    If-None-Match for callers that cannot.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+        "ETag": etag,
+    }
+    encoding = (
+        negotiate_encoding(request.headers.get("accept-encoding"))
+        if compressible and len(body) >= MIN_COMPRESS_SIZE
+        else None
+    )
+    if encoding:
+        compressed = compress(body, encoding)
+        # Already-compressed payloads (e.g. PDF streams) are not worth it
+        if len(compressed) < len(body) * 0.9:
+            body = compressed
+            headers["Content-Encoding"] = encoding
+            weak = "W/" if etag.startswith("W/") else ""
+            headers["ETag"] = f'{weak}"{_opaque_tag(etag)}{_ENCODING_SUFFIX[encoding]}"'
+    headers["Content-Length"] = str(len(body))
+    return StreamingResponse(_chunks(body), media_type=media_type, headers=headers)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304,
+        headers={
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept-Encoding",
+        },
+    )
@@ -1,13 +1,117 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+
+from core.config import settings
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class Payload:
+    """Lazily rendered, size-capped log argument for large values.
+
+    `logger.debug("AI response: %s", Payload(text))` costs nothing unless the
+    record is emitted. When it is, values longer than `max_chars` are cut
+    down, except for a `sample_rate` fraction that is logged in full.
+    """
+
+    __slots__ = ("value", "max_chars", "sample_rate")
+
+    def __init__(self, value, max_chars: int = None, sample_rate: float = None):
+        self.value = value
+        self.max_chars = settings.LOG_PAYLOAD_MAX_CHARS if max_chars is None else max_chars
+        self.sample_rate = (
+            settings.LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        if len(text) <= self.max_chars or random.random() < self.sample_rate:
+            return text
+        return f"{text[: self.max_chars]}... (+{len(text) - self.max_chars} chars)"
+
+    __repr__ = __str__
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, extras, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value if isinstance(value, (int, float, bool)) else str(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread.
+
+    The stock `prepare` formats the record on the logging thread (message,
+    `%` args, traceback) so it can be pickled; this queue never leaves the
+    process, so a copy of the raw record is enough. Arguments are rendered
+    when the listener gets to them: do not mutate a value after logging it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
+
+_listener = None
 
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler()],
+    """Route all logging through a queue drained by a background thread.
+
+    Callers only pay for building the record and putting it on the queue
+    (see `DeferredQueueHandler`); rendering arguments and `Payload`s,
+    formatting and writing to stderr happen on the listener thread.
+    Level and format (text or json) come from LOG_LEVEL and LOG_FORMAT.
+    """
+    global _listener
+    if settings.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+    output = logging.StreamHandler()
+    output.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, output, respect_handler_level=True
     )
+    _listener.start()
+    atexit.register(stop_logging)
     return logging.getLogger("zoomzoot")
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 logger = setup_logging()
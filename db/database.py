@@ -1,11 +1,136 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from core.config import settings
+from services.metrics import registry, samples, stage_seconds, timed
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.monotonic() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "avg_wait_seconds": total_wait / checkouts if checkouts else 0.0,
+            "max_wait_seconds": max_wait,
+        }
+
+
+def _connect_args() -> dict:
+    if make_url(settings.DATABASE_URL).get_driver_name() != "asyncpg":
+        return {}
+    # Set DB_STATEMENT_CACHE_SIZE=0 behind pgbouncer in transaction mode
+    return {"ssl": settings.DB_SSL, "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
 
 
 engine = create_async_engine(
-    settings.DATABASE_URL, echo=True, connect_args={"ssl": True}
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=_connect_args(),
+)
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stage_seconds.observe(time.perf_counter() - started, "db_execute", "ok")
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _execute_failed(context):
+    started = context.connection.info.get("query_started") if context.connection else None
+    if started:
+        stage_seconds.observe(time.perf_counter() - started.pop(), "db_execute", "error")
+
+
+class TimedSession(AsyncSession):
+    """AsyncSession whose commits are recorded as the "db_commit" stage."""
+
+    async def commit(self) -> None:
+        with timed("db_commit"):
+            await super().commit()
+
+
+async_session = async_sessionmaker(
+    engine, class_=TimedSession, expire_on_commit=False
 )
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+def pool_stats() -> dict:
+    """Connection pool usage for this process (see InstrumentedPool.stats)."""
+    return engine.pool.stats()
+
+
+@registry.collector
+def _pool_metrics() -> list:
+    stats = pool_stats()
+    return (
+        samples(
+            "zoomzoot_db_pool_checked_out",
+            "Connections currently checked out of the pool.",
+            "gauge",
+            [({}, stats["checked_out"])],
+        )
+        + samples(
+            "zoomzoot_db_pool_overflow",
+            "Connections open beyond the pool size.",
+            "gauge",
+            [({}, stats["overflow"])],
+        )
+        + samples(
+            "zoomzoot_db_pool_wait_seconds_total",
+            "Time spent waiting for a pooled connection.",
+            "counter",
+            [({}, engine.pool.total_wait)],
+        )
+    )
 
 
 async def get_db():
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import CachedItinerary
+
+
+async def load_cached_plan(
+    db: AsyncSession, cache_keys: list, summary_key: str, now: datetime
+) -> Optional[CachedItinerary]:
+    """Return an unexpired cached plan matching any key, marking it used."""
+    stmt = (
+        select(CachedItinerary)
+        .where(
+            or_(
+                CachedItinerary.cache_key.in_(cache_keys),
+                CachedItinerary.summary_key == summary_key,
+            ),
+            CachedItinerary.expires_at > now,
+        )
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    row = result.scalar_one_or_none()
+    if row is not None:
+        row.hits = (row.hits or 0) + 1
+        row.last_used_at = now
+    return row
+
+
+async def store_cached_plan(
+    db: AsyncSession,
+    cache_key: str,
+    summary_key: str,
+    plan: str,
+    now: datetime,
+    expires_at: datetime,
+) -> None:
+    """Insert or refresh the plan stored under `cache_key`."""
+    row = await db.get(CachedItinerary, cache_key)
+    if row is None:
+        db.add(
+            CachedItinerary(
+                cache_key=cache_key,
+                summary_key=summary_key,
+                plan=plan,
+                hits=0,
+                created_at=now,
+                last_used_at=now,
+                expires_at=expires_at,
+            )
+        )
+    else:
+        row.summary_key = summary_key
+        row.plan = plan
+        row.last_used_at = now
+        row.expires_at = expires_at
+
+
+async def prune_cached_plans(db: AsyncSession, now: datetime, max_rows: int) -> None:
+    """Drop expired plans, then the least recently used beyond `max_rows`."""
+    await db.execute(delete(CachedItinerary).where(CachedItinerary.expires_at <= now))
+    if max_rows > 0:
+        keep = (
+            select(CachedItinerary.cache_key)
+            .order_by(CachedItinerary.last_used_at.desc())
+            .limit(max_rows)
+            .scalar_subquery()
+        )
+        await db.execute(
+            delete(CachedItinerary).where(CachedItinerary.cache_key.not_in(keep))
+        )
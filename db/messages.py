@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import ChatMessage, Session
+
+# Inserts retried when a concurrent turn takes the same seq first
+APPEND_ATTEMPTS = 5
+
+
+def add_message(
+    db: AsyncSession, session_id: str, seq: int, role: str, content: str
+) -> ChatMessage:
+    """Stage an insert of one conversation message. Messages are never updated."""
+    message = ChatMessage(session_id=session_id, seq=seq, role=role, content=content)
+    db.add(message)
+    return message
+
+
+async def append_message(
+    db: AsyncSession, session_id: str, role: str, content: str
+) -> int:
+    """Insert a message after the newest one of its session; return its seq.
+
+    The seq is computed by the INSERT itself (max + 1), so two turns of the
+    same session can write concurrently: the one that loses the race on the
+    (session_id, seq) key retries inside a savepoint and lands after it.
+    """
+    next_seq = (
+        select(func.coalesce(func.max(ChatMessage.seq) + 1, 0))
+        .where(ChatMessage.session_id == session_id)
+        .scalar_subquery()
+    )
+    stmt = (
+        insert(ChatMessage)
+        .values(
+            session_id=session_id,
+            seq=next_seq,
+            role=role,
+            content=content,
+            created_at=datetime.utcnow(),
+        )
+        .returning(ChatMessage.seq)
+    )
+    for attempt in range(APPEND_ATTEMPTS):
+        try:
+            async with db.begin_nested():
+                return (await db.execute(stmt)).scalar_one()
+        except IntegrityError:
+            if attempt + 1 >= APPEND_ATTEMPTS:
+                raise
+
+
+async def load_recent_messages(
+    db: AsyncSession, session_id: str, limit: int
+) -> list:
+    """Return the newest `limit` messages of a session, oldest first."""
+    stmt = (
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.seq.desc())
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return list(reversed(result.scalars().all()))
+
+
+async def load_messages(
+    db: AsyncSession, session_id: str, start: int, end: int
+) -> list:
+    """Return messages with `start <= seq < end`, oldest first."""
+    stmt = (
+        select(ChatMessage)
+        .where(
+            ChatMessage.session_id == session_id,
+            ChatMessage.seq >= start,
+            ChatMessage.seq < end,
+        )
+        .order_by(ChatMessage.seq)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+def migrate_legacy_history(db: AsyncSession, session: Session) -> list:
+    """Copy a pre-`messages` JSON history into the messages table.
+
+    Clears `Session.history` so the blob is not carried around any more.
+    Returns the staged messages, oldest first.
+    """
+    messages = [
+        add_message(
+            db, session.session_id, seq, item.get("role", "user"), item.get("content") or ""
+        )
+        for seq, item in enumerate(session.history or [])
+    ]
+    session.history = None
+    return messages
+
+
+def as_chat_messages(messages: list) -> list:
+    """Convert `ChatMessage` rows to OpenAI chat message dicts."""
+    return [{"role": m.role, "content": m.content} for m in messages]
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, String, Integer, JSON
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, JSON, DateTime, Text
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
 
@@ -16,13 +18,54 @@ class Session(Base):
     preferences = Column(JSON, nullable=True)
     history = Column(
         JSON, nullable=True, default=list
-    )  # List of {"role": "user/assistant", "content": "text"}
+    )  # Legacy: List of {"role": "user/assistant", "content": "text"}; now in `messages`
     trip_details = Column(
         JSON, nullable=True, default=dict
     )  # Saved requirements e.g., {"days": 5, "start_date": "2025-09-01", "preferences": ["food"]}
 
 
+class ChatMessage(Base):
+    __tablename__ = "messages"
+    # The (session_id, seq) primary key doubles as the index used to fetch the
+    # newest N messages of a session (ORDER BY seq DESC LIMIT N).
+    session_id = Column(String, primary_key=True)
+    seq = Column(Integer, primary_key=True)  # 0-based position in the conversation
+    role = Column(String, nullable=False)  # "user" / "assistant"
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class Itinerary(Base):
     __tablename__ = "itineraries"
     session_id = Column(String, primary_key=True)
     itinerary = Column(JSON, nullable=False)
+
+
+class CachedItinerary(Base):
+    __tablename__ = "itinerary_cache"
+    # sha256 of the canonical trip (see services/itinerary_cache.py)
+    cache_key = Column(String, primary_key=True)
+    summary_key = Column(String, nullable=False, index=True)  # sha256 of the exact summary
+    plan = Column(Text, nullable=False)  # Trip planner JSON ({"response", "days"})
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ItineraryJob(Base):
+    __tablename__ = "itinerary_jobs"
+    job_id = Column(String, primary_key=True)
+    session_id = Column(String, nullable=False, index=True)
+    status = Column(
+        String, nullable=False, default="queued"
+    )  # queued / running / succeeded / failed
+    stage = Column(String, nullable=True)  # Current pipeline step while running
+    payload = Column(
+        JSON, nullable=False
+    )  # {"summary": "Summary: ...", "message": "<user message that confirmed>"}
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
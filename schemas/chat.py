@@ -13,3 +13,4 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     message: str
     finished: bool
+    jobId: Optional[str] = None  # Set when an itinerary job was queued
@@ -0,0 +1,21 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ItineraryJobResponse(BaseModel):
+    jobId: str
+    sessionId: str
+    status: str
+    stage: Optional[str] = None
+    error: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class ItineraryResponse(BaseModel):
+    sessionId: str
+    status: str
+    itinerary: Optional[str] = None
+    jobId: Optional[str] = None
+    error: Optional[str] = None
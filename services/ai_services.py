@@ -1,19 +1,19 @@
-from openai import AsyncOpenAI
-from core.config import settings
+from typing import AsyncIterator
 from core.logging import logger
+from services.llm_client import create_chat_completion
+from services.metrics import timed, track
 import datetime
 
 current_year = datetime.datetime.now().year
 
+# Shown instead of the raw provider error once retries are exhausted
+FALLBACK_RESPONSE = (
+    "Sorry, I'm having trouble reaching our trip planner right now. "
+    "Please try again in a moment."
+)
 
-async def generate_ai_response(history: list) -> str:
-    logger.info(f"Generating AI response with history")
-
-    client = AsyncOpenAI(
-        api_key=settings.OPENAI_API_KEY,
-    )
 
-    system_prompt = f"""
+SYSTEM_PROMPT = f"""
     Current year is {current_year}
 You are ZoomZoot, a warm, friendly, and knowledgeable travel assistant who helps users plan trips anywhere in the world.
 
@@ -66,13 +66,65 @@ Guide the user through a natural conversation to gather all trip details. Once a
 6. Once all details are collected → Return the summary automatically.
 """
 
-    messages = [{"role": "system", "content": system_prompt}] + history
+
+@track("generate_ai_response")
+async def generate_ai_response(history: list) -> str:
+    return await _complete(history)
+
+
+@track("speculative_ai_response")
+async def predict_ai_response(history: list) -> str:
+    """`generate_ai_response` for background speculation.
+
+    Timed as its own stage so predictions nobody waits for do not skew the
+    latency of user-facing replies.
+    """
+    return await _complete(history)
+
+
+async def _complete(history: list) -> str:
+    logger.info(f"Generating AI response with history")
+
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}] + history
 
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(
             model="gpt-3.5-turbo", messages=messages, max_tokens=200
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
         logger.error(f"OpenAI API error: {str(e)}")
-        return f"Error generating response: {str(e)}"
+        return FALLBACK_RESPONSE
+
+
+async def stream_ai_response(history: list) -> AsyncIterator[str]:
+    """Stream the assistant reply token by token as OpenAI produces it.
+
+    Yields text deltas in order; joining them gives the same text that
+    `generate_ai_response` would return (before stripping). If the API
+    fails before the first token, a single fallback message is yielded,
+    mirroring `generate_ai_response`; once tokens have been sent a failure
+    is re-raised, since the fallback would be glued onto a partial reply.
+    """
+    logger.info("Streaming AI response with history")
+
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}] + history
+
+    started = False
+    try:
+        with timed("stream_ai_response"):
+            stream = await create_chat_completion(
+                model="gpt-3.5-turbo", messages=messages, max_tokens=200, stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    started = True
+                    yield delta
+    except Exception as e:
+        logger.error(f"OpenAI streaming API error: {str(e)}")
+        if started:
+            raise
+        yield FALLBACK_RESPONSE
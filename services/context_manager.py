@@ -0,0 +1,160 @@
+import math
+import re
+from functools import lru_cache
+from typing import Optional
+
+from core.config import settings
+
+try:  # Exact OpenAI token counts when tiktoken is installed
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Fixed per-message cost of the chat format (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Trip details the assistant collects, keyed by the digest label and matched
+# against the assistant question that preceded the user's answer.
+TRIP_FIELDS = {
+    "Destination": ("destination", "where would you like", "where do you want"),
+    "Duration": ("how many days", "how long", "duration", "how many nights"),
+    "Dates": ("travel dates", "when are you", "when would you", "when do you", "dates"),
+    "Preferences": ("preferences", "interests", "interested in", "what kind of"),
+    "Flight Needs": ("flight booking",),
+    "Origin": ("origin", "flying from", "departure city", "departing from"),
+    "Hotel Needs": ("hotel booking",),
+    "Special Requirements": ("special requirements", "budget", "dietary", "accessibility"),
+}
+
+MAX_FACT_CHARS = 160
+MAX_NOTES = 5
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.get_encoding("cl100k_base") if tiktoken else None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in `text` locally.
+
+    Uses tiktoken's cl100k_base encoding when available, otherwise an
+    estimate of ~1.3 tokens per word/punctuation mark.
+    """
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(_WORD_RE.findall(text)) * 1.3)
+
+
+def count_message_tokens(message: dict) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content") or "")
+
+
+def _clip(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= MAX_FACT_CHARS:
+        return text
+    return text[: MAX_FACT_CHARS - 1].rstrip() + "…"
+
+
+def _asked_fields(question: str) -> list:
+    question = question.lower()
+    return [
+        field
+        for field, keywords in TRIP_FIELDS.items()
+        if any(keyword in question for keyword in keywords)
+    ]
+
+
+def fold_into_digest(digest: Optional[dict], messages: list) -> dict:
+    """Fold `messages` into a running digest of collected trip details.
+
+    Each user reply is attributed to the trip fields the preceding assistant
+    question asked about; later answers overwrite earlier ones. Replies that
+    do not answer a recognised question are kept as short notes.
+    """
+    digest = digest or {}
+    asked = list(digest.get("pending", []))
+    digest = {
+        "facts": dict(digest.get("facts", {})),
+        "notes": list(digest.get("notes", [])),
+        "upto": digest.get("upto", 0),
+    }
+    for message in messages:
+        content = message.get("content") or ""
+        if message.get("role") == "assistant":
+            asked = _asked_fields(content)
+        elif message.get("role") == "user":
+            if asked:
+                for field in asked:
+                    digest["facts"][field] = _clip(content)
+            else:
+                digest["notes"] = (digest["notes"] + [_clip(content)])[-MAX_NOTES:]
+            asked = []
+    # A question at the very end is answered by the first message of the next fold
+    digest["pending"] = asked
+    return digest
+
+
+def render_digest(digest: dict) -> str:
+    lines = ["Trip details collected earlier in this conversation (older messages omitted):"]
+    for field in TRIP_FIELDS:
+        if field in digest.get("facts", {}):
+            lines.append(f"- {field}: {digest['facts'][field]}")
+    if digest.get("notes"):
+        lines.append("Other things the traveller said earlier:")
+        lines.extend(f"- {note}" for note in digest["notes"])
+    return "\n".join(lines)
+
+
+def build_context(
+    history: list,
+    digest: Optional[dict] = None,
+    budget: Optional[int] = None,
+    min_recent: Optional[int] = None,
+    offset: int = 0,
+) -> tuple:
+    """Trim `history` to a token budget for the next chat completion.
+
+    The newest messages are kept while they fit in `budget` tokens (always at
+    least `min_recent` of them). Anything older is folded into the running
+    `digest` and sent as one compact system message instead.
+
+    `history` may be just the tail of the conversation: `offset` is the
+    position of its first message in the full conversation. Messages before
+    `offset` must already be folded into `digest` (see `fold_into_digest`).
+
+    Returns `(messages, digest)`; persist the digest and pass it back on the
+    next turn so older messages are only folded once.
+    """
+    budget = settings.CONTEXT_TOKEN_BUDGET if budget is None else budget
+    min_recent = (
+        settings.CONTEXT_MIN_RECENT_MESSAGES if min_recent is None else min_recent
+    )
+
+    # Walk backwards from the newest message; stop as soon as the budget is
+    # spent so the cost stays proportional to the window, not the history.
+    cut = len(history)
+    used = 0
+    while cut > 0:
+        cost = count_message_tokens(history[cut - 1])
+        if used + cost > budget and len(history) - cut >= min_recent:
+            break
+        used += cost
+        cut -= 1
+
+    digest = digest or {"facts": {}, "notes": [], "upto": 0}
+    upto = digest.get("upto", 0)
+    if offset + cut > upto:
+        digest = fold_into_digest(digest, history[max(upto - offset, 0) : cut])
+        digest["upto"] = offset + cut
+
+    window = history[cut:]
+    if offset + cut == 0:
+        return window, digest
+    return [{"role": "system", "content": render_digest(digest)}] + window, digest
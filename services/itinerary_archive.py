@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from core.config import settings
+from core.logging import logger
+from services.metrics import timed
+
+# Block header: magic, compressed length. The payload is zlib-compressed JSON
+# lines, one {"session_id", "created_at", "itinerary"} record per line.
+_BLOCK_HEADER = struct.Struct(">4sI")
+_BLOCK_MAGIC = b"ZZA1"
+
+
+class ItineraryArchive:
+    """Append-only, compressed archive of generated itineraries.
+
+    `archive()` only queues the record; a background task collects records
+    for up to `flush_interval` seconds (or `batch_size` records) and writes
+    them from a worker thread as one zlib-compressed block appended to the
+    current segment file. Segments rotate once they reach `segment_bytes`.
+    Every block gets one line per record in the segment's `.idx` file
+    (session id, block offset and length), which `get()` uses to read back
+    one itinerary by decompressing a single block.
+
+    Segment names carry the writing process's start time and pid, so several
+    workers can share a directory; `get()` picks up other processes' index
+    lines as they appear. The latest record for a session wins.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int,
+        batch_size: int = 32,
+        flush_interval: float = 1.0,
+        compress_level: int = 6,
+    ):
+        self.directory = Path(directory)
+        self.segment_bytes = max(1, segment_bytes)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.compress_level = compress_level
+        self._writer_id = f"{datetime.utcnow():%Y%m%dT%H%M%SZ}-{os.getpid()}"
+        self._segment_no = 0
+        self._segment_size = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Records accepted but not yet on disk, readable through get()
+        self._pending: dict = {}
+        # session_id -> (created_at, segment path, offset, length)
+        self._index: dict = {}
+        self._index_read: dict = {}
+        self._lock = threading.Lock()
+        self.records_written = 0
+        self.blocks_written = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._writer(), name="itinerary-archive")
+
+    async def stop(self) -> None:
+        """Flush everything queued, then stop the writer."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def archive(self, session_id: str, itinerary: str) -> None:
+        """Queue an itinerary for the archive; returns without touching disk."""
+        await self.start()
+        record = {
+            "session_id": session_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "itinerary": itinerary,
+        }
+        with self._lock:
+            self._pending[session_id] = record
+        self._queue.put_nowait(record)
+
+    async def get(self, session_id: str) -> Optional[str]:
+        """The latest archived itinerary for `session_id`, or None."""
+        with self._lock:
+            record = self._pending.get(session_id)
+        if record is not None:
+            return record["itinerary"]
+        return await asyncio.to_thread(self.read, session_id)
+
+    async def _writer(self) -> None:
+        stopping = False
+        while not stopping:
+            record = await self._queue.get()
+            if record is None:
+                break
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            try:
+                await asyncio.to_thread(self.write_batch, batch)
+            except Exception as e:
+                logger.error(f"Failed to archive {len(batch)} itineraries: {e}")
+            finally:
+                with self._lock:
+                    for record in batch:
+                        if self._pending.get(record["session_id"]) is record:
+                            del self._pending[record["session_id"]]
+
+    # Blocking I/O below runs in worker threads.
+
+    def _segment_path(self) -> Path:
+        return self.directory / f"itineraries-{self._writer_id}-{self._segment_no:06d}.seg"
+
+    def write_batch(self, records: list) -> None:
+        """Append `records` to the current segment as one compressed block."""
+        payload = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+        block = zlib.compress(payload, self.compress_level)
+
+        with timed("archive_write"):
+            self._append(records, block)
+
+    def _append(self, records: list, block: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._segment_no == 0 or self._segment_size >= self.segment_bytes:
+            self._segment_no += 1
+            self._segment_size = 0
+        segment = self._segment_path()
+        offset = self._segment_size
+        with open(segment, "ab") as f:
+            f.write(_BLOCK_HEADER.pack(_BLOCK_MAGIC, len(block)))
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        length = _BLOCK_HEADER.size + len(block)
+        self._segment_size += length
+
+        lines = "".join(
+            json.dumps(
+                [r["session_id"], r["created_at"], offset, length], ensure_ascii=False
+            )
+            + "\n"
+            for r in records
+        )
+        with open(segment.with_suffix(".idx"), "a", encoding="utf-8") as f:
+            f.write(lines)
+        with self._lock:
+            for r in records:
+                self._remember(r["session_id"], r["created_at"], segment, offset, length)
+        self.records_written += len(records)
+        self.blocks_written += 1
+
+    def _remember(self, session_id, created_at, segment, offset, length) -> None:
+        current = self._index.get(session_id)
+        if current is None or current[0] <= created_at:
+            self._index[session_id] = (created_at, segment, offset, length)
+
+    def _refresh_index(self) -> None:
+        """Read index lines appended since the last refresh, by any process."""
+        if not self.directory.is_dir():
+            return
+        for idx in sorted(self.directory.glob("itineraries-*.idx")):
+            start = self._index_read.get(idx, 0)
+            try:
+                with open(idx, "rb") as f:
+                    f.seek(start)
+                    data = f.read()
+            except OSError:
+                continue
+            # Ignore a trailing line another process is still writing
+            complete = data[: data.rfind(b"\n") + 1]
+            if not complete:
+                continue
+            segment = idx.with_suffix(".seg")
+            with self._lock:
+                for line in complete.decode("utf-8").splitlines():
+                    try:
+                        session_id, created_at, offset, length = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._remember(session_id, created_at, segment, offset, length)
+                self._index_read[idx] = start + len(complete)
+
+    def read(self, session_id: str) -> Optional[str]:
+        """Blocking `get()` for archived (flushed) itineraries."""
+        self._refresh_index()
+        with self._lock:
+            entry = self._index.get(session_id)
+        if entry is None:
+            return None
+        _, segment, offset, length = entry
+        try:
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                raw = f.read(length)
+            magic, size = _BLOCK_HEADER.unpack_from(raw)
+            if magic != _BLOCK_MAGIC:
+                raise ValueError("bad block header")
+            payload = zlib.decompress(raw[_BLOCK_HEADER.size : _BLOCK_HEADER.size + size])
+        except (OSError, ValueError, struct.error, zlib.error) as e:
+            logger.error(f"Failed to read archived itinerary for {session_id}: {e}")
+            return None
+        latest = None
+        for line in payload.decode("utf-8").splitlines():
+            record = json.loads(line)
+            if record["session_id"] == session_id:
+                latest = record["itinerary"]
+        return latest
+
+
+itinerary_archive = ItineraryArchive(
+    settings.ITINERARY_ARCHIVE_DIR,
+    segment_bytes=settings.ITINERARY_ARCHIVE_SEGMENT_BYTES,
+    batch_size=settings.ITINERARY_ARCHIVE_BATCH_SIZE,
+    flush_interval=settings.ITINERARY_ARCHIVE_FLUSH_INTERVAL,
+)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from core.config import settings
+from core.logging import logger
+from db.database import async_session
+from db.itinerary_cache import load_cached_plan, prune_cached_plans, store_cached_plan
+from services.result_cache import MemoryBackend, ResultCache
+from utils.flight_booking import build_flight_link
+from utils.summary_parser import parse_duration_days, parse_summary_fields, parse_trip_dates
+
+_LIST_SPLIT_RE = re.compile(r"\s*(?:,|;|/|&|\+|\band\b)\s*")
+_FLIGHT_URL_RE = re.compile(r"https?://(?:www\.)?aviasales\.com/search/[^\s)\]\"'\\]+")
+_EMPTY_VALUES = {"", "n/a", "na", "none", "no", "-", "not applicable"}
+
+
+def _norm(value: str) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _norm_list(value: str) -> list:
+    """"Food & culture, temples" → ["culture", "food", "temples"]."""
+    value = _norm(value)
+    if value in _EMPTY_VALUES:
+        return []
+    items = {_norm(item) for item in _LIST_SPLIT_RE.split(value)}
+    return sorted(items - _EMPTY_VALUES)
+
+
+def canonical_trip(summary: str, params: dict) -> Optional[dict]:
+    """The fields of a summary that determine the planned itinerary.
+
+    Destination, duration, start date, sorted preferences, origin and special
+    requirements; wording, ordering and casing do not matter. Returns None
+    when destination or start date cannot be determined.
+    """
+    fields = parse_summary_fields(summary)
+    destination = _norm(fields.get("destination", ""))
+    duration = parse_duration_days(fields.get("duration", ""))
+    start = params.get("FLIGHT_DEPART_DATE") or ""
+    if not start:
+        depart, _ = parse_trip_dates(fields.get("dates", ""), duration)
+        start = depart.isoformat() if depart else ""
+    if not destination or not start:
+        return None
+
+    origin = params.get("FLIGHT_ORIGIN") or _norm(fields.get("origin", ""))
+    return {
+        "destination": destination,
+        "duration": duration,
+        "start": start,
+        "preferences": _norm_list(fields.get("preferences", "")),
+        "origin": "" if origin in _EMPTY_VALUES else origin,
+        "requirements": _norm_list(fields.get("special_requirements", "")),
+    }
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def summary_key(summary: str) -> str:
+    """Exact-match key: the summary line up to case and whitespace."""
+    return _digest(["summary", _norm(summary)])
+
+
+def trip_key(trip: dict) -> str:
+    return _digest(["trip", trip])
+
+
+def is_plan(plan_text) -> bool:
+    """Only complete planner output is worth caching (not its error fallbacks)."""
+    try:
+        parsed = json.loads(plan_text)
+    except (TypeError, ValueError):
+        return False
+    return (
+        isinstance(parsed, dict)
+        and bool(parsed.get("days"))
+        and not str(parsed.get("response", "")).startswith("Error")
+    )
+
+
+def rebind_flight_links(plan_text: str, params: dict) -> str:
+    """Point every Aviasales link in a plan at this session's flight search."""
+    origin = params.get("FLIGHT_ORIGIN")
+    destination = params.get("FLIGHT_DESTINATION")
+    if not origin or not destination:
+        return plan_text
+    link = build_flight_link(
+        origin,
+        params.get("FLIGHT_DEPART_DATE"),
+        destination,
+        params.get("FLIGHT_RETURN_DATE") or None,
+    )
+    return _FLIGHT_URL_RE.sub(lambda _: link, plan_text)
+
+
+class ItineraryCache:
+    """Trip planner output cached by canonical trip, in memory and in the DB.
+
+    A summary first matches on its exact text, then on its canonical trip
+    (`canonical_trip`), so rewordings of the same trip share one plan.
+    Concurrent misses for the same trip share one planner call. Plans live
+    in a per-process LRU with a TTL and, when `persist` is set, in the
+    `itinerary_cache` table shared by every process. Flight links are
+    re-bound to the requesting session's search when served; hotels are
+    looked up per session after planning, so plans never carry them.
+
+    Expired and surplus rows are pruned along with a store only every
+    `prune_every` stores or `prune_interval` seconds, not on each one.
+    """
+
+    def __init__(
+        self,
+        cache: ResultCache,
+        ttl: float,
+        persist: bool,
+        max_rows: int,
+        prune_every: int = 100,
+        prune_interval: float = 600.0,
+        timer=time.monotonic,
+    ):
+        self.cache = cache
+        self.ttl = ttl
+        self.persist = persist
+        self.max_rows = max_rows
+        self.prune_every = max(1, prune_every)
+        self.prune_interval = prune_interval
+        self._timer = timer
+        self._stores_since_prune = 0
+        self._last_prune: Optional[float] = None
+
+    async def get_or_plan(
+        self, summary: str, params: dict, plan: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Cached plan for this trip, or `await plan()` once and cache it."""
+        exact = summary_key(summary)
+        trip = canonical_trip(summary, params)
+        keys = [trip_key(trip), exact] if trip else [exact]
+
+        async def _load():
+            if self.persist:
+                value = await self._load_persisted(keys, exact)
+                if value is not None:
+                    return value
+            logger.info("Itinerary cache miss, calling the trip planner")
+            value = await plan()
+            if self.persist and is_plan(value):
+                await self._persist(keys[0], exact, value)
+            return value
+
+        # One hit or miss per call, whichever key the plan is found under
+        plan_text = await self.cache.get_or_load(
+            keys[0], _load, cacheable=is_plan, aliases=tuple(keys[1:])
+        )
+        if is_plan(plan_text):
+            for key in keys:
+                self.cache.set(key, plan_text)
+        return rebind_flight_links(plan_text, params)
+
+    async def _load_persisted(self, keys: list, exact: str) -> Optional[str]:
+        try:
+            async with async_session() as db:
+                row = await load_cached_plan(db, keys, exact, datetime.utcnow())
+                if row is None:
+                    return None
+                plan_text = row.plan
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Itinerary cache lookup failed: {e}")
+            return None
+        logger.info("Itinerary served from the shared cache")
+        return plan_text
+
+    def _prune_due(self) -> bool:
+        """Count a store; True (and reset) when the table is due a prune."""
+        self._stores_since_prune += 1
+        now = self._timer()
+        if (
+            self._last_prune is not None
+            and self._stores_since_prune < self.prune_every
+            and now - self._last_prune < self.prune_interval
+        ):
+            return False
+        self._stores_since_prune = 0
+        self._last_prune = now
+        return True
+
+    async def _persist(self, key: str, exact: str, plan_text: str) -> None:
+        now = datetime.utcnow()
+        try:
+            async with async_session() as db:
+                await store_cached_plan(
+                    db, key, exact, plan_text, now, now + timedelta(seconds=self.ttl)
+                )
+                if self._prune_due():
+                    await prune_cached_plans(db, now, self.max_rows)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to store itinerary in cache: {e}")
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+itinerary_cache = ItineraryCache(
+    ResultCache(
+        "itineraries",
+        MemoryBackend(
+            maxsize=settings.ITINERARY_CACHE_MAXSIZE, ttl=settings.ITINERARY_CACHE_TTL
+        ),
+    ),
+    ttl=settings.ITINERARY_CACHE_TTL,
+    persist=settings.ITINERARY_CACHE_PERSIST,
+    max_rows=settings.ITINERARY_CACHE_DB_MAX_ROWS,
+    prune_every=settings.ITINERARY_CACHE_PRUNE_EVERY,
+    prune_interval=settings.ITINERARY_CACHE_PRUNE_INTERVAL,
+)
@@ -0,0 +1,171 @@
+import json
+import re
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import flag_modified
+
+from core.config import settings
+from core.logging import logger
+from db.database import async_session
+from db.models import Session, Itinerary
+from services.itinerary_archive import itinerary_archive
+from services.itinerary_cache import itinerary_cache
+from services.speculation import fetch_flights, speculative_prefetch
+from services.trip_planner import create_day_by_day_itinerary
+from utils.create_response import create_user_friendly_response
+from utils.extract_params import extract_params
+from utils.hotel_booking import HotelStayLookup, async_process_days_hotels
+
+
+def extract_budget_preference(message):
+    """Extract budget preference from user message"""
+    message_lower = message.lower()
+
+    # Check for specific price ranges
+    price_match = re.search(r"\$(\d+)", message)
+    if price_match:
+        price = int(price_match.group(1))
+        if price < 100:
+            return "budget"
+        elif price > 300:
+            return "luxury"
+        else:
+            return "mid-range"
+
+    # Check for budget keywords
+    budget_keywords = ["budget", "cheap", "affordable", "economical", "low cost"]
+    luxury_keywords = [
+        "luxury",
+        "expensive",
+        "premium",
+        "high-end",
+        "deluxe",
+        "upscale",
+    ]
+
+    if any(keyword in message_lower for keyword in budget_keywords):
+        return "budget"
+    elif any(keyword in message_lower for keyword in luxury_keywords):
+        return "luxury"
+
+    return "mid-range"  # Default to mid-range if no preference detected
+
+
+async def _noop_stage(stage: str) -> None:
+    return None
+
+
+async def run_itinerary_pipeline(
+    session_id: str,
+    summary: str,
+    user_message: str,
+    report_stage: Callable[[str], Awaitable[None]] = _noop_stage,
+) -> str:
+    """Turn a confirmed "Summary: ..." line into a stored itinerary.
+
+    Runs parameter extraction, flight lookups, day-by-day planning, hotel
+    lookups and the final write-up, then saves the result to the
+    `itineraries` table and queues it for the itinerary archive. Params and
+    flights come from the session's speculative prefetch when it predicted
+    this summary, and the day-by-day plan from the itinerary cache when the
+    same trip was planned before. `report_stage` is awaited with the name of
+    each step as it starts so callers can surface progress.
+
+    Returns the final itinerary text. Exceptions propagate to the caller.
+    """
+    logger.info(f"Generating itinerary for session {session_id}")
+
+    # Reuse the prefetch started when the assistant asked for confirmation
+    warm = await speculative_prefetch.claim(session_id, summary)
+
+    # Get required params
+    await report_stage("extracting_params")
+    params = warm["params"] if warm else await extract_params(summary)
+    logger.info(f"Extracted flight params: {params}")
+
+    # Get Flight details
+    await report_stage("fetching_flights")
+    flight_details = warm["flights"] if warm else await fetch_flights(params)
+
+    response_and_flight_details = {
+        "response": summary,
+        "flight_details": flight_details,
+    }
+
+    # Extract budget preference from user message
+    budget_preference = extract_budget_preference(user_message)
+
+    # Hotel searches start as each day of the plan streams in
+    hotel_lookup = HotelStayLookup(budget_preference)
+    on_day = hotel_lookup.add_day if settings.TRIP_PLANNER_STREAMING else None
+
+    # Searches started for streamed days must not outlive a failed plan
+    try:
+        # Generate a day-by-day itinerary (expected to return JSON only)
+        await report_stage("planning_itinerary")
+        itinerary_text = await itinerary_cache.get_or_plan(
+            summary,
+            params,
+            lambda: create_day_by_day_itinerary(
+                str(response_and_flight_details), on_day=on_day
+            ),
+        )
+
+        parsed = None
+        try:
+            parsed = json.loads(itinerary_text)
+        except Exception as je:
+            logger.error(f"Failed to parse itinerary JSON: {je}")
+
+        if parsed and isinstance(parsed, dict):
+            human_response = parsed.get("response", "")
+            days_map = parsed.get("days", {})
+        else:
+            # Fallback: treat whole output as human text
+            human_response = itinerary_text
+            days_map = {}
+
+        # hotel Booking
+        await report_stage("fetching_hotels")
+        booking_details = await async_process_days_hotels(
+            days_map, budget_preference, lookup=hotel_lookup
+        )
+    except BaseException:
+        hotel_lookup.cancel()
+        raise
+
+    # combine all details
+    await report_stage("composing_response")
+    final_response = await create_user_friendly_response(
+        trip_text=human_response, hotels_text=str(booking_details)
+    )
+
+    await report_stage("saving")
+    await itinerary_archive.archive(session_id, final_response)
+
+    async with async_session() as db:
+        # Save itinerary in DB (Itinerary table)
+        stmt = select(Itinerary).where(Itinerary.session_id == session_id)
+        result = await db.execute(stmt)
+        itinerary_obj = result.scalar_one_or_none()
+        if itinerary_obj:
+            itinerary_obj.itinerary = final_response
+        else:
+            itinerary_obj = Itinerary(session_id=session_id, itinerary=final_response)
+            db.add(itinerary_obj)
+
+        # Persist days mapping into session.trip_details for later hotel booking
+        stmt = select(Session).where(Session.session_id == session_id)
+        result = await db.execute(stmt)
+        session = result.scalar_one_or_none()
+        if session:
+            if not session.trip_details:
+                session.trip_details = {}
+            session.trip_details["days"] = days_map
+            flag_modified(session, "trip_details")
+
+        await db.commit()
+    logger.info(f"Itinerary saved to DB for session {session_id}")
+
+    return final_response
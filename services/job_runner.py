@@ -0,0 +1,199 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, update
+
+from core.config import settings
+from core.logging import logger
+from db.database import async_session
+from db.models import ItineraryJob
+from services.itinerary_pipeline import run_itinerary_pipeline
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class ItineraryJobRunner:
+    """In-process runner for the summary → itinerary pipeline.
+
+    Job state lives in the `itinerary_jobs` table so it survives restarts and
+    can be polled from any worker; the queue itself is an in-memory
+    `asyncio.Queue` drained by a fixed number of worker tasks.
+
+    A worker claims a job by flipping it from queued to running in a single
+    conditional UPDATE, so a job queued twice (or by two processes) runs
+    once. While it runs, the worker refreshes `updated_at` as a lease; a
+    running job whose lease is older than `lease` seconds is treated as
+    orphaned and may be claimed again. Queued jobs are re-queued on start,
+    and jobs with an expired lease on start and every `lease` seconds.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.ITINERARY_JOB_WORKERS,
+        lease: float = settings.ITINERARY_JOB_LEASE_SECONDS,
+    ):
+        self.workers = max(1, workers)
+        self.lease = lease
+        self._queue: asyncio.Queue[str] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"itinerary-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweep(), name="itinerary-job-sweeper"))
+        try:
+            await self._recover()
+        except Exception as e:
+            logger.error(f"Failed to recover pending itinerary jobs: {e}")
+        logger.info(f"Itinerary job runner started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, session_id: str, summary: str, user_message: str) -> str:
+        """Persist a new job and queue it. Returns the job id."""
+        job_id = uuid.uuid4().hex
+        async with async_session() as db:
+            db.add(
+                ItineraryJob(
+                    job_id=job_id,
+                    session_id=session_id,
+                    status=JOB_QUEUED,
+                    payload={"summary": summary, "message": user_message},
+                )
+            )
+            await db.commit()
+        await self.start()
+        self._queue.put_nowait(job_id)
+        logger.info(f"Queued itinerary job {job_id} for session {session_id}")
+        return job_id
+
+    def _claimable(self, stale_only: bool = False):
+        """Filter for jobs no live worker holds: queued, or running past the lease."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease)
+        stale = ItineraryJob.updated_at < cutoff
+        queued = ItineraryJob.status == JOB_QUEUED
+        if stale_only:
+            queued = and_(queued, stale)
+        return or_(queued, and_(ItineraryJob.status == JOB_RUNNING, stale))
+
+    async def _recover(self, stale_only: bool = False) -> None:
+        async with async_session() as db:
+            stmt = (
+                select(ItineraryJob.job_id)
+                .where(self._claimable(stale_only))
+                .order_by(ItineraryJob.created_at)
+            )
+            result = await db.execute(stmt)
+            job_ids = result.scalars().all()
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        if job_ids:
+            logger.info(f"Re-queued {len(job_ids)} unfinished itinerary jobs")
+
+    async def _sweep(self) -> None:
+        """Periodically re-queue jobs whose worker went away."""
+        while True:
+            await asyncio.sleep(self.lease)
+            try:
+                await self._recover(stale_only=True)
+            except Exception as e:
+                logger.error(f"Failed to recover orphaned itinerary jobs: {e}")
+
+    async def _set(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = datetime.utcnow()
+        async with async_session() as db:
+            await db.execute(
+                update(ItineraryJob)
+                .where(ItineraryJob.job_id == job_id)
+                .values(**fields)
+            )
+            await db.commit()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Itinerary job worker {index} crashed on {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, job_id: str) -> Optional[ItineraryJob]:
+        """Mark the job running if nobody else holds it; None if taken or done."""
+        async with async_session() as db:
+            result = await db.execute(
+                update(ItineraryJob)
+                .where(ItineraryJob.job_id == job_id, self._claimable())
+                .values(
+                    status=JOB_RUNNING,
+                    stage="starting",
+                    error=None,
+                    updated_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount != 1:
+                return None
+            return await db.get(ItineraryJob, job_id)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self._set(job_id)
+            except Exception as e:
+                logger.warning(f"Failed to renew the lease on itinerary job {job_id}: {e}")
+
+    async def _run(self, job_id: str) -> None:
+        job = await self._claim(job_id)
+        if job is None:
+            return
+        session_id = job.session_id
+        payload = dict(job.payload or {})
+
+        async def report_stage(stage: str) -> None:
+            await self._set(job_id, stage=stage)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await run_itinerary_pipeline(
+                session_id,
+                payload.get("summary", ""),
+                payload.get("message", ""),
+                report_stage=report_stage,
+            )
+        except Exception as e:
+            logger.error(f"Itinerary job {job_id} failed: {e}")
+            await self._set(job_id, status=JOB_FAILED, error=str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self._set(job_id, status=JOB_SUCCEEDED, stage="done")
+        logger.info(f"Itinerary job {job_id} finished for session {session_id}")
+
+
+job_runner = ItineraryJobRunner()
@@ -0,0 +1,91 @@
+from typing import Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from core.config import settings
+from core.logging import logger
+from services import resilience
+from services.metrics import timed
+
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def _build_client() -> AsyncOpenAI:
+    logger.info(
+        f"Creating OpenAI client (max_connections={settings.OPENAI_MAX_CONNECTIONS}, "
+        f"timeout={settings.OPENAI_TIMEOUT}s, max_retries={settings.OPENAI_MAX_RETRIES})"
+    )
+    timeout = httpx.Timeout(
+        settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT
+    )
+    http_client = DefaultAsyncHttpxClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=timeout,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+
+def init_llm_client() -> AsyncOpenAI:
+    """Create the process-wide client. Called once from the FastAPI lifespan."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Return the shared client, creating it lazily outside the app (scripts, tests)."""
+    return _client if _client is not None else init_llm_client()
+
+
+async def close_llm_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def is_retryable_llm_error(exc: BaseException) -> bool:
+    """Connection problems, timeouts, rate limits and 5xx are worth retrying."""
+    if isinstance(exc, (openai.APIConnectionError, openai.RateLimitError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def _llm_outage(exc: BaseException) -> bool:
+    """Rate limits are retried but do not count against the circuit."""
+    return not isinstance(exc, openai.RateLimitError)
+
+
+async def create_chat_completion(**kwargs):
+    """`chat.completions.create` on the shared client, made resilient.
+
+    Retried with backoff behind the "openai" circuit breaker (rate limits
+    are retried without tripping it); non-streaming calls are also hedged
+    when `LLM_HEDGE_ENABLED` is set. Raises the last OpenAI error, or
+    `resilience.CircuitOpenError` while the circuit is open.
+
+    Recorded as the "llm_request" stage. For `stream=True` that covers
+    opening the stream (time to first byte) only; token delivery is timed
+    by the caller's own stage (`stream_ai_response`, the trip planner).
+    """
+    with timed("llm_request"):
+        return await resilience.call(
+            resilience.get_provider("openai"),
+            lambda: get_llm_client().chat.completions.create(**kwargs),
+            retryable=is_retryable_llm_error,
+            hedge=not kwargs.get("stream", False),
+            counts_as_failure=_llm_outage,
+        )
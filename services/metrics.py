@@ -0,0 +1,247 @@
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Seconds; spans a cached lookup (~1 ms) to a slow trip planner call (~2 min)
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, object] = {}
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; `observe` is a lock, a bisect and 3 adds."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket counts (+Inf last), sum, count
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, *labels) -> Optional[dict]:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                return None
+            return {"count": series[2], "sum": series[1], "buckets": list(series[0])}
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(
+                (k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()
+            )
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+def samples(name: str, help: str, kind: str, values: Iterable[Tuple[dict, float]]) -> list:
+    """Exposition lines for a collector: `values` is [(labels, value), ...]."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in values:
+        lines.append(
+            f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}"
+        )
+    return lines
+
+
+class Registry:
+    """Metrics plus collectors called at scrape time for derived values."""
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], list]) -> Callable[[], list]:
+        """Register `fn() -> [lines]` to be rendered on every scrape."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            lines.extend(fn())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.register(
+    Histogram(
+        "zoomzoot_stage_duration_seconds",
+        "Latency of each pipeline stage.",
+        ("stage", "outcome"),
+    )
+)
+stage_in_flight = registry.register(
+    Gauge("zoomzoot_stage_in_flight", "Stage calls currently running.", ("stage",))
+)
+http_seconds = registry.register(
+    Histogram(
+        "zoomzoot_http_request_duration_seconds",
+        "Latency of API requests by route, method and status.",
+        ("route", "method", "status"),
+    )
+)
+http_in_flight = registry.register(
+    Gauge("zoomzoot_http_requests_in_flight", "API requests currently being served.")
+)
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the block's latency and outcome under `stage`."""
+    stage_in_flight.inc(stage)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        stage_seconds.observe(time.perf_counter() - started, stage, outcome)
+        stage_in_flight.dec(stage)
+
+
+def track(stage: str):
+    """Decorator form of `timed` for sync and async functions."""
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timed(stage):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and in-flight requests.
+
+    Requests are labelled by route template (`/api/v1/itinerary/{session_id}`),
+    never by raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_seconds.observe(
+                time.perf_counter() - started,
+                getattr(route, "path", "unmatched"),
+                scope.get("method", ""),
+                status[0],
+            )
+            http_in_flight.dec()
@@ -0,0 +1,380 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from typing import Optional
+
+from reportlab.lib.colors import HexColor, white
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from core.config import settings
+from core.logging import logger
+from services.metrics import timed
+from services.result_cache import MemoryBackend, ResultCache
+from utils.itinerary_tokenizer import tokenize_itinerary
+
+_INDENT = "&nbsp;"
+PERIOD_LABELS = {
+    "morning": ("🌅", "Morning"),
+    "afternoon": ("☀️", "Afternoon"),
+    "evening": ("🌆", "Evening"),
+}
+
+
+def _build_styles() -> dict:
+    """Colors and paragraph styles shared by every render in this process."""
+    # Define beautiful color scheme
+    brand_blue = HexColor("#0066cc")
+    dark_blue = HexColor("#003d7a")
+    light_blue = HexColor("#e6f2ff")
+    dark_gray = HexColor("#2c3e50")
+    medium_gray = HexColor("#7f8c8d")
+    light_gray = HexColor("#f8f9fa")
+    success_green = HexColor("#27ae60")
+
+    # Create elegant styles
+    styles = getSampleStyleSheet()
+
+    # Brand title style
+    brand_title_style = ParagraphStyle(
+        "BrandTitle",
+        parent=styles["Title"],
+        fontSize=28,
+        textColor=brand_blue,
+        spaceAfter=10,
+        alignment=TA_CENTER,
+        fontName="Helvetica-Bold",
+        letterSpacing=2,
+    )
+
+    # Elegant subtitle
+    elegant_subtitle_style = ParagraphStyle(
+        "ElegantSubtitle",
+        parent=styles["Normal"],
+        fontSize=14,
+        textColor=medium_gray,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName="Helvetica-Oblique",
+    )
+
+    # Section title style
+    section_title_style = ParagraphStyle(
+        "SectionTitle",
+        parent=styles["Heading1"],
+        fontSize=18,
+        textColor=dark_blue,
+        spaceAfter=15,
+        spaceBefore=25,
+        fontName="Helvetica-Bold",
+        borderWidth=0,
+        borderPadding=0,
+    )
+
+    # Day title style
+    day_title_style = ParagraphStyle(
+        "DayTitle",
+        parent=styles["Heading2"],
+        fontSize=16,
+        textColor=white,
+        spaceAfter=12,
+        spaceBefore=20,
+        fontName="Helvetica-Bold",
+        backColor=brand_blue,
+        borderPadding=12,
+        borderRadius=8,
+    )
+
+    # Activity text style
+    activity_text_style = ParagraphStyle(
+        "ActivityText",
+        parent=styles["Normal"],
+        fontSize=11,
+        textColor=dark_gray,
+        spaceAfter=8,
+        leftIndent=25,
+        fontName="Helvetica",
+        leading=18,
+        bulletIndent=15,
+    )
+
+    # Link style
+    link_style = ParagraphStyle(
+        "LinkStyle",
+        parent=styles["Normal"],
+        fontSize=11,
+        textColor=success_green,
+        spaceAfter=12,
+        leftIndent=25,
+        fontName="Helvetica-Bold",
+    )
+
+    # Summary text style
+    summary_text_style = ParagraphStyle(
+        "SummaryText",
+        parent=styles["Normal"],
+        fontSize=12,
+        textColor=dark_gray,
+        spaceAfter=15,
+        fontName="Helvetica",
+        alignment=TA_JUSTIFY,
+        leading=20,
+        borderPadding=15,
+        backColor=light_gray,
+        borderRadius=5,
+    )
+
+    footer_style = ParagraphStyle(
+        "Footer",
+        parent=styles["Normal"],
+        fontSize=11,
+        textColor=medium_gray,
+        alignment=TA_CENTER,
+        fontName="Helvetica",
+        spaceAfter=8,
+    )
+
+    return {
+        "brand_blue": brand_blue,
+        "light_blue": light_blue,
+        "dark_blue": dark_blue,
+        "dark_gray": dark_gray,
+        "light_gray": light_gray,
+        "brand_title": brand_title_style,
+        "elegant_subtitle": elegant_subtitle_style,
+        "section_title": section_title_style,
+        "day_title": day_title_style,
+        "activity_text": activity_text_style,
+        "link": link_style,
+        "summary_text": summary_text_style,
+        "footer": footer_style,
+    }
+
+
+_styles = None
+
+
+def _get_styles() -> dict:
+    """Build the style sheet once per process (each pool worker has its own)."""
+    global _styles
+    if _styles is None:
+        _styles = _build_styles()
+    return _styles
+
+
+def render_itinerary_pdf(itinerary_text: str, session_id: str) -> bytes:
+    """Generate a beautiful, professional PDF from itinerary text
+
+    CPU-bound; `PdfRenderer` runs it in a worker process.
+    """
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        topMargin=1 * inch,
+        bottomMargin=1 * inch,
+        leftMargin=0.75 * inch,
+        rightMargin=0.75 * inch,
+    )
+
+    s = _get_styles()
+    brand_blue = s["brand_blue"]
+    light_blue = s["light_blue"]
+    dark_blue = s["dark_blue"]
+    dark_gray = s["dark_gray"]
+    light_gray = s["light_gray"]
+    brand_title_style = s["brand_title"]
+    elegant_subtitle_style = s["elegant_subtitle"]
+    section_title_style = s["section_title"]
+    day_title_style = s["day_title"]
+    activity_text_style = s["activity_text"]
+    link_style = s["link"]
+    footer_style = s["footer"]
+
+    # Build beautiful PDF content
+    story = []
+
+    # Beautiful header
+    story.append(Paragraph("ZOOMZOOT", brand_title_style))
+    story.append(
+        Paragraph("Your Personalized Travel Itinerary", elegant_subtitle_style)
+    )
+
+    # Elegant divider line (using table)
+    divider_table = Table([[""], [""]], colWidths=[6.5 * inch], rowHeights=[2, 2])
+    divider_table.setStyle(
+        TableStyle(
+            [
+                ("LINEBELOW", (0, 0), (-1, 0), 2, brand_blue),
+                ("LINEBELOW", (0, 1), (-1, 1), 1, light_blue),
+            ]
+        )
+    )
+    story.append(divider_table)
+    story.append(Spacer(1, 20))
+
+    # Document info in elegant table
+    info_data = [
+        ["Session ID", session_id],
+        ["Generated", datetime.now().strftime("%B %d, %Y at %I:%M %p")],
+    ]
+
+    info_table = Table(info_data, colWidths=[2 * inch, 4.5 * inch])
+    info_table.setStyle(
+        TableStyle(
+            [
+                ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+                ("FONTSIZE", (0, 0), (-1, -1), 11),
+                ("TEXTCOLOR", (0, 0), (0, -1), dark_blue),
+                ("TEXTCOLOR", (1, 0), (1, -1), dark_gray),
+                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("ROWBACKGROUNDS", (0, 0), (-1, -1), [light_gray, white]),
+                ("GRID", (0, 0), (-1, -1), 0.5, HexColor("#dee2e6")),
+                ("PADDING", (0, 0), (-1, -1), 12),
+            ]
+        )
+    )
+
+    story.append(info_table)
+    story.append(Spacer(1, 30))
+
+    # Parse the itinerary data (handle both JSON and text formats)
+    try:
+        # Try to parse as JSON first (from trip planner)
+        itinerary_data = json.loads(itinerary_text)
+        response_text = itinerary_data.get("response", itinerary_text)
+    except json.JSONDecodeError:
+        # If not JSON, treat as plain text
+        response_text = itinerary_text
+
+    # Add formatted content to story with proper spacing and indentation
+    for node in tokenize_itinerary(response_text):
+        kind = node.kind
+        if kind == "section":
+            story.append(Spacer(1, 15))  # Space before section
+            story.append(Paragraph(node.content, section_title_style))
+            story.append(Spacer(1, 10))  # Space after section
+        elif kind == "day":
+            story.append(Spacer(1, 20))  # Extra space before new day
+            story.append(Paragraph(f"📅 {node.content}", day_title_style))
+            story.append(Spacer(1, 13))  # Space after day title
+        elif kind == "link":
+            # Extra indentation for booking links
+            indented_content = f"{_INDENT * 8}{node.content}"
+            story.append(Paragraph(indented_content, link_style))
+            story.append(Spacer(1, 8))  # More space after links
+        else:
+            if kind == "time_of_day":
+                icon, label = PERIOD_LABELS[node.period]
+                content = f"{icon} <b>{label}:</b> {node.content}"
+            elif kind == "stay":
+                content = f"🏨 {node.content}"
+            else:
+                content = node.content
+            # Add left margin for better visual hierarchy
+            story.append(Paragraph(f"{_INDENT * 4}{content}", activity_text_style))
+            story.append(Spacer(1, 5))  # Small space between activities
+
+    # Beautiful footer
+    story.append(Spacer(1, 50))
+
+    footer_divider = Table([[""], [""]], colWidths=[6.5 * inch], rowHeights=[1, 1])
+    footer_divider.setStyle(
+        TableStyle(
+            [
+                ("LINEABOVE", (0, 0), (-1, 0), 1, light_blue),
+                ("LINEABOVE", (0, 1), (-1, 1), 2, brand_blue),
+            ]
+        )
+    )
+    story.append(footer_divider)
+    story.append(Spacer(1, 20))
+
+    story.append(Paragraph("<b>Thank you for choosing ZoomZoot!</b>", footer_style))
+    story.append(Paragraph("For support and inquiries: www.zoomzoot.com", footer_style))
+
+    # Build the PDF
+    doc.build(story)
+
+    pdf_value = buffer.getvalue()
+    buffer.close()
+    return pdf_value
+
+
+def pdf_cache_key(itinerary_text: str, session_id: str) -> str:
+    """Content hash identifying a rendered PDF (also usable as an ETag)."""
+    digest = hashlib.sha256()
+    digest.update(session_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(itinerary_text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _init_worker() -> None:
+    _get_styles()
+
+
+class PdfRenderer:
+    """Renders itinerary PDFs off the event loop, caching bytes by content hash.
+
+    Renders run in a small process pool so reportlab's CPU-bound layout never
+    blocks request handling; with `workers=0` they run in the default thread
+    pool instead. Concurrent requests for the same itinerary share one render.
+    """
+
+    def __init__(self, workers: int, cache: ResultCache):
+        self.workers = workers
+        self.cache = cache
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._pool is None and self.workers > 0:
+            logger.info(f"Starting PDF render pool with {self.workers} workers")
+            # spawn: forking a process that holds an event loop and open
+            # connections is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+
+    def stop(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def render(self, itinerary_text: str, session_id: str) -> bytes:
+        key = pdf_cache_key(itinerary_text, session_id)
+
+        async def _render():
+            started = datetime.now()
+            with timed("pdf_render"):
+                pdf = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, render_itinerary_pdf, itinerary_text, session_id
+                )
+            elapsed = (datetime.now() - started).total_seconds()
+            logger.info(f"Rendered PDF for {session_id} in {elapsed:.2f}s")
+            return pdf
+
+        if self._pool is None:
+            self.start()
+        return await self.cache.get_or_load(key, _render)
+
+
+pdf_renderer = PdfRenderer(
+    workers=settings.PDF_RENDER_WORKERS,
+    cache=ResultCache(
+        "pdf",
+        MemoryBackend(maxsize=settings.PDF_CACHE_MAXSIZE, ttl=settings.PDF_CACHE_TTL),
+    ),
+)
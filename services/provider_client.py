@@ -0,0 +1,166 @@
+import importlib.util
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+from core.config import settings
+from core.logging import logger
+from services import resilience
+from services.metrics import timed
+from services.rate_limiter import get_bucket
+
+# httpx speaks HTTP/2 only when `h2` is installed (it is in requirements.txt)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.PROVIDER_HTTP2 and HTTP2_AVAILABLE
+    logger.info(
+        f"Creating provider HTTP client (http2={http2}, "
+        f"max_connections={settings.PROVIDER_MAX_CONNECTIONS})"
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(
+            settings.PROVIDER_TIMEOUT, connect=settings.PROVIDER_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PROVIDER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PROVIDER_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_provider_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_provider_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def provider_name(url: str) -> str:
+    """Circuit breaker name for a provider URL: "hotellook", "travelpayouts", ..."""
+    host = urlsplit(url).hostname or ""
+    for name in ("hotellook", "travelpayouts", "aviasales"):
+        if name in host:
+            return name
+    return host
+
+
+def _is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after(response) -> float:
+    """Seconds to back off after a 429, from its Retry-After header."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return settings.RETRY_BASE_DELAY
+
+
+def _retryable_http_error(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return _is_transient_status(exc.response.status_code)
+    return isinstance(exc, httpx.TransportError)
+
+
+def _provider_fault(exc: BaseException) -> bool:
+    """False for a 429: the rate limiter backs off, the circuit stays as it is."""
+    response = getattr(exc, "response", None)
+    return response is None or response.status_code != 429
+
+
+def _retryable_requests_error(exc: BaseException) -> bool:
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and _is_transient_status(
+            exc.response.status_code
+        )
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+async def provider_get_json(
+    url: str, params: Optional[dict] = None, timeout: Optional[float] = None
+) -> Any:
+    """GET `url` on the shared client and decode the JSON body.
+
+    `None` values are dropped from `params`. `timeout` overrides the client
+    default for this call only. Every attempt first takes a token from the
+    provider's rate limiter (services/rate_limiter.py), and a 429 pauses that
+    limiter for the response's Retry-After; a call that would queue longer
+    than PROVIDER_RATE_MAX_WAIT raises `RateLimitTimeout`. Transport errors,
+    429s and 5xx responses are retried with backoff behind the provider's
+    circuit breaker, which only counts the transport errors and 5xx (a 429
+    is left to the limiter); once retries are exhausted they propagate as
+    `httpx.HTTPError`, and an open circuit raises
+    `resilience.CircuitOpenError` without calling out.
+    """
+    clean_params = {k: v for k, v in (params or {}).items() if v is not None}
+    kwargs = {}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    name = provider_name(url)
+    bucket = get_bucket(name)
+
+    async def _get():
+        await bucket.acquire()
+        with timed(f"{name}_request"):
+            response = await get_provider_client().get(
+                url, params=clean_params, **kwargs
+            )
+        if response.status_code == 429:
+            bucket.throttle(_retry_after(response))
+        if _is_transient_status(response.status_code):
+            response.raise_for_status()
+        return response.json()
+
+    return await resilience.call(
+        resilience.get_provider(name),
+        _get,
+        retryable=_retryable_http_error,
+        hedge=False,
+        counts_as_failure=_provider_fault,
+    )
+
+
+def provider_get_json_sync(
+    url: str, params: Optional[dict] = None, timeout: Optional[float] = None
+) -> Any:
+    """Blocking `provider_get_json` (requests), sharing its breakers and limiters."""
+    clean_params = {k: v for k, v in (params or {}).items() if v is not None}
+    name = provider_name(url)
+    bucket = get_bucket(name)
+
+    def _get():
+        bucket.acquire_sync()
+        with timed(f"{name}_request"):
+            response = requests.get(
+                url, params=clean_params, timeout=timeout or settings.PROVIDER_TIMEOUT
+            )
+        if response.status_code == 429:
+            bucket.throttle(_retry_after(response))
+        if _is_transient_status(response.status_code):
+            response.raise_for_status()
+        return response.json()
+
+    return resilience.call_sync(
+        resilience.get_provider(name),
+        _get,
+        retryable=_retryable_requests_error,
+        counts_as_failure=_provider_fault,
+    )
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from core.config import settings
+from core.logging import logger
+from services.metrics import registry, samples
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call would wait longer than its deadline for a token."""
+
+    def __init__(self, provider: str, wait: float):
+        super().__init__(f"{provider} rate limit: next slot in {wait:.1f}s")
+        self.provider = provider
+        self.wait = wait
+
+
+class TokenBucket:
+    """Token bucket of `rate` calls/second with room for `burst` at once.
+
+    Callers reserve the next free slot under a lock and then sleep until it,
+    so waiters are served strictly in arrival order (FIFO) and never spin.
+    A caller whose slot is further away than its deadline is rejected
+    without reserving anything. `throttle()` pushes every slot back when the
+    provider answers 429. Usable from the event loop (`acquire`) and from
+    blocking code on any thread (`acquire_sync`) at the same time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int = 1,
+        max_wait: Optional[float] = None,
+        timer=time.monotonic,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_wait = max_wait
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        # Time at which the bucket is empty again (GCRA "theoretical arrival")
+        self._next_free = 0.0
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_observed_wait = 0.0
+
+    def _reserve(self, max_wait: Optional[float]) -> float:
+        """Reserve a slot and return how long to sleep before using it."""
+        return self._take(max_wait)[0]
+
+    def _take(self, max_wait: Optional[float]) -> tuple:
+        """`_reserve`, also returning the bucket's tail after this slot."""
+        if self._interval == 0.0:
+            with self._lock:
+                self.acquired += 1
+            return 0.0, 0.0
+        with self._lock:
+            now = self._timer()
+            start = max(now, self._next_free)
+            # Up to `burst` calls may start before their nominal slot
+            wait = max(0.0, start - now - (self.burst - 1) * self._interval)
+            if max_wait is not None and wait > max_wait:
+                self.rejected += 1
+                raise RateLimitTimeout(self.name, wait)
+            self._next_free = start + self._interval
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_observed_wait = max(self.max_observed_wait, wait)
+            return wait, self._next_free
+
+    def _give_back(self, tail: float, wait: float) -> None:
+        """Return an unused slot if no later caller has queued behind it."""
+        with self._lock:
+            if self._next_free == tail:
+                self._next_free -= self._interval
+                self.acquired -= 1
+                self.total_wait -= wait
+
+    def _deadline(self, max_wait: Optional[float]) -> Optional[float]:
+        return self.max_wait if max_wait is None else max_wait
+
+    async def acquire(self, max_wait: Optional[float] = None) -> float:
+        """Wait for a token; return the seconds waited.
+
+        A caller cancelled while waiting gives its slot back when nobody
+        queued behind it, so later callers do not wait for it.
+        """
+        wait, tail = self._take(self._deadline(max_wait))
+        if wait > 0:
+            self._track(1)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._give_back(tail, wait)
+                raise
+            finally:
+                self._track(-1)
+        return wait
+
+    def acquire_sync(self, max_wait: Optional[float] = None) -> float:
+        """Blocking `acquire` for the sync provider helpers."""
+        wait = self._reserve(self._deadline(max_wait))
+        if wait > 0:
+            self._track(1)
+            try:
+                time.sleep(wait)
+            finally:
+                self._track(-1)
+        return wait
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            self.waiting += delta
+
+    def throttle(self, seconds: float) -> None:
+        """Hold back every new call for `seconds` (e.g. a 429's Retry-After)."""
+        if self._interval == 0.0:
+            return
+        with self._lock:
+            resume = self._timer() + seconds + (self.burst - 1) * self._interval
+            if resume > self._next_free:
+                self._next_free = resume
+            self.throttled += 1
+        logger.info(f"{self.name} rate limited upstream; pausing for {seconds:.1f}s")
+
+    def stats(self) -> dict:
+        with self._lock:
+            backlog = max(0.0, self._next_free - self._timer())
+            return {
+                "name": self.name,
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "queue_depth": self.waiting,
+                "current_wait_seconds": max(
+                    0.0, backlog - (self.burst - 1) * self._interval
+                ),
+                "acquired": self.acquired,
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+                "avg_wait_seconds": self.total_wait / self.acquired if self.acquired else 0.0,
+                "max_wait_seconds": self.max_observed_wait,
+            }
+
+
+_buckets: dict = {}
+_buckets_lock = threading.Lock()
+
+
+def _configured_rate(name: str) -> float:
+    return {
+        "travelpayouts": settings.TRAVELPAYOUTS_RATE_LIMIT,
+        "hotellook": settings.HOTELLOOK_RATE_LIMIT,
+    }.get(name, 0.0)
+
+
+def get_bucket(name: str) -> TokenBucket:
+    """The process-wide `TokenBucket` for provider `name` (0 rate = unlimited)."""
+    bucket = _buckets.get(name)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(name)
+            if bucket is None:
+                bucket = TokenBucket(
+                    name,
+                    _configured_rate(name),
+                    settings.PROVIDER_RATE_BURST,
+                    settings.PROVIDER_RATE_MAX_WAIT,
+                )
+                _buckets[name] = bucket
+    return bucket
+
+
+def rate_limit_stats() -> list:
+    return [bucket.stats() for bucket in _buckets.values()]
+
+
+@registry.collector
+def _rate_limit_metrics() -> list:
+    buckets = list(_buckets.values())
+    return samples(
+        "zoomzoot_rate_limit_queue_depth",
+        "Calls waiting for a provider rate limit token.",
+        "gauge",
+        [({"provider": b.name}, b.waiting) for b in buckets],
+    ) + samples(
+        "zoomzoot_rate_limit_wait_seconds_total",
+        "Time calls spent queued for a provider rate limit token.",
+        "counter",
+        [({"provider": b.name}, b.total_wait) for b in buckets],
+    )
@@ -0,0 +1,354 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from core.config import settings
+from core.logging import logger
+from services.metrics import registry, samples
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(
+            f"{provider} is unavailable (circuit open, retry in {retry_after:.0f}s)"
+        )
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep U(0, min(cap, base * 2**n))."""
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class CircuitBreaker:
+    """Per-provider breaker: closed → open after N straight failures → half-open.
+
+    While open, calls fail fast with `CircuitOpenError`. After `reset_timeout`
+    up to `half_open_probes` calls are let through; a success closes the
+    circuit and a failure re-opens it. A probe that ends in neither (it was
+    cancelled, or failed with an error that does not count) gives its slot
+    back through `release`. Guarded by a lock so `call_sync` can share a
+    breaker with the event loop from any thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_probes: int = 1,
+        timer=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = max(1, half_open_probes)
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._timer() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """Admit a call or raise `CircuitOpenError`."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+            retry_after = max(0.0, self.reset_timeout - (self._timer() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def release(self) -> None:
+        """Return a half-open probe slot for a call with no verdict."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != OPEN:
+                    logger.error(
+                        f"Circuit for {self.name} opened after {self._failures} failures"
+                    )
+                self._state = OPEN
+                self._opened_at = self._timer()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+            }
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies, for the hedging delay."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Provider:
+    """Resilience settings and state for one upstream (openai, hotellook, ...)."""
+
+    def __init__(
+        self,
+        name: str,
+        retry: RetryPolicy,
+        breaker: CircuitBreaker,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.0,
+        hedge_min_samples: int = 20,
+    ):
+        self.name = name
+        self.retry = retry
+        self.breaker = breaker
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedged = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before sending a duplicate, or None to not hedge."""
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.quantile(self.hedge_quantile))
+
+    def stats(self) -> dict:
+        p95 = self.latency.quantile(0.95)
+        return {
+            **self.breaker.stats(),
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedged": self.hedged,
+            "p95_seconds": p95,
+        }
+
+
+def _always(exc: BaseException) -> bool:
+    return True
+
+
+async def _hedged(fn: Callable[[], Awaitable[Any]], delay: float, provider: Provider):
+    """Run `fn`; if it has not finished after `delay`, race a second copy."""
+    first = asyncio.ensure_future(fn())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    provider.hedged += 1
+    logger.info(f"Hedging slow {provider.name} call after {delay:.2f}s")
+    pending = {first, asyncio.ensure_future(fn())}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call(
+    provider: Provider,
+    fn: Callable[[], Awaitable[Any]],
+    retryable: Callable[[BaseException], bool] = _always,
+    hedge: bool = True,
+    counts_as_failure: Callable[[BaseException], bool] = _always,
+) -> Any:
+    """Await `fn()` with `provider`'s breaker, retries and (optional) hedging.
+
+    Only exceptions for which `retryable(exc)` holds are retried and count
+    against the circuit; others (bad requests, auth) propagate at once and,
+    like cancellation, leave the circuit as it was. Retryable errors for
+    which `counts_as_failure(exc)` is false (rate limiting: the provider is
+    up, just busy) are retried without counting against the circuit.
+    Pass `hedge=False` for calls that must not be duplicated (streams).
+    """
+    provider.calls += 1
+    for attempt in range(provider.retry.attempts):
+        provider.breaker.before_call()
+        delay = provider.hedge_delay() if hedge else None
+        started = time.monotonic()
+        try:
+            if delay is None:
+                result = await fn()
+            else:
+                result = await _hedged(fn, delay, provider)
+        except Exception as e:
+            if not retryable(e):
+                provider.breaker.release()
+                raise
+            if counts_as_failure(e):
+                provider.breaker.record_failure()
+            else:
+                provider.breaker.release()
+            if attempt + 1 >= provider.retry.attempts:
+                provider.failures += 1
+                raise
+            provider.retries += 1
+            backoff = provider.retry.delay(attempt)
+            logger.info(
+                f"{provider.name} call failed ({e!r}); retry {attempt + 1} in {backoff:.2f}s"
+            )
+            await asyncio.sleep(backoff)
+            continue
+        except BaseException:  # Cancelled: no verdict on the provider
+            provider.breaker.release()
+            raise
+        provider.breaker.record_success()
+        provider.latency.record(time.monotonic() - started)
+        return result
+
+
+def call_sync(
+    provider: Provider,
+    fn: Callable[[], Any],
+    retryable: Callable[[BaseException], bool] = _always,
+    counts_as_failure: Callable[[BaseException], bool] = _always,
+) -> Any:
+    """Blocking `call` for the sync helpers (no hedging)."""
+    provider.calls += 1
+    for attempt in range(provider.retry.attempts):
+        provider.breaker.before_call()
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            if not retryable(e):
+                provider.breaker.release()
+                raise
+            if counts_as_failure(e):
+                provider.breaker.record_failure()
+            else:
+                provider.breaker.release()
+            if attempt + 1 >= provider.retry.attempts:
+                provider.failures += 1
+                raise
+            provider.retries += 1
+            time.sleep(provider.retry.delay(attempt))
+            continue
+        except BaseException:
+            provider.breaker.release()
+            raise
+        provider.breaker.record_success()
+        provider.latency.record(time.monotonic() - started)
+        return result
+
+
+_providers: dict = {}
+
+
+def get_provider(name: str) -> Provider:
+    """The process-wide `Provider` for `name`, configured from `Settings`."""
+    provider = _providers.get(name)
+    if provider is None:
+        is_llm = name == "openai"
+        provider = Provider(
+            name,
+            RetryPolicy(
+                settings.LLM_RETRY_ATTEMPTS if is_llm else settings.PROVIDER_RETRY_ATTEMPTS,
+                settings.RETRY_BASE_DELAY,
+                settings.RETRY_MAX_DELAY,
+            ),
+            CircuitBreaker(
+                name,
+                settings.CIRCUIT_FAILURE_THRESHOLD,
+                settings.CIRCUIT_RESET_TIMEOUT,
+                settings.CIRCUIT_HALF_OPEN_PROBES,
+            ),
+            hedge=is_llm and settings.LLM_HEDGE_ENABLED,
+            hedge_quantile=settings.LLM_HEDGE_QUANTILE,
+            hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY,
+            hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        )
+        _providers[name] = provider
+    return provider
+
+
+def provider_stats() -> list:
+    return [provider.stats() for provider in _providers.values()]
+
+
+@registry.collector
+def _provider_metrics() -> list:
+    stats = provider_stats()
+    return samples(
+        "zoomzoot_circuit_open",
+        "1 while a provider's circuit breaker is not closed.",
+        "gauge",
+        [({"provider": s["name"]}, int(s["state"] != CLOSED)) for s in stats],
+    ) + samples(
+        "zoomzoot_provider_retries_total",
+        "Retried provider calls.",
+        "counter",
+        [({"provider": s["name"]}, s["retries"]) for s in stats],
+    )
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Hashable, Optional, Protocol, Tuple
+
+from cachetools import TTLCache
+
+from core.logging import logger
+from services.metrics import registry, samples
+
+
+MISSING = object()
+
+
+class CacheBackend(Protocol):
+    """Storage behind a `ResultCache`; swap in a shared store by implementing this."""
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or `MISSING` when absent or expired."""
+
+    def set(self, key: Hashable, value: Any) -> None: ...
+
+    def delete(self, key: Hashable) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class MemoryBackend:
+    """Per-process LRU with a per-entry TTL (cachetools.TTLCache)."""
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        # TTLCache is not thread-safe; the lock lets blocking callers use it
+        # from any thread alongside the event loop
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            return self._cache.get(key, MISSING)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+_caches = weakref.WeakSet()
+
+
+class ResultCache:
+    """Named cache of provider results with hit/miss counters."""
+
+    def __init__(self, name: str, backend: CacheBackend):
+        self.name = name
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}
+        _caches.add(self)
+
+    def get(self, key: Hashable, *aliases: Hashable) -> Tuple[bool, Optional[Any]]:
+        """`(True, value)` for the first of `key, *aliases` that is cached.
+
+        Counts one hit or miss however many keys are probed.
+        """
+        for k in (key, *aliases):
+            value = self.backend.get(k)
+            if value is not MISSING:
+                self.hits += 1
+                return True, value
+        self.misses += 1
+        return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.backend.set(key, value)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = bool,
+        aliases: Tuple[Hashable, ...] = (),
+    ) -> Any:
+        """Return the cached value, or load it once however many callers ask.
+
+        `aliases` are other keys that may hold the same value; they are
+        looked up too, as one hit or miss. Concurrent misses on the same key
+        share a single `loader()` call (single-flight); its result is stored
+        under `key` when `cacheable(result)` holds. Loader errors propagate
+        to every waiter and are not cached.
+        """
+        found, value = self.get(key, *aliases)
+        if found:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # A cancelled waiter must not cancel the load the others are sharing
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader, cacheable):
+        value = await loader()
+        if cacheable(value):
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+    def use_backend(self, backend: CacheBackend) -> None:
+        logger.info(f"{self.name} cache now using {type(backend).__name__}")
+        self.backend = backend
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@registry.collector
+def _cache_metrics() -> list:
+    totals = {}
+    for cache in list(_caches):
+        hits, misses, coalesced = totals.get(cache.name, (0, 0, 0))
+        totals[cache.name] = (
+            hits + cache.hits,
+            misses + cache.misses,
+            coalesced + cache.coalesced,
+        )
+    names = sorted(totals)
+    return (
+        samples(
+            "zoomzoot_cache_hits_total",
+            "Result cache hits.",
+            "counter",
+            [({"cache": n}, totals[n][0]) for n in names],
+        )
+        + samples(
+            "zoomzoot_cache_misses_total",
+            "Result cache misses.",
+            "counter",
+            [({"cache": n}, totals[n][1]) for n in names],
+        )
+        + samples(
+            "zoomzoot_cache_coalesced_total",
+            "Cache misses that joined a load already in flight.",
+            "counter",
+            [({"cache": n}, totals[n][2]) for n in names],
+        )
+        + samples(
+            "zoomzoot_cache_hit_ratio",
+            "Hits over lookups since start.",
+            "gauge",
+            [
+                ({"cache": n}, totals[n][0] / (totals[n][0] + totals[n][1]))
+                for n in names
+                if totals[n][0] + totals[n][1]
+            ],
+        )
+    )
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Optional
+
+from core.config import settings
+from core.logging import logger
+from services.metrics import registry, samples
+from services.ai_services import predict_ai_response
+from utils.extract_params import extract_params
+from utils.flight_booking import async_get_cheapest_flight, async_get_multiple_flights
+from utils.hotel_booking import async_get_hotels_by_budget
+from utils.summary_parser import parse_summary_fields
+
+CONFIRMATION_PROMPT = "Ready to provide summary. Please confirm (yes/no)."
+
+
+def is_confirmation_prompt(message: str) -> bool:
+    """True when the assistant is asking the user to confirm the final summary."""
+    text = " ".join((message or "").lower().split())
+    return "ready to provide summary" in text and "confirm" in text
+
+
+def _summary_fields(summary: str) -> dict:
+    """Parsed summary fields, compared case- and whitespace-insensitively.
+
+    Falls back to the whole text for a summary without known labels.
+    """
+    fields = parse_summary_fields(summary) or {"text": summary}
+    return {name: " ".join(value.lower().split()) for name, value in fields.items()}
+
+
+async def fetch_flights(params: dict) -> dict:
+    """Cheapest fare and alternative dates for the extracted FLIGHT_* params."""
+    origin = params.get("FLIGHT_ORIGIN", "")
+    destination = params.get("FLIGHT_DESTINATION", "")
+    depart = params.get("FLIGHT_DEPART_DATE", "")
+    # Both flight lookups are independent, so run them side by side
+    cheapest, additional = await asyncio.gather(
+        async_get_cheapest_flight(
+            origin, destination, depart, params.get("FLIGHT_RETURN_DATE", "")
+        ),
+        async_get_multiple_flights(depart, origin, destination),
+    )
+    return {"cheapest": cheapest, "additional": additional}
+
+
+async def _speculate(context: list) -> Optional[dict]:
+    # Ask the chat model for the summary it would give on "yes"
+    summary = await predict_ai_response(context + [{"role": "user", "content": "yes"}])
+    if not summary.startswith("Summary:"):
+        return None
+
+    params = await extract_params(summary)
+    fields = parse_summary_fields(summary)
+
+    lookups = [fetch_flights(params)]
+    depart = params.get("FLIGHT_DEPART_DATE")
+    ret = params.get("FLIGHT_RETURN_DATE")
+    if fields.get("hotel_needs", "").strip().lower().startswith("y") and depart and ret:
+        # The trip planner names cities ("Kandy", not "Kandy, Sri Lanka"); a
+        # single-city trip coalesces into this same stay, so its search is
+        # served from the hotel cache
+        city = fields.get("destination", "").split(",")[0].strip()
+        if city:
+            lookups.append(async_get_hotels_by_budget(depart, ret, city))
+
+    flights, *_ = await asyncio.gather(*lookups)
+    return {"summary": summary, "params": params, "flights": flights}
+
+
+class SpeculativePrefetch:
+    """Per-session head start on the itinerary pipeline.
+
+    Once the assistant asks "Ready to provide summary. Please confirm
+    (yes/no).", every trip detail is known, so a background task predicts the
+    "Summary:" line, extracts the flight params and warms the flight and hotel
+    lookups while the user reads the prompt. The pipeline `claim`s the result
+    when the confirmed summary matches the prediction; a declined or changed
+    trip `cancel`s it. Entries are only kept in this process.
+    """
+
+    def __init__(self, enabled: bool = True, ttl: float = 600.0, timer=time.monotonic):
+        self.enabled = enabled
+        self.ttl = ttl
+        self._timer = timer
+        self._entries: dict[str, tuple[float, asyncio.Task]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, session_id: str, context: list) -> None:
+        """Begin speculating for `session_id`; `context` ends with the prompt."""
+        if not self.enabled:
+            return
+        self._expire()
+        self.cancel(session_id)
+        logger.info(f"Speculative prefetch started for session {session_id}")
+        task = asyncio.create_task(
+            _speculate(list(context)), name=f"speculate-{session_id}"
+        )
+        task.add_done_callback(_log_failure)
+        self._entries[session_id] = (self._timer(), task)
+
+    def cancel(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            logger.info(f"Speculative prefetch cancelled for session {session_id}")
+            entry[1].cancel()
+
+    async def claim(self, session_id: str, summary: str) -> Optional[dict]:
+        """Warm `{"summary", "params", "flights"}` for `summary`, or None.
+
+        Waits for a speculation that is still running; it started before
+        the user confirmed, so it is ahead of a fresh lookup.
+        """
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return None
+        started, task = entry
+        if self._timer() - started > self.ttl:
+            task.cancel()
+            return None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return None
+            raise
+        except Exception:
+            result = None
+
+        if result and _summary_fields(result["summary"]) == _summary_fields(summary):
+            self.hits += 1
+            logger.info(f"Using speculative prefetch for session {session_id}")
+            return result
+        self.misses += 1
+        logger.info(f"Speculative prefetch missed for session {session_id}")
+        return None
+
+    def _expire(self) -> None:
+        now = self._timer()
+        for session_id, (started, task) in list(self._entries.items()):
+            if now - started > self.ttl:
+                del self._entries[session_id]
+                task.cancel()
+
+    async def stop(self) -> None:
+        tasks = [task for _, task in self._entries.values()]
+        self._entries.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Speculative prefetch failed: {task.exception()}")
+
+
+speculative_prefetch = SpeculativePrefetch(
+    enabled=settings.SPECULATIVE_PREFETCH, ttl=settings.SPECULATIVE_PREFETCH_TTL
+)
+
+
+@registry.collector
+def _prefetch_metrics() -> list:
+    return samples(
+        "zoomzoot_speculative_prefetch_total",
+        "Speculative prefetches claimed by the pipeline, by result.",
+        "counter",
+        [
+            ({"result": "hit"}, speculative_prefetch.hits),
+            ({"result": "miss"}, speculative_prefetch.misses),
+        ],
+    )
@@ -1,15 +1,20 @@
-from openai import AsyncOpenAI
-from core.config import settings
 from core.logging import logger
+from services.llm_client import create_chat_completion
+from services.metrics import track
+from utils.json_stream import ObjectEntryStream
 import json
 import datetime
+from typing import Callable, Optional
 
 
 # get this year
 current_year = datetime.datetime.now().year
 
 
-async def create_day_by_day_itinerary(summary: str) -> str:
+@track("create_day_by_day_itinerary")
+async def create_day_by_day_itinerary(
+    summary: str, on_day: Optional[Callable[[str, dict], None]] = None
+) -> str:
     """Generate a day-by-day itinerary from a trip summary string.
 
     The `summary` parameter should follow the format produced by the chat assistant,
@@ -19,14 +24,14 @@ async def create_day_by_day_itinerary(summary: str) -> str:
     Returns a plain-text itinerary with one numbered day per line-block including
     morning/afternoon/evening suggestions, approximate durations, and short notes
     about transport or accommodations where appropriate.
+
+    With `on_day`, the completion is streamed and `on_day(day_key, day_info)`
+    is called for each `days` entry as soon as it is complete, so hotel
+    lookups can start while the rest is still being generated.
     """
 
     logger.info("Generating day-by-day itinerary from summary")
 
-    client = AsyncOpenAI(
-        api_key=settings.OPENAI_API_KEY,
-    )
-
     system_prompt = f"""Current year is {current_year}
 You are TripPlanner, an expert travel itinerary generator that creates beautifully formatted markdown documents.
 
@@ -106,56 +111,84 @@ Focus on creating clean, readable markdown that will convert beautifully to PDF
     ]
 
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            max_tokens=1500,
-            temperature=0.7,
-        )
+        if on_day is None:
+            response = await create_chat_completion(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                max_tokens=1500,
+                temperature=0.7,
+            )
+            content = response.choices[0].message.content.strip()
+        else:
+            content = (await _stream_completion(messages, on_day)).strip()
+        return _validated(content)
 
-        content = response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Trip planner API error: {str(e)}")
+        return json.dumps(
+            {"response": f"Error generating itinerary: {str(e)}", "days": {}}
+        )
 
-        # Validate that the response is valid JSON
-        try:
-            parsed = json.loads(content)
 
-            if "response" not in parsed or "days" not in parsed:
-                raise ValueError("Missing required keys 'response' or 'days'")
+async def _stream_completion(messages, on_day) -> str:
+    """Stream the planner completion, reporting each day as soon as it closes."""
+    stream = await create_chat_completion(
+        model="gpt-3.5-turbo",
+        messages=messages,
+        max_tokens=1500,
+        temperature=0.7,
+        stream=True,
+    )
+    days = ObjectEntryStream("days")
+    parts = []
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        for day_key, day_info in days.feed(delta):
+            logger.info(f"Trip planner streamed {day_key}")
+            on_day(day_key, day_info)
+    return "".join(parts)
+
+
+def _validated(content: str) -> str:
+    """`content` if it is a well-formed plan, else an error plan with `days: {}`."""
+    # Validate that the response is valid JSON
+    try:
+        parsed = json.loads(content)
 
-            for day_key, day_info in parsed.get("days", {}).items():
-                if not isinstance(day_info, dict):
-                    raise ValueError(
-                        f"Day {day_key} must be an object with hotel details"
-                    )
+        if "response" not in parsed or "days" not in parsed:
+            raise ValueError("Missing required keys 'response' or 'days'")
 
-                required_keys = ["HOTEL_CHECKIN", "HOTEL_CHECKOUT", "HOTEL_DESTINATION"]
-                for key in required_keys:
-                    if key not in day_info:
-                        raise ValueError(f"Missing {key} in {day_key}")
+        for day_key, day_info in parsed.get("days", {}).items():
+            if not isinstance(day_info, dict):
+                raise ValueError(f"Day {day_key} must be an object with hotel details")
 
-            return content
+            required_keys = ["HOTEL_CHECKIN", "HOTEL_CHECKOUT", "HOTEL_DESTINATION"]
+            for key in required_keys:
+                if key not in day_info:
+                    raise ValueError(f"Missing {key} in {day_key}")
 
-        except json.JSONDecodeError as e:
-            logger.error(f"LLM returned invalid JSON: {str(e)}")
-            logger.error(f"Raw content: {content}")
-            return json.dumps(
-                {
-                    "response": f"Error: The AI returned invalid JSON format. Raw response: {content}",
-                    "days": {},
-                }
-            )
-        except ValueError as e:
-            logger.error(f"Invalid days structure: {str(e)}")
-            logger.error(f"Raw content: {content}")
-            return json.dumps(
-                {
-                    "response": f"Error: Invalid days structure - {str(e)}. Raw response: {content}",
-                    "days": {},
-                }
-            )
+        return content
 
-    except Exception as e:
-        logger.error(f"Trip planner API error: {str(e)}")
+    except json.JSONDecodeError as e:
+        logger.error(f"LLM returned invalid JSON: {str(e)}")
+        logger.error(f"Raw content: {content}")
         return json.dumps(
-            {"response": f"Error generating itinerary: {str(e)}", "days": {}}
+            {
+                "response": f"Error: The AI returned invalid JSON format. Raw response: {content}",
+                "days": {},
+            }
+        )
+    except ValueError as e:
+        logger.error(f"Invalid days structure: {str(e)}")
+        logger.error(f"Raw content: {content}")
+        return json.dumps(
+            {
+                "response": f"Error: Invalid days structure - {str(e)}. Raw response: {content}",
+                "days": {},
+            }
         )
@@ -0,0 +1,22 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from db.models import Base
+
+# core.config.Settings requires a DATABASE_URL at import time; the default
+# engine is never connected to (DB-backed tests use `sqlite_sessions`), so
+# any well-formed URL will do.
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/zoomzoot_test")
+
+
+@pytest.fixture
+def sqlite_sessions(tmp_path):
+    """Session factory for a throwaway SQLite database with every table."""
+    path = tmp_path / "zoomzoot.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    return async_sessionmaker(engine, expire_on_commit=False)
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services import ai_services
+from services.ai_services import FALLBACK_RESPONSE, stream_ai_response
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def _stream(monkeypatch, tokens, error):
+    async def chunks():
+        for token in tokens:
+            yield _chunk(token)
+        raise error
+
+    async def create(**kwargs):
+        return chunks()
+
+    monkeypatch.setattr(ai_services, "create_chat_completion", create)
+
+
+@pytest.mark.asyncio
+async def test_stream_that_fails_before_any_token_yields_the_fallback(monkeypatch):
+    _stream(monkeypatch, [], ConnectionError("refused"))
+    assert [token async for token in stream_ai_response([])] == [FALLBACK_RESPONSE]
+
+
+@pytest.mark.asyncio
+async def test_stream_that_fails_midway_raises(monkeypatch):
+    _stream(monkeypatch, ["Kyoto ", "is"], ConnectionError("reset"))
+    received = []
+    with pytest.raises(ConnectionError):
+        async for token in stream_ai_response([]):
+            received.append(token)
+    assert received == ["Kyoto ", "is"]
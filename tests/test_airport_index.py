@@ -0,0 +1,77 @@
+import pytest
+
+from utils.airport_index import (
+    Airport,
+    AirportIndex,
+    Place,
+    get_airport_index,
+    resolve_iata,
+)
+from utils.extract_params import normalize_params
+from utils.flight_booking import build_flight_link
+
+
+@pytest.mark.parametrize(
+    "place, expected",
+    [
+        ("Colombo", "CMB"),
+        ("Malé", "MLE"),
+        ("the Maldives", "MLE"),
+        ("Bangalore", "BLR"),
+        ("London", "LON"),
+        ("Heathrow", "LHR"),
+        ("Tokyo (HND)", "HND"),
+        ("DPS", "DPS"),
+        ("Kandy, Sri Lanka", "CMB"),
+        ("Ubud, Bali", "DPS"),
+    ],
+)
+def test_exact_and_alias_lookup(place, expected):
+    assert resolve_iata(place) == expected
+
+
+@pytest.mark.parametrize(
+    "place, expected",
+    [("Himalayas", "KTM"), ("Sigiriya", "CMB"), ("Angkor Wat", "SAI"), ("Kyoto", "OSA")],
+)
+def test_landmarks_resolve_to_nearest_major_airport(place, expected):
+    assert resolve_iata(place) == expected
+
+
+def test_fuzzy_lookup_tolerates_typos_but_not_noise():
+    assert resolve_iata("Colmbo") == "CMB"
+    assert resolve_iata("Kuala Lumpar") == "KUL"
+    assert resolve_iata("Xyzzy") == ""
+    assert resolve_iata("XYZ") == ""
+    assert resolve_iata("UAE") == "DXB"  # not a code, but a known alias
+    assert resolve_iata("") == ""
+
+
+def test_nearest_airport_skips_minor_airports():
+    index = AirportIndex(
+        [
+            Airport("BIG", "", "Big Airport", "Big City", "X", 0.0, 0.0, True),
+            Airport("SML", "", "Small Airport", "Small Town", "X", 1.0, 1.0, False),
+        ],
+        [Place("Peak", 1.1, 1.1, "", ("Summit",))],
+    )
+    assert index.nearest_airport(1.1, 1.1).iata == "BIG"
+    assert index.nearest_airport(1.1, 1.1, major_only=False).iata == "SML"
+    assert index.lookup("Summit") == "BIG"
+
+
+def test_index_is_loaded_once():
+    assert get_airport_index() is get_airport_index()
+
+
+def test_normalize_params_no_longer_truncates_city_names():
+    out = normalize_params(
+        {"FLIGHT_ORIGIN": "Chennai", "FLIGHT_DESTINATION": "Colombo"}, "Duration: 5 days"
+    )
+    assert out["FLIGHT_ORIGIN"] == "MAA"
+    assert out["FLIGHT_DESTINATION"] == "CMB"
+
+
+def test_flight_link_resolves_place_names():
+    link = build_flight_link("Chennai", "2025-09-10", "Colombo", "2025-09-15")
+    assert link.startswith("https://www.aviasales.com/search/MAA1009CMB1509?")
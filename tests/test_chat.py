@@ -1,6 +1,12 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.api.v1 import chat as chat_module
 from app.main import app
+from db.models import ChatMessage
 
 client = TestClient(app)
 
@@ -21,3 +27,58 @@ async def test_chat_endpoint():
     assert "reply" in response.json()
     assert "itinerary" in response.json()
     assert "links" in response.json()
+
+
+def _stream_reply(monkeypatch, sqlite_sessions, tokens, error=None):
+    async def stream(context):
+        for token in tokens:
+            yield token
+        if error:
+            raise error
+
+    monkeypatch.setattr(chat_module, "async_session", sqlite_sessions)
+    monkeypatch.setattr(chat_module, "stream_ai_response", stream)
+    response = client.post(
+        "/api/v1/chat/stream",
+        json={"sessionId": "stream-1", "message": "Hi, I want to visit Kyoto"},
+    )
+    assert response.status_code == 200
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        lines = frame.split("\n")
+        event = lines[0][len("event: ") :] if lines[0].startswith("event: ") else None
+        events.append((event, json.loads(lines[-1][len("data: ") :])))
+    return events
+
+
+async def _stored_messages(sqlite_sessions):
+    async with sqlite_sessions() as db:
+        result = await db.execute(select(ChatMessage).order_by(ChatMessage.seq))
+        return [(m.role, m.content) for m in result.scalars()]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_sends_tokens_then_done(monkeypatch, sqlite_sessions):
+    events = _stream_reply(monkeypatch, sqlite_sessions, ["Kyoto ", "is lovely."])
+
+    assert events[:2] == [(None, {"token": "Kyoto "}), (None, {"token": "is lovely."})]
+    event, done = events[-1]
+    assert event == "done"
+    assert (done["message"], done["finished"]) == ("Kyoto is lovely.", False)
+    assert await _stored_messages(sqlite_sessions) == [
+        ("user", "Hi, I want to visit Kyoto"),
+        ("assistant", "Kyoto is lovely."),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_chat_stream_failure_midway_sends_error_and_persists_nothing(
+    monkeypatch, sqlite_sessions
+):
+    events = _stream_reply(
+        monkeypatch, sqlite_sessions, ["Kyoto "], error=ConnectionError("reset")
+    )
+
+    assert events[0] == (None, {"token": "Kyoto "})
+    assert [event for event, _ in events[1:]] == ["error"]
+    assert await _stored_messages(sqlite_sessions) == []
@@ -0,0 +1,55 @@
+from services.context_manager import build_context, count_tokens, fold_into_digest
+
+
+def _conversation(turns):
+    history = []
+    for question, answer in turns:
+        history.append({"role": "assistant", "content": question})
+        history.append({"role": "user", "content": answer})
+    return history
+
+
+TURNS = [
+    ("Hi! Where would you like to travel?", "Bali"),
+    ("What are your preferences for the trip?", "Beaches and food " * 20),
+    ("How many days will you be travelling?", "7 days"),
+    ("What are your travel dates?", "Starting 10 September"),
+    ("Do you need flight booking assistance? (yes/no)", "yes"),
+    ("Where will you be flying from?", "Chennai"),
+]
+
+
+def test_short_history_is_sent_unchanged():
+    history = _conversation(TURNS[:2])
+    messages, digest = build_context(history, budget=10_000, min_recent=2)
+    assert messages == history
+    assert digest["upto"] == 0
+
+
+def test_long_history_keeps_recent_window_and_digest():
+    history = _conversation(TURNS)
+    messages, digest = build_context(history, budget=40, min_recent=2)
+
+    assert messages[0]["role"] == "system"
+    assert messages[-1] == history[-1]
+    assert len(messages) - 1 < len(history)
+
+    summary = messages[0]["content"]
+    assert "- Destination: Bali" in summary
+    assert "- Duration: 7 days" in summary
+    assert digest["upto"] == len(history) - (len(messages) - 1)
+
+
+def test_digest_is_incremental_across_turns():
+    history = _conversation(TURNS)
+    first = fold_into_digest(None, history[:3])
+    assert first["pending"] == ["Preferences"]
+
+    second = fold_into_digest(first, history[3:6])
+    assert second["facts"]["Preferences"].startswith("Beaches and food")
+    assert second["facts"]["Destination"] == "Bali"
+
+
+def test_count_tokens_grows_with_text():
+    assert count_tokens("") == 0
+    assert count_tokens("one two three") < count_tokens("one two three " * 10)
@@ -0,0 +1,21 @@
+from core.config import settings
+from db.database import InstrumentedPool, _connect_args, engine, pool_stats
+
+
+def test_engine_pool_is_sized_from_settings():
+    assert isinstance(engine.pool, InstrumentedPool)
+    assert engine.echo is settings.DB_ECHO
+    stats = pool_stats()
+    assert stats["size"] == settings.DB_POOL_SIZE
+    assert stats["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert stats["checked_out"] == 0
+    # Other tests may have tried the (unreachable) test database already
+    assert stats["avg_wait_seconds"] >= 0.0
+
+
+def test_asyncpg_statement_cache_is_configurable(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+    assert _connect_args() == {"ssl": settings.DB_SSL, "statement_cache_size": 0}
+
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    assert _connect_args() == {}
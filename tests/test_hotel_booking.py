@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+
+import utils.hotel_booking as hotel_booking
+from services.result_cache import MemoryBackend, ResultCache
+
+
+DAYS_MAP = {
+    "Day 1": {
+        "HOTEL_CHECKIN": "2025-09-10",
+        "HOTEL_CHECKOUT": "2025-09-11",
+        "HOTEL_DESTINATION": "Kandy",
+    },
+    "Day 2": {
+        "HOTEL_CHECKIN": "2025-09-11",
+        "HOTEL_CHECKOUT": "2025-09-12",
+        "HOTEL_DESTINATION": "Kandy",
+    },
+    "Day 3": {
+        "HOTEL_CHECKIN": "2025-09-11",
+        "HOTEL_CHECKOUT": "2025-09-12",
+        "HOTEL_DESTINATION": "Kandy",
+    },
+    "Day 4": {
+        "HOTEL_CHECKIN": "2025-09-12",
+        "HOTEL_CHECKOUT": "2025-09-13",
+        "HOTEL_DESTINATION": "Colombo",
+    },
+}
+
+
+@pytest.mark.asyncio
+async def test_async_process_days_hotels_runs_stays_concurrently(monkeypatch):
+    in_flight = 0
+    peak = 0
+    calls = []
+
+    async def fake_lookup(checkin, checkout, destination, budget_preference=None):
+        nonlocal in_flight, peak
+        calls.append((destination, checkin))
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Finish in reverse order to prove results are re-ordered by day
+        await asyncio.sleep(0.01 * (4 - len(calls)))
+        in_flight -= 1
+        return [{"name": f"{destination} {checkin}", "price": 10}]
+
+    monkeypatch.setattr(hotel_booking, "async_get_hotels_by_budget", fake_lookup)
+
+    result = await hotel_booking.async_process_days_hotels(DAYS_MAP, concurrency=2)
+
+    assert list(result) == ["Day 1", "Day 2", "Day 3", "Day 4"]
+    # Days 1-3 are one Kandy stay, Day 4 is Colombo
+    assert calls == [("Kandy", "2025-09-10"), ("Colombo", "2025-09-12")]
+    assert peak == 2
+    assert result["Day 3"] == result["Day 2"]
+    assert result["Day 4"]["hotels"][0]["name"] == "Colombo 2025-09-12"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_for_same_stay_share_one_call(monkeypatch):
+    monkeypatch.setattr(
+        hotel_booking,
+        "hotel_cache",
+        ResultCache("hotels", MemoryBackend(maxsize=16, ttl=60)),
+    )
+    calls = []
+
+    async def fake_get_json(url, params=None, timeout=None):
+        calls.append(params["location"])
+        await asyncio.sleep(0.01)
+        return [{"hotelName": "Queens Hotel", "stars": 3, "priceFrom": 40}]
+
+    monkeypatch.setattr(hotel_booking, "provider_get_json", fake_get_json)
+
+    results = await asyncio.gather(
+        *(
+            hotel_booking.async_get_hotels_by_budget("2025-09-10", "2025-09-12", "Kandy")
+            for _ in range(5)
+        )
+    )
+    # A later session is served from the cache, with its own budget filter
+    later = await hotel_booking.async_get_hotels_by_budget(
+        "2025-09-10", "2025-09-12", "kandy", "under 30"
+    )
+
+    assert calls == ["Kandy"]
+    assert all(r[0]["name"] == "Queens Hotel" for r in results)
+    assert later == []
+    assert hotel_booking.hotel_cache.stats()["coalesced"] == 4
+
+
+def test_process_days_hotels_searches_each_stay_once(monkeypatch):
+    calls = []
+
+    def fake_lookup(checkin, checkout, destination, budget_preference=None):
+        calls.append((destination, checkin))
+        return [{"name": destination}]
+
+    monkeypatch.setattr(hotel_booking, "get_hotels_by_budget", fake_lookup)
+
+    result = hotel_booking.process_days_hotels(DAYS_MAP)
+
+    assert len(calls) == 2
+    assert result["Day 3"] == result["Day 2"]
+    assert result["Day 3"] is not result["Day 2"]
+
+
+def test_coalesce_stays_merges_consecutive_nights():
+    days = {
+        f"Day {i + 1}": {
+            "HOTEL_CHECKIN": f"2025-09-{10 + i}",
+            "HOTEL_CHECKOUT": f"2025-09-{11 + i}",
+            "HOTEL_DESTINATION": city,
+        }
+        for i, city in enumerate(["Kandy", "Kandy", "kandy ", "Ella", "Kandy"])
+    }
+    days["Day 6"] = {"HOTEL_CHECKIN": "2025-09-15"}  # incomplete, skipped
+
+    stays = hotel_booking.coalesce_stays(days)
+
+    assert [
+        (s["destination"], s["checkin"], s["checkout"], s["nights"]) for s in stays
+    ] == [
+        ("Kandy", "2025-09-10", "2025-09-13", 3),
+        ("Ella", "2025-09-13", "2025-09-14", 1),
+        ("Kandy", "2025-09-14", "2025-09-15", 1),
+    ]
+    assert stays[0]["days"] == ["Day 1", "Day 2", "Day 3"]
+
+
+def test_coalesce_stays_does_not_bridge_gaps():
+    days = {
+        "Day 1": dict(DAYS_MAP["Day 1"]),
+        "Day 2": {
+            "HOTEL_CHECKIN": "2025-09-12",
+            "HOTEL_CHECKOUT": "2025-09-13",
+            "HOTEL_DESTINATION": "Kandy",
+        },
+    }
+    assert len(hotel_booking.coalesce_stays(days)) == 2
+
+
+@pytest.mark.asyncio
+async def test_streamed_days_start_searches_before_the_plan_is_complete(monkeypatch):
+    calls = []
+
+    async def fake_lookup(checkin, checkout, destination, budget_preference=None):
+        calls.append((destination, checkin, checkout))
+        return [{"name": destination}]
+
+    monkeypatch.setattr(hotel_booking, "async_get_hotels_by_budget", fake_lookup)
+    lookup = hotel_booking.HotelStayLookup()
+
+    for day_key in ["Day 1", "Day 2", "Day 3", "Day 4"]:
+        lookup.add_day(day_key, DAYS_MAP[day_key])
+    await asyncio.sleep(0)
+    # Day 4 closed the Kandy stay; Colombo may still be extended
+    assert calls == [("Kandy", "2025-09-10", "2025-09-12")]
+
+    result = await hotel_booking.async_process_days_hotels(DAYS_MAP, lookup=lookup)
+
+    assert len(calls) == 2
+    assert list(result) == ["Day 1", "Day 2", "Day 3", "Day 4"]
+    assert result["Day 4"]["hotels"] == [{"name": "Colombo"}]
+
+
+@pytest.mark.asyncio
+async def test_streamed_days_that_differ_from_the_final_plan_are_redone(monkeypatch):
+    calls = []
+
+    async def fake_lookup(checkin, checkout, destination, budget_preference=None):
+        calls.append(destination)
+        return []
+
+    monkeypatch.setattr(hotel_booking, "async_get_hotels_by_budget", fake_lookup)
+    lookup = hotel_booking.HotelStayLookup()
+    lookup.add_day("Day 1", dict(DAYS_MAP["Day 1"], HOTEL_DESTINATION="Galle"))
+
+    result = await hotel_booking.async_process_days_hotels(DAYS_MAP, lookup=lookup)
+
+    assert {r["destination"] for r in result.values()} == {"Kandy", "Colombo"}
+    assert "Galle" not in calls[-2:]
@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.hotel_ranking import HotelTable, parse_budget_preference, rank_hotels
+
+
+def _rows(prices, stars=None):
+    stars = stars or [3] * len(prices)
+    return [
+        {"hotelName": f"H{i}", "priceFrom": p, "stars": s}
+        for i, (p, s) in enumerate(zip(prices, stars))
+    ]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("budget-friendly", ("budget", None)),
+        ("5 star please", ("luxury", None)),
+        ("moderate", ("mid", None)),
+        ("under 120 a night", ("any", 120.0)),
+        (None, ("any", None)),
+    ],
+)
+def test_parse_budget_preference(text, expected):
+    assert parse_budget_preference(text) == expected
+
+
+def test_budget_and_luxury_select_opposite_price_bands():
+    rows = _rows([50, 300, 80, 120, 20, 200, 90, 150, 60, 250])
+
+    cheap = rank_hotels(rows, "budget", k=3)
+    luxury = rank_hotels(rows, "luxury", k=3)
+
+    assert all(rows[i]["priceFrom"] <= 120 for i in cheap)
+    assert all(rows[i]["priceFrom"] >= 150 for i in luxury)
+    assert cheap[0] == 4  # cheapest, equal stars
+
+
+def test_max_price_and_stars_drive_the_value_score():
+    rows = _rows([90, 100, 95, 400], stars=[1, 5, 3, 5])
+
+    assert rank_hotels(rows, "under 100", k=2) == [1, 2]
+    assert rank_hotels(rows, "under 10") == []
+
+
+def test_unpriced_hotels_only_used_when_nothing_is_priced():
+    assert rank_hotels(_rows([None, 80, 0])) == [1]
+    assert rank_hotels(_rows([None, None], stars=[2, 4])) == [1, 0]
+
+
+def test_distance_from_coordinates_breaks_ties():
+    rows = [
+        {"priceFrom": 100, "stars": 3, "location": {"geo": {"lat": lat, "lon": lon}}}
+        for lat, lon in [(7.29, 80.63), (7.30, 80.64), (7.50, 80.90)]
+    ]
+    assert np.isfinite(HotelTable.from_rows(rows).distance).all()
+    assert rank_hotels(rows, k=3)[-1] == 2
+
+
+def test_ranking_is_deterministic_over_a_large_pool():
+    rng = np.random.default_rng(7)
+    rows = _rows(
+        rng.integers(20, 500, size=2000).tolist(),
+        stars=rng.integers(1, 6, size=2000).tolist(),
+    )
+    table = HotelTable.from_rows(rows)
+
+    start = time.perf_counter()
+    first = rank_hotels(table, "mid", k=5)
+    elapsed = time.perf_counter() - start
+
+    assert first == rank_hotels(rows, "mid", k=5)
+    assert len(first) == 5
+    assert elapsed < 0.05
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from core.http_cache import etag_matches, negotiate_encoding, strong_etag
+from db.database import get_db
+from db.models import Itinerary
+from services.pdf_renderer import pdf_renderer
+
+ITINERARY = Itinerary(
+    session_id="s-1",
+    itinerary=json.dumps({"response": "Day 1: Kandy\n" + "Temple visit. " * 200}),
+)
+
+
+class _Result:
+    def scalar_one_or_none(self):
+        return ITINERARY
+
+
+class _FakeDb:
+    async def execute(self, stmt):
+        return _Result()
+
+
+async def _fake_db():
+    yield _FakeDb()
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = _fake_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_etag_matching():
+    etag = strong_etag("txt", "s-1", "body")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches(etag[:-1] + '-gz"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding(None) is None
+
+
+def test_text_download_is_compressed_and_revalidated(client):
+    first = client.get(
+        "/api/v1/download-pdf/s-1?format=txt", headers={"Accept-Encoding": "gzip"}
+    )
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.text.startswith("Day 1: Kandy")
+
+    again = client.get(
+        "/api/v1/download-pdf/s-1?format=txt",
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+def test_pdf_revalidation_skips_rendering(client, monkeypatch):
+    calls = []
+
+    async def fake_render(text, session_id):
+        calls.append(session_id)
+        return b"%PDF-fake"
+
+    monkeypatch.setattr(pdf_renderer, "render", fake_render)
+
+    first = client.get("/api/v1/download-pdf/s-1")
+    again = client.get(
+        "/api/v1/download-pdf/s-1", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert first.content == b"%PDF-fake"
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.headers["etag"].startswith('W/"')
+    assert again.status_code == 304
+    assert calls == ["s-1"]
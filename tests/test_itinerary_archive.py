@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from services.itinerary_archive import ItineraryArchive
+
+
+def _archive(tmp_path, **kwargs):
+    kwargs.setdefault("segment_bytes", 1 << 20)
+    kwargs.setdefault("flush_interval", 0.01)
+    return ItineraryArchive(str(tmp_path), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_itineraries_are_batched_into_one_block(tmp_path):
+    archive = _archive(tmp_path, flush_interval=0.05)
+    for i in range(10):
+        await archive.archive(f"session_{i}", f"# Day 1\nTemple walk {i}\n" * 50)
+    # Queued records are readable before they reach the disk
+    assert (await archive.get("session_3")).endswith("Temple walk 3\n")
+    await archive.stop()
+
+    assert archive.blocks_written == 1
+    assert archive.records_written == 10
+    assert len(list(tmp_path.glob("*.seg"))) == 1
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.seg")) < 10 * 1100
+    assert await archive.get("session_7") == "# Day 1\nTemple walk 7\n" * 50
+    assert await archive.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_latest_itinerary_for_a_session_wins(tmp_path):
+    archive = _archive(tmp_path)
+    await archive.archive("session_a", "first draft")
+    await asyncio.sleep(0.05)
+    await archive.archive("session_a", "final")
+    await archive.stop()
+
+    assert archive.blocks_written == 2
+    # A fresh reader rebuilds the index from the .idx files
+    assert _archive(tmp_path).read("session_a") == "final"
+
+
+def test_segments_rotate_by_size(tmp_path):
+    archive = _archive(tmp_path, segment_bytes=64)
+    for i in range(3):
+        archive.write_batch(
+            [{"session_id": f"s{i}", "created_at": "2030-01-01", "itinerary": "x" * 200}]
+        )
+
+    assert len(list(tmp_path.glob("*.seg"))) == 3
+    assert len(list(tmp_path.glob("*.idx"))) == 3
+    assert _archive(tmp_path).read("s1") == "x" * 200
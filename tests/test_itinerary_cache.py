@@ -0,0 +1,151 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from db.models import CachedItinerary
+from services import itinerary_cache as itinerary_cache_module
+from services.itinerary_cache import (
+    ItineraryCache,
+    canonical_trip,
+    rebind_flight_links,
+    trip_key,
+)
+from services.result_cache import MemoryBackend, ResultCache
+
+SUMMARY = (
+    "Summary: Destination: Bangkok, Duration: 5 days, Dates: September 10 2030, "
+    "Preferences: food & culture, Flight Needs: yes, Origin: Chennai, "
+    "Hotel Needs: yes, Special Requirements: none"
+)
+REWORDED = (
+    "Summary: Destination: bangkok,  Duration: five days, Dates: 10 Sep 2030, "
+    "Preferences: Culture, Food, Flight Needs: Yes, Origin: Chennai, "
+    "Hotel Needs: no, Special Requirements: N/A"
+)
+PARAMS = {
+    "FLIGHT_ORIGIN": "MAA",
+    "FLIGHT_DESTINATION": "BKK",
+    "FLIGHT_DEPART_DATE": "2030-09-10",
+    "FLIGHT_RETURN_DATE": "2030-09-15",
+}
+PLAN = json.dumps(
+    {
+        "response": "# ✈️ Flight Information\n"
+        "- **Book Your Flight:** [✈️ Book Flight](https://www.aviasales.com/search/XXX1009BKK1509?marker=1)",
+        "days": {"Day 1": {"HOTEL_CHECKIN": "2030-09-10"}},
+    }
+)
+
+
+def _cache():
+    return ItineraryCache(
+        ResultCache("itineraries", MemoryBackend(maxsize=8, ttl=60)),
+        ttl=60,
+        persist=False,
+        max_rows=0,
+    )
+
+
+def test_rewordings_share_a_canonical_trip():
+    trip = canonical_trip(SUMMARY, PARAMS)
+    assert trip == {
+        "destination": "bangkok",
+        "duration": 5,
+        "start": "2030-09-10",
+        "preferences": ["culture", "food"],
+        "origin": "MAA",
+        "requirements": [],
+    }
+    assert trip_key(trip) == trip_key(canonical_trip(REWORDED, PARAMS))
+    assert trip_key(trip) != trip_key(
+        canonical_trip(SUMMARY.replace("5 days", "6 days"), PARAMS)
+    )
+
+
+def test_flight_links_are_rebound_to_the_session():
+    text = rebind_flight_links(PLAN, PARAMS)
+    assert "XXX1009" not in text
+    assert "https://www.aviasales.com/search/MAA1009BKK1509?marker=659627&currency=USD" in text
+    assert rebind_flight_links(PLAN, {}) == PLAN
+
+
+@pytest.mark.asyncio
+async def test_same_trip_is_planned_once():
+    cache = _cache()
+    calls = []
+
+    async def plan():
+        calls.append(1)
+        return PLAN
+
+    first = await cache.get_or_plan(SUMMARY, PARAMS, plan)
+    second = await cache.get_or_plan(REWORDED, PARAMS, plan)
+
+    assert len(calls) == 1
+    assert first == second
+    assert "MAA1009BKK1509" in first
+
+
+@pytest.mark.asyncio
+async def test_each_request_counts_one_hit_or_miss():
+    cache = _cache()
+
+    async def plan():
+        return PLAN
+
+    await cache.get_or_plan(SUMMARY, PARAMS, plan)
+    # Same summary text, different trip key: served from the exact-text key
+    await cache.get_or_plan(SUMMARY, dict(PARAMS, FLIGHT_ORIGIN="DEL"), plan)
+
+    stats = cache.cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_planner_errors_are_not_cached():
+    cache = _cache()
+    error = json.dumps({"response": "Error generating itinerary: boom", "days": {}})
+    calls = []
+
+    async def plan():
+        calls.append(1)
+        return error
+
+    assert await cache.get_or_plan(SUMMARY, PARAMS, plan) == error
+    await cache.get_or_plan(SUMMARY, PARAMS, plan)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_db_is_pruned_every_n_stores_or_on_a_timer(sqlite_sessions, monkeypatch):
+    now = [0.0]
+    prunes = []
+    prune = itinerary_cache_module.prune_cached_plans
+
+    async def counting_prune(db, when, max_rows):
+        prunes.append(now[0])
+        await prune(db, when, max_rows)
+
+    monkeypatch.setattr(itinerary_cache_module, "async_session", sqlite_sessions)
+    monkeypatch.setattr(itinerary_cache_module, "prune_cached_plans", counting_prune)
+    cache = ItineraryCache(
+        ResultCache("itineraries", MemoryBackend(maxsize=8, ttl=60)),
+        ttl=60,
+        persist=True,
+        max_rows=2,
+        prune_every=3,
+        prune_interval=100,
+        timer=lambda: now[0],
+    )
+
+    for i in range(5):
+        await cache._persist(f"trip-{i}", f"summary-{i}", PLAN)
+    assert prunes == [0.0, 0.0]  # first store, then the third after it
+    now[0] = 100.0
+    await cache._persist("trip-5", "summary-5", PLAN)
+    assert prunes == [0.0, 0.0, 100.0]
+
+    async with sqlite_sessions() as db:
+        rows = await db.scalar(select(func.count()).select_from(CachedItinerary))
+    assert rows == 2
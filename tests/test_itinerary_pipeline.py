@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import itinerary_pipeline
+from utils import hotel_booking
+
+DAYS = {
+    "Day 1": {
+        "HOTEL_CHECKIN": "2030-09-10",
+        "HOTEL_CHECKOUT": "2030-09-11",
+        "HOTEL_DESTINATION": "Kandy",
+    },
+    "Day 2": {
+        "HOTEL_CHECKIN": "2030-09-11",
+        "HOTEL_CHECKOUT": "2030-09-12",
+        "HOTEL_DESTINATION": "Colombo",
+    },
+}
+
+
+@pytest.mark.asyncio
+async def test_planner_failure_cancels_hotel_searches_started_for_streamed_days(
+    monkeypatch,
+):
+    searches = []
+
+    async def hanging_search(checkin, checkout, destination, budget_preference=None):
+        searches.append(asyncio.current_task())
+        await asyncio.sleep(10)
+
+    async def failing_planner(details, on_day=None):
+        for day_key, day_info in DAYS.items():
+            on_day(day_key, day_info)
+        await asyncio.sleep(0)  # let the closed Kandy stay start its search
+        raise RuntimeError("planner down")
+
+    async def claim(session_id, summary):
+        return {"params": {}, "flights": {}}
+
+    async def get_or_plan(summary, params, plan):
+        return await plan()
+
+    monkeypatch.setattr(itinerary_pipeline.settings, "TRIP_PLANNER_STREAMING", True)
+    monkeypatch.setattr(itinerary_pipeline.speculative_prefetch, "claim", claim)
+    monkeypatch.setattr(
+        itinerary_pipeline, "itinerary_cache", SimpleNamespace(get_or_plan=get_or_plan)
+    )
+    monkeypatch.setattr(itinerary_pipeline, "create_day_by_day_itinerary", failing_planner)
+    monkeypatch.setattr(hotel_booking, "async_get_hotels_by_budget", hanging_search)
+
+    with pytest.raises(RuntimeError, match="planner down"):
+        await itinerary_pipeline.run_itinerary_pipeline("s1", "Summary: ...", "yes")
+    await asyncio.sleep(0)
+
+    assert len(searches) == 1
+    assert searches[0].cancelled()
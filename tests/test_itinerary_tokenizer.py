@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from utils.itinerary_tokenizer import (
+    FLIGHT_SECTION,
+    Activity,
+    Day,
+    Link,
+    Section,
+    Stay,
+    TimeOfDay,
+    format_inline,
+    tokenize_itinerary,
+)
+
+HOTEL_URL = "https://search.hotellook.com/?marker=1&hotelId=430324"
+
+ITINERARY = f"""Flight Details: [✈️ Book Flight](https://www.aviasales.com/search/CMB0509PAR0909?marker=1)
+
+Day 1 — Paris
+- Morning: Visit the iconic Eiffel Tower.
+- 🌆 Evening: Dinner cruise on the Seine River.
+- Overnight stay in Paris
+- Booking: [Terminus Hotel]({HOTEL_URL})
+- Booking: [Terminus Hotel]({HOTEL_URL})
+- Wander the Latin Quarter bookshops.
+- Wander the Latin Quarter bookshops.
+
+**Day 2 — Paris**
+- Wander the Latin Quarter bookshops.
+"""
+
+
+def test_tokenizes_into_typed_nodes():
+    nodes = list(tokenize_itinerary(ITINERARY))
+
+    assert [n.kind for n in nodes] == [
+        "section", "link", "day", "time_of_day", "time_of_day", "stay", "link",
+        "activity", "day", "activity",
+    ]
+    assert nodes[0] == Section(FLIGHT_SECTION)
+    assert "✈️ Book Flight" in nodes[1].content
+    assert nodes[2] == Day("Day 1 — Paris")
+    assert nodes[3] == TimeOfDay("morning", "Visit the iconic Eiffel Tower.")
+    assert nodes[4] == TimeOfDay("evening", "Dinner cruise on the Seine River.")
+    assert nodes[5] == Stay("Overnight stay in Paris")
+    assert nodes[6] == Link(
+        f'<a href="{HOTEL_URL.replace("&", "&amp;")}" color="#27ae60">'
+        "<u><b>🏨 Terminus Hotel</b></u></a>"
+    )
+    assert nodes[8] == Day("<b>Day 2 — Paris</b>")
+    assert nodes[9] == Activity("Wander the Latin Quarter bookshops.")
+
+
+def test_nodes_use_slots():
+    node = TimeOfDay("morning", "x")
+    assert not hasattr(node, "__dict__")
+
+
+def test_accepts_a_line_stream():
+    def lines():
+        yield from ITINERARY.splitlines(keepends=True)
+
+    assert list(tokenize_itinerary(lines())) == list(tokenize_itinerary(ITINERARY))
+
+
+def test_format_inline():
+    assert format_inline("- **Bold** text") == "<b>Bold</b> text"
+    assert format_inline("Booking: https://example.com/a?b=1&c=2") == (
+        '<a href="https://example.com/a?b=1&amp;c=2" color="#3498db">'
+        "<u><b>🔗 Visit Link</b></u></a>"
+    )
+    assert format_inline(" - ") == ""
+
+
+def test_sample_summaries_parse():
+    for path in (Path(__file__).parent.parent / "summaries").glob("*.txt"):
+        with path.open(encoding="utf-8") as lines:
+            nodes = list(tokenize_itinerary(lines))
+        assert sum(n.kind == "day" for n in nodes) >= 3, path.name
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from db.database import get_db
+from db.models import Itinerary, ItineraryJob
+from services import job_runner as job_runner_module
+from services.job_runner import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    ItineraryJobRunner,
+)
+
+
+@pytest.fixture
+def sessions(sqlite_sessions, monkeypatch):
+    monkeypatch.setattr(job_runner_module, "async_session", sqlite_sessions)
+    return sqlite_sessions
+
+
+def _pipeline(monkeypatch, fail=None):
+    calls = []
+
+    async def run(session_id, summary, message, report_stage):
+        calls.append(session_id)
+        await report_stage("planning")
+        if fail:
+            raise RuntimeError(fail)
+
+    monkeypatch.setattr(job_runner_module, "run_itinerary_pipeline", run)
+    return calls
+
+
+async def _job(sessions, job_id):
+    async with sessions() as db:
+        return await db.get(ItineraryJob, job_id)
+
+
+async def _add(sessions, job_id, status, updated_at=None, error=None):
+    async with sessions() as db:
+        db.add(
+            ItineraryJob(
+                job_id=job_id,
+                session_id=f"session_{job_id}",
+                status=status,
+                payload={"summary": "Summary: ...", "message": "yes"},
+                updated_at=updated_at or datetime.utcnow(),
+                error=error,
+            )
+        )
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_job_runs_from_queued_to_succeeded(sessions, monkeypatch):
+    calls = _pipeline(monkeypatch)
+    runner = ItineraryJobRunner(workers=1)
+
+    job_id = await runner.submit("session_1", "Summary: ...", "yes")
+    await runner._queue.join()
+    await runner.stop()
+
+    job = await _job(sessions, job_id)
+    assert (job.status, job.stage, job.error) == (JOB_SUCCEEDED, "done", None)
+    assert calls == ["session_1"]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_error_marks_the_job_failed(sessions, monkeypatch):
+    _pipeline(monkeypatch, fail="planner down")
+    runner = ItineraryJobRunner(workers=1)
+
+    job_id = await runner.submit("session_1", "Summary: ...", "yes")
+    await runner._queue.join()
+    await runner.stop()
+
+    job = await _job(sessions, job_id)
+    assert (job.status, job.error) == (JOB_FAILED, "planner down")
+
+
+@pytest.mark.asyncio
+async def test_a_job_is_claimed_once(sessions, monkeypatch):
+    calls = _pipeline(monkeypatch)
+    await _add(sessions, "a", JOB_QUEUED)
+    runner = ItineraryJobRunner(workers=1)
+
+    await asyncio.gather(runner._run("a"), runner._run("a"))
+
+    assert calls == ["session_a"]
+    assert (await _job(sessions, "a")).status == JOB_SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_recovery_skips_running_jobs_with_a_live_lease(sessions, monkeypatch):
+    calls = _pipeline(monkeypatch)
+    stale = datetime.utcnow() - timedelta(minutes=10)
+    await _add(sessions, "queued", JOB_QUEUED)
+    await _add(sessions, "orphaned", JOB_RUNNING, updated_at=stale)
+    await _add(sessions, "live", JOB_RUNNING)
+    await _add(sessions, "done", JOB_SUCCEEDED, updated_at=stale)
+    runner = ItineraryJobRunner(workers=1, lease=60)
+
+    await runner.start()
+    await runner._queue.join()
+    await runner.stop()
+
+    assert sorted(calls) == ["session_orphaned", "session_queued"]
+    assert (await _job(sessions, "live")).status == JOB_RUNNING
+    assert (await _job(sessions, "orphaned")).status == JOB_SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_get_itinerary_reports_job_progress(sessions, monkeypatch):
+    await _add(sessions, "pending", JOB_RUNNING)
+    await _add(sessions, "failed", JOB_FAILED, error="planner down")
+    await _add(sessions, "ok", JOB_SUCCEEDED)
+    async with sessions() as db:
+        db.add(Itinerary(session_id="session_ok", itinerary="# Day 1"))
+        await db.commit()
+
+    async def override_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_db
+    try:
+        client = TestClient(app)
+        pending = client.get("/api/v1/itinerary/session_pending")
+        failed = client.get("/api/v1/itinerary/session_failed")
+        ok = client.get("/api/v1/itinerary/session_ok")
+        missing = client.get("/api/v1/itinerary/session_missing")
+    finally:
+        app.dependency_overrides.pop(get_db)
+
+    assert pending.status_code == 202
+    assert pending.json()["status"] == JOB_RUNNING
+    assert failed.status_code == 200
+    assert failed.json()["status"] == JOB_FAILED
+    assert failed.json()["error"] == "planner down"
+    assert ok.status_code == 200
+    assert ok.json()["itinerary"] == "# Day 1"
+    assert missing.status_code == 404
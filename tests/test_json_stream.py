@@ -0,0 +1,43 @@
+import json
+
+from utils.json_stream import ObjectEntryStream
+
+PLAN = {
+    "response": 'Day 1 — "Kandy" {not a day} [x] \\ done',
+    "days": {
+        f"Day {i}": {
+            "HOTEL_CHECKIN": f"2025-09-{9 + i}",
+            "HOTEL_CHECKOUT": f"2025-09-{10 + i}",
+            "HOTEL_DESTINATION": "Kandy",
+            "notes": ["}", {"nested": "{"}],
+        }
+        for i in range(1, 4)
+    },
+}
+
+
+def _feed(text, size):
+    stream = ObjectEntryStream("days")
+    entries = []
+    for i in range(0, len(text), size):
+        entries.append(stream.feed(text[i : i + size]))
+    return entries
+
+
+def test_entries_are_emitted_as_soon_as_they_close():
+    text = "```json\n" + json.dumps(PLAN, indent=2) + "\n```"
+    for size in (1, 3, 7, 64):
+        batches = _feed(text, size)
+        assert [e for batch in batches for e in batch] == list(PLAN["days"].items())
+
+    # Day 1 is complete before Day 2 has even started
+    stream = ObjectEntryStream("days")
+    head = text[: text.index('"Day 2"')]
+    assert stream.feed(head) == [("Day 1", PLAN["days"]["Day 1"])]
+
+
+def test_other_fields_and_trailing_text_are_ignored():
+    text = json.dumps({"days": {"Day 1": {"a": 1}, "Day 2": 3}, "extra": {"Day 9": {}}})
+    stream = ObjectEntryStream("days")
+    assert stream.feed(text + ' {"days": {"Day 5": {}}}') == [("Day 1", {"a": 1})]
+    assert stream.feed("more") == []
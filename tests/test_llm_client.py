@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services import job_runner, llm_client, provider_client, resilience
+from services.metrics import stage_seconds
+
+
+class _Completions:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _stub_client(monkeypatch, *results):
+    completions = _Completions(results)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(llm_client, "get_llm_client", lambda: client)
+    return completions
+
+
+@pytest.fixture(autouse=True)
+def _fresh_openai_provider(monkeypatch):
+    monkeypatch.setattr(resilience, "_providers", {})
+    monkeypatch.setattr(resilience.settings, "RETRY_BASE_DELAY", 0)
+
+
+@pytest.mark.asyncio
+async def test_chat_completion_goes_through_the_stubbed_client(monkeypatch):
+    before = (stage_seconds.snapshot("llm_request", "ok") or {"count": 0})["count"]
+    response = SimpleNamespace(choices=[])
+    completions = _stub_client(monkeypatch, response)
+
+    result = await llm_client.create_chat_completion(model="m", messages=[])
+
+    assert result is response
+    assert completions.calls == [{"model": "m", "messages": []}]
+    assert stage_seconds.snapshot("llm_request", "ok")["count"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_transient_llm_errors_are_retried(monkeypatch):
+    import openai
+
+    error = openai.APIConnectionError(request=None)
+    completions = _stub_client(monkeypatch, error, "ok")
+
+    assert await llm_client.create_chat_completion(model="m", messages=[]) == "ok"
+    assert len(completions.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_llm_errors_propagate(monkeypatch):
+    completions = _stub_client(monkeypatch, ValueError("bad request"), "ok")
+
+    with pytest.raises(ValueError):
+        await llm_client.create_chat_completion(model="m", messages=[])
+    assert len(completions.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_client_is_created_lazily_once(monkeypatch):
+    monkeypatch.setattr(llm_client, "_client", None)
+    monkeypatch.setattr(llm_client.settings, "OPENAI_API_KEY", "test-key")
+
+    client = llm_client.get_llm_client()
+    assert llm_client.get_llm_client() is client
+    assert llm_client.init_llm_client() is client
+
+    await llm_client.close_llm_client()
+    assert llm_client._client is None
+    assert llm_client.get_llm_client() is not client
+    await llm_client.close_llm_client()
+
+
+@pytest.mark.asyncio
+async def test_app_lifespan_opens_and_closes_the_shared_clients(
+    monkeypatch, sqlite_sessions
+):
+    from app.main import app
+
+    monkeypatch.setattr(llm_client, "_client", None)
+    monkeypatch.setattr(llm_client.settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(job_runner, "async_session", sqlite_sessions)
+
+    async with app.router.lifespan_context(app):
+        assert llm_client._client is not None
+        assert job_runner.job_runner.running
+        provider_client.get_provider_client()
+
+    assert llm_client._client is None
+    assert provider_client._client is None
+    assert not job_runner.job_runner.running
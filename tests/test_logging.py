@@ -0,0 +1,71 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+
+from core.logging import DeferredQueueHandler, JsonFormatter, Payload
+
+
+def test_large_payloads_are_cut_down():
+    text = "x" * 1000
+    assert str(Payload(text, max_chars=10, sample_rate=0)) == "x" * 10 + "... (+990 chars)"
+    assert str(Payload(text, max_chars=10, sample_rate=1)) == text
+    assert str(Payload({"a": 1}, max_chars=100)) == "{'a': 1}"
+
+
+def test_disabled_debug_never_renders_payloads():
+    rendered = []
+
+    class Spy:
+        def __repr__(self):
+            rendered.append(1)
+            return "spy"
+
+    log = logging.getLogger("zoomzoot.test")
+    log.setLevel(logging.INFO)
+    log.debug("payload %s", Payload(Spy()))
+    assert rendered == []
+
+
+def test_json_formatter_keeps_extras():
+    record = logging.makeLogRecord(
+        {
+            "name": "zoomzoot",
+            "levelname": "INFO",
+            "msg": "Queued job %s",
+            "args": ("j1",),
+            "session_id": "s1",
+        }
+    )
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Queued job j1"
+    assert entry["level"] == "INFO"
+    assert entry["session_id"] == "s1"
+    assert "ts" in entry
+
+
+def test_records_are_rendered_on_the_listener_thread():
+    rendered_on = []
+
+    class Spy:
+        def __repr__(self):
+            rendered_on.append(threading.current_thread())
+            return "spy"
+
+    log_queue = queue.SimpleQueue()
+    output = io.StringIO()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(output))
+    log = logging.getLogger("zoomzoot.test.deferred")
+    log.propagate = False
+    log.addHandler(DeferredQueueHandler(log_queue))
+    listener.start()
+    try:
+        log.warning("payload %s", Payload(Spy()))
+    finally:
+        listener.stop()
+        log.handlers.clear()
+
+    assert output.getvalue() == "payload spy\n"
+    assert rendered_on and threading.current_thread() not in rendered_on
@@ -0,0 +1,67 @@
+import pytest
+
+from db.messages import (
+    append_message,
+    load_messages,
+    load_recent_messages,
+    migrate_legacy_history,
+)
+from db.models import Session
+
+
+async def _append(sessions, session_id, *contents):
+    async with sessions() as db:
+        seqs = [await append_message(db, session_id, "user", c) for c in contents]
+        await db.commit()
+    return seqs
+
+
+@pytest.mark.asyncio
+async def test_messages_are_appended_in_order_per_session(sqlite_sessions):
+    assert await _append(sqlite_sessions, "a", "one", "two", "three") == [0, 1, 2]
+    assert await _append(sqlite_sessions, "b", "other") == [0]
+
+    async with sqlite_sessions() as db:
+        recent = await load_recent_messages(db, "a", 2)
+        assert [(m.seq, m.content) for m in recent] == [(1, "two"), (2, "three")]
+        window = await load_messages(db, "a", 0, 2)
+        assert [m.content for m in window] == ["one", "two"]
+
+
+@pytest.mark.asyncio
+async def test_turns_from_a_stale_view_land_after_concurrent_writes(sqlite_sessions):
+    await _append(sqlite_sessions, "a", "hello")
+
+    async with sqlite_sessions() as slow:
+        # This turn read the conversation before the other one committed
+        assert len(await load_recent_messages(slow, "a", 10)) == 1
+        await _append(sqlite_sessions, "a", "fast user", "fast reply")
+        assert await append_message(slow, "a", "user", "slow user") == 3
+        assert await append_message(slow, "a", "assistant", "slow reply") == 4
+        await slow.commit()
+
+    async with sqlite_sessions() as db:
+        stored = await load_recent_messages(db, "a", 10)
+    assert [m.seq for m in stored] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_legacy_history_is_moved_into_the_messages_table(sqlite_sessions):
+    async with sqlite_sessions() as db:
+        session = Session(
+            session_id="legacy",
+            history=[
+                {"role": "user", "content": "Trip to Goa"},
+                {"role": "assistant", "content": "How many days?"},
+            ],
+        )
+        db.add(session)
+        staged = migrate_legacy_history(db, session)
+        assert [m.seq for m in staged] == [0, 1]
+        assert session.history is None
+        assert await append_message(db, "legacy", "user", "4 days") == 2
+        await db.commit()
+
+    async with sqlite_sessions() as db:
+        stored = await load_recent_messages(db, "legacy", 10)
+    assert [m.content for m in stored] == ["Trip to Goa", "How many days?", "4 days"]
@@ -0,0 +1,59 @@
+import pytest
+
+from services.metrics import Counter, Histogram, Registry, samples, timed, track
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("stage_seconds", "Stage latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, "extract")
+
+    lines = hist.render()
+    assert lines[:2] == ["# HELP stage_seconds Stage latency.", "# TYPE stage_seconds histogram"]
+    assert lines[2:] == [
+        'stage_seconds_bucket{stage="extract",le="0.1"} 1',
+        'stage_seconds_bucket{stage="extract",le="1.0"} 3',
+        'stage_seconds_bucket{stage="extract",le="+Inf"} 4',
+        'stage_seconds_sum{stage="extract"} 4.05',
+        'stage_seconds_count{stage="extract"} 4',
+    ]
+
+
+def test_registry_renders_metrics_and_collectors():
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Jobs.", ("status",)))
+    counter.inc("ok")
+    counter.inc("ok")
+    registry.collector(
+        lambda: samples("cache_hit_ratio", "Hit ratio.", "gauge", [({"cache": 'a"b'}, 0.5)])
+    )
+
+    text = registry.render()
+    assert 'jobs_total{status="ok"} 2\n' in text
+    assert 'cache_hit_ratio{cache="a\\"b"} 0.5\n' in text
+    assert text.endswith("\n")
+
+
+def test_timed_records_outcome_and_in_flight():
+    from services.metrics import stage_in_flight, stage_seconds
+
+    with pytest.raises(ValueError):
+        with timed("test_stage"):
+            assert ("test_stage",) in stage_in_flight._values
+            assert stage_in_flight._values[("test_stage",)] == 1
+            raise ValueError
+    assert stage_in_flight._values[("test_stage",)] == 0
+    assert stage_seconds.snapshot("test_stage", "error")["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_track_wraps_coroutines():
+    from services.metrics import stage_seconds
+
+    @track("test_async_stage")
+    async def work(x):
+        return x * 2
+
+    assert await work(2) == 4
+    assert work.__name__ == "work"
+    assert stage_seconds.snapshot("test_async_stage", "ok")["count"] == 1
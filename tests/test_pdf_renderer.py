@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pytest
+
+import services.pdf_renderer as pdf_module
+from services.pdf_renderer import PdfRenderer, pdf_cache_key, render_itinerary_pdf
+from services.result_cache import MemoryBackend, ResultCache
+
+ITINERARY = json.dumps(
+    {
+        "response": "Day 1: Arrive in Kandy\n"
+        "- Morning: Temple of the Tooth\n"
+        "- Evening: Overnight stay at [Queens Hotel](https://search.hotellook.com/?hotelId=1)\n"
+    }
+)
+
+
+def _renderer(workers=0):
+    return PdfRenderer(workers, ResultCache("pdf", MemoryBackend(maxsize=8, ttl=60)))
+
+
+def test_render_produces_a_pdf():
+    pdf = render_itinerary_pdf(ITINERARY, "session-1")
+    assert pdf.startswith(b"%PDF")
+
+
+def test_cache_key_depends_on_content_and_session():
+    assert pdf_cache_key(ITINERARY, "a") == pdf_cache_key(ITINERARY, "a")
+    assert pdf_cache_key(ITINERARY, "a") != pdf_cache_key(ITINERARY, "b")
+    assert pdf_cache_key(ITINERARY, "a") != pdf_cache_key(ITINERARY + " ", "a")
+
+
+@pytest.mark.asyncio
+async def test_repeat_and_concurrent_downloads_render_once(monkeypatch):
+    calls = []
+
+    def fake_render(text, session_id):
+        calls.append(session_id)
+        return b"%PDF-fake"
+
+    monkeypatch.setattr(pdf_module, "render_itinerary_pdf", fake_render)
+    renderer = _renderer()
+
+    results = await asyncio.gather(
+        *(renderer.render(ITINERARY, "session-1") for _ in range(3))
+    )
+    await renderer.render(ITINERARY, "session-1")
+
+    assert calls == ["session-1"]
+    assert set(results) == {b"%PDF-fake"}
+
+
+@pytest.mark.asyncio
+async def test_renders_in_worker_process():
+    renderer = _renderer(workers=1)
+    try:
+        pdf = await renderer.render(ITINERARY, "session-2")
+    finally:
+        renderer.stop()
+    assert pdf.startswith(b"%PDF")
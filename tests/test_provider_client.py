@@ -0,0 +1,118 @@
+import httpx
+import pytest
+
+from services import provider_client, rate_limiter, resilience
+from services.provider_client import (
+    close_provider_client,
+    get_provider_client,
+    provider_get_json,
+)
+from services.rate_limiter import TokenBucket
+
+URL = "https://engine.hotellook.com/api/v2/cache.json"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_providers(monkeypatch):
+    monkeypatch.setattr(resilience, "_providers", {})
+    monkeypatch.setattr(resilience.settings, "RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(
+        rate_limiter, "_buckets", {"hotellook": TokenBucket("hotellook", 1000, 10)}
+    )
+
+
+def _serve(monkeypatch, *responses):
+    """Answer requests with `responses` in turn; returns the requests seen."""
+    seen = []
+    responses = list(responses)
+
+    def handler(request):
+        seen.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(provider_client, "_client", client)
+    return seen
+
+
+@pytest.mark.asyncio
+async def test_client_is_created_lazily_and_reused(monkeypatch):
+    monkeypatch.setattr(provider_client, "_client", None)
+    client = get_provider_client()
+    assert get_provider_client() is client
+
+    await close_provider_client()
+    assert client.is_closed
+    replacement = get_provider_client()
+    assert replacement is not client
+    await close_provider_client()
+
+
+@pytest.mark.asyncio
+async def test_json_body_is_returned_and_none_params_dropped(monkeypatch):
+    seen = _serve(monkeypatch, httpx.Response(200, json={"hotels": []}))
+
+    assert await provider_get_json(URL, {"location": "Kandy", "limit": None}) == {
+        "hotels": []
+    }
+    assert dict(seen[0].url.params) == {"location": "Kandy"}
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(monkeypatch):
+    seen = _serve(
+        monkeypatch,
+        httpx.ConnectError("refused"),
+        httpx.Response(503),
+        httpx.Response(200, json=[1]),
+    )
+
+    assert await provider_get_json(URL) == [1]
+    assert len(seen) == 3
+    assert resilience.get_provider("hotellook").retries == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retries_raise_the_http_error(monkeypatch):
+    _serve(monkeypatch, *[httpx.Response(502)] * 3)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await provider_get_json(URL)
+    assert resilience.get_provider("hotellook").failures == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(monkeypatch):
+    seen = _serve(monkeypatch, httpx.Response(404, json={"error": "not found"}))
+
+    assert await provider_get_json(URL) == {"error": "not found"}
+    assert len(seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_429_pauses_the_rate_limiter(monkeypatch):
+    _serve(
+        monkeypatch,
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={}),
+    )
+
+    assert await provider_get_json(URL) == {}
+    assert rate_limiter.get_bucket("hotellook").stats()["throttled"] == 1
+
+
+@pytest.mark.asyncio
+async def test_429s_do_not_count_against_the_circuit(monkeypatch):
+    monkeypatch.setattr(resilience.settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    _serve(monkeypatch, *[httpx.Response(429, headers={"Retry-After": "0"})] * 6)
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider_get_json(URL)
+
+    breaker = resilience.get_provider("hotellook").breaker
+    assert breaker.state == "closed"
+    assert breaker.stats()["consecutive_failures"] == 0
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from services.rate_limiter import RateLimitTimeout, TokenBucket
+
+
+def _bucket(rate=2.0, burst=2, max_wait=None):
+    now = [0.0]
+    return TokenBucket("hotellook", rate, burst, max_wait, timer=lambda: now[0]), now
+
+
+def test_burst_then_steady_rate():
+    bucket, now = _bucket(rate=2.0, burst=2)
+    waits = [bucket._reserve(None) for _ in range(5)]
+    assert waits == [0.0, 0.0, 0.5, 1.0, 1.5]
+
+    now[0] = 10.0  # idle long enough to refill the burst
+    assert [bucket._reserve(None) for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+def test_waiters_past_the_deadline_are_rejected_without_a_slot():
+    bucket, _ = _bucket(rate=1.0, burst=1, max_wait=1.5)
+    assert bucket._reserve(1.5) == 0.0
+    assert bucket._reserve(1.5) == 1.0
+    with pytest.raises(RateLimitTimeout):
+        bucket._reserve(1.5)
+    assert bucket._reserve(5) == 2.0
+    assert bucket.stats()["rejected"] == 1
+
+
+def test_throttle_pushes_back_new_calls():
+    bucket, now = _bucket(rate=10.0, burst=3)
+    bucket.throttle(4.0)
+    assert bucket._reserve(None) == pytest.approx(4.0)
+    assert bucket.stats()["throttled"] == 1
+
+
+def test_zero_rate_is_unlimited():
+    bucket, _ = _bucket(rate=0)
+    assert all(bucket._reserve(0) == 0.0 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_in_arrival_order():
+    bucket = TokenBucket("travelpayouts", rate=50.0, burst=1)
+    order = []
+
+    async def call(i):
+        await bucket.acquire()
+        order.append(i)
+
+    tasks = [asyncio.create_task(call(i)) for i in range(5)]
+    await asyncio.sleep(0.01)
+    assert bucket.stats()["queue_depth"] > 0
+    await asyncio.gather(*tasks)
+
+    assert order == list(range(5))
+    stats = bucket.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["acquired"] == 5
+    assert 0.07 < stats["max_wait_seconds"] <= 0.08
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_its_slot_back():
+    bucket = TokenBucket("hotellook", rate=10.0, burst=1)
+    await bucket.acquire()
+    waiter = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    # The next caller takes the freed slot instead of queueing behind it
+    assert bucket._reserve(None) <= 0.1
+    assert bucket.stats()["acquired"] == 2
+
+
+def test_slot_is_kept_when_someone_queued_behind_it():
+    bucket, _ = _bucket(rate=1.0, burst=1)
+    bucket._reserve(None)
+    _, tail = bucket._take(None)
+    bucket._reserve(None)
+
+    bucket._give_back(tail, 1.0)
+    assert bucket._reserve(None) == 3.0
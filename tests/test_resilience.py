@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+
+from services import resilience
+from services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Provider,
+    RetryPolicy,
+)
+
+
+def _provider(attempts=3, threshold=5, timer=None, **kwargs):
+    breaker = CircuitBreaker("test", threshold, reset_timeout=30, timer=timer or (lambda: 0))
+    return Provider("test", RetryPolicy(attempts, 0, 0), breaker, **kwargs)
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(5, base_delay=0.5, max_delay=2.0)
+    for retry in range(6):
+        delays = [policy.delay(retry) for _ in range(50)]
+        assert all(0 <= d <= min(2.0, 0.5 * 2**retry) for d in delays)
+    assert len({policy.delay(3) for _ in range(20)}) > 1
+
+
+def test_breaker_opens_then_half_open_probe_closes_it():
+    now = [0.0]
+    breaker = CircuitBreaker("hotellook", 2, reset_timeout=10, timer=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 10
+    breaker.before_call()  # the single half-open probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    provider = _provider()
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert await resilience.call(provider, flaky) == "ok"
+    assert provider.retries == 2
+    assert provider.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_propagate_at_once():
+    provider = _provider()
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise ValueError("400")
+
+    with pytest.raises(ValueError):
+        await resilience.call(
+            provider, bad_request, retryable=lambda e: isinstance(e, ConnectionError)
+        )
+    assert len(attempts) == 1
+    assert provider.breaker.stats()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast():
+    provider = _provider(attempts=2, threshold=2)
+
+    async def down():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        await resilience.call(provider, down)
+    with pytest.raises(CircuitOpenError):
+        await resilience.call(provider, down)
+    assert provider.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_fastest_copy_wins():
+    provider = _provider(hedge=True, hedge_min_samples=1, hedge_min_delay=0.01)
+    provider.latency.record(0.01)
+    started = []
+
+    async def call():
+        started.append(1)
+        # The first copy hangs, the hedge answers quickly
+        await asyncio.sleep(10 if len(started) == 1 else 0)
+        return len(started)
+
+    assert await asyncio.wait_for(resilience.call(provider, call), 1) == 2
+    assert provider.hedged == 1
+    assert await resilience.call(provider, call, hedge=False) == 3
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_without_a_verdict_frees_its_slot():
+    now = [0.0]
+    provider = _provider(attempts=1, threshold=1, timer=lambda: now[0])
+
+    async def down():
+        raise ConnectionError("down")
+
+    def rejected_sync():
+        raise ValueError("400")
+
+    async def rejected():
+        rejected_sync()
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(ConnectionError):
+        await resilience.call(provider, down)
+    now[0] = 30  # half-open
+
+    with pytest.raises(ValueError):
+        await resilience.call(
+            provider, rejected, retryable=lambda e: isinstance(e, ConnectionError)
+        )
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(resilience.call(provider, hangs), 0.01)
+    with pytest.raises(ValueError):
+        resilience.call_sync(provider, rejected_sync, retryable=lambda e: False)
+
+    assert provider.breaker.state == "half_open"
+    assert await resilience.call(provider, ok) == "ok"
+    assert provider.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_errors_that_are_not_failures_are_retried_without_tripping():
+    provider = _provider(attempts=3, threshold=2)
+    attempts = []
+
+    async def busy():
+        attempts.append(1)
+        raise ConnectionError("429")
+
+    with pytest.raises(ConnectionError):
+        await resilience.call(provider, busy, counts_as_failure=lambda e: False)
+    assert len(attempts) == 3
+    assert provider.breaker.state == "closed"
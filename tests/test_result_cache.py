@@ -0,0 +1,77 @@
+import pytest
+
+import utils.flight_booking as flight_booking
+from services.result_cache import MemoryBackend, ResultCache
+
+
+def test_entries_expire_after_ttl_and_lru_is_bounded():
+    now = [0.0]
+    cache = ResultCache("test", MemoryBackend(maxsize=2, ttl=10, timer=lambda: now[0]))
+    cache.set("a", 1)
+    assert cache.get("a") == (True, 1)
+    now[0] = 11
+    assert cache.get("a") == (False, None)
+
+    for key in "xyz":
+        cache.set(key, key)
+    assert len(cache.backend) == 2
+    assert cache.get("x") == (False, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+
+def test_aliases_count_as_one_lookup():
+    cache = ResultCache("test", MemoryBackend(maxsize=8, ttl=10))
+    cache.set("b", 2)
+    assert cache.get("a", "b") == (True, 2)
+    assert cache.get("a", "c") == (False, None)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_flight_lookups_are_served_from_cache(monkeypatch):
+    monkeypatch.setattr(
+        flight_booking,
+        "flight_cache",
+        ResultCache("flights", MemoryBackend(maxsize=16, ttl=60)),
+    )
+    calls = []
+
+    async def fake_get_json(url, params=None, timeout=None):
+        calls.append(url)
+        if url.endswith("/cheap"):
+            return {
+                "success": True,
+                "data": {"CMB": {"0": {"airline": "UL", "price": 120}}},
+            }
+        return {"success": True, "data": [{"value": 150, "depart_date": "2025-09-02"}]}
+
+    monkeypatch.setattr(flight_booking, "provider_get_json", fake_get_json)
+
+    for _ in range(2):
+        cheapest = await flight_booking.async_get_cheapest_flight(
+            "MAA", "Colombo", "2025-09-10", "2025-09-15"
+        )
+        assert cheapest["destination"] == "CMB"
+    # Same month, different day: shares the v2/prices/latest entry
+    await flight_booking.async_get_multiple_flights("2025-09-10", "MAA", "CMB")
+    await flight_booking.async_get_multiple_flights("2025-09-20", "MAA", "CMB")
+
+    assert len(calls) == 2
+    assert flight_booking.flight_cache.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_flight_lookups_are_not_cached(monkeypatch):
+    monkeypatch.setattr(
+        flight_booking,
+        "flight_cache",
+        ResultCache("flights", MemoryBackend(maxsize=16, ttl=60)),
+    )
+
+    async def failing_get_json(url, params=None, timeout=None):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(flight_booking, "provider_get_json", failing_get_json)
+    assert await flight_booking.async_get_cheapest_flight("MAA", "CMB", "2025-09-10", "") is None
+    assert len(flight_booking.flight_cache.backend) == 0
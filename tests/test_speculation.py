@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import services.speculation as speculation
+from services.speculation import (
+    CONFIRMATION_PROMPT,
+    SpeculativePrefetch,
+    is_confirmation_prompt,
+)
+
+SUMMARY = (
+    "Summary: Destination: Kandy, Sri Lanka, Duration: 3 days, Dates: 10-13 September 2030, "
+    "Preferences: temples, Flight Needs: yes, Origin: Chennai, Hotel Needs: yes, "
+    "Special Requirements: none"
+)
+CONTEXT = [{"role": "assistant", "content": CONFIRMATION_PROMPT}]
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    calls = {"llm": 0, "hotels": []}
+
+    async def fake_generate(history):
+        calls["llm"] += 1
+        assert history[-1] == {"role": "user", "content": "yes"}
+        await asyncio.sleep(0)
+        return SUMMARY
+
+    async def fake_cheapest(origin, destination, depart, ret):
+        return {"origin": origin, "destination": destination}
+
+    async def fake_multiple(depart, origin, destination):
+        return []
+
+    async def fake_hotels(checkin, checkout, destination, budget_preference=None):
+        calls["hotels"].append((checkin, checkout, destination))
+        return []
+
+    monkeypatch.setattr(speculation, "predict_ai_response", fake_generate)
+    monkeypatch.setattr(speculation, "async_get_cheapest_flight", fake_cheapest)
+    monkeypatch.setattr(speculation, "async_get_multiple_flights", fake_multiple)
+    monkeypatch.setattr(speculation, "async_get_hotels_by_budget", fake_hotels)
+    return calls
+
+
+def test_detects_the_confirmation_prompt():
+    assert is_confirmation_prompt(CONFIRMATION_PROMPT)
+    assert is_confirmation_prompt("  ready to provide  summary. please CONFIRM (yes/no)")
+    assert not is_confirmation_prompt("Do you need flight booking assistance? (yes/no)")
+
+
+@pytest.mark.asyncio
+async def test_claim_reuses_matching_speculation(providers):
+    prefetch = SpeculativePrefetch()
+    prefetch.start("s1", CONTEXT)
+
+    warm = await prefetch.claim("s1", "  " + SUMMARY)
+
+    assert warm["params"]["FLIGHT_ORIGIN"] == "MAA"
+    assert warm["params"]["FLIGHT_DEPART_DATE"] == "2030-09-10"
+    assert warm["flights"]["cheapest"] == {"origin": "MAA", "destination": "CMB"}
+    assert providers["hotels"] == [("2030-09-10", "2030-09-13", "Kandy")]
+    assert await prefetch.claim("s1", SUMMARY) is None  # claimed once
+
+
+@pytest.mark.asyncio
+async def test_reformatted_summary_with_the_same_fields_is_a_hit(providers):
+    prefetch = SpeculativePrefetch()
+    prefetch.start("s1", CONTEXT)
+    reformatted = SUMMARY.replace(", Origin: Chennai", ",  origin:  CHENNAI") + "."
+
+    assert await prefetch.claim("s1", reformatted) is not None
+    assert prefetch.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_different_summary_is_a_miss(providers):
+    prefetch = SpeculativePrefetch()
+    prefetch.start("s1", CONTEXT)
+
+    assert await prefetch.claim("s1", SUMMARY.replace("Kandy", "Galle")) is None
+    assert prefetch.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_expiry_drop_the_speculation(providers):
+    now = [0.0]
+    prefetch = SpeculativePrefetch(ttl=60, timer=lambda: now[0])
+
+    prefetch.start("s1", CONTEXT)
+    prefetch.cancel("s1")
+    assert await prefetch.claim("s1", SUMMARY) is None
+
+    prefetch.start("s2", CONTEXT)
+    now[0] = 61
+    assert await prefetch.claim("s2", SUMMARY) is None
+    await prefetch.stop()
+
+
+@pytest.mark.asyncio
+async def test_disabled_prefetch_does_nothing(providers):
+    prefetch = SpeculativePrefetch(enabled=False)
+    prefetch.start("s1", CONTEXT)
+    assert await prefetch.claim("s1", SUMMARY) is None
+    assert providers["llm"] == 0
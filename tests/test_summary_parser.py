@@ -0,0 +1,105 @@
+from datetime import date
+
+import pytest
+
+from utils.summary_parser import (
+    parse_duration_days,
+    parse_summary,
+    parse_summary_fields,
+    parse_trip_dates,
+)
+
+TODAY = date(2025, 8, 1)
+
+
+def test_fields_keep_commas_inside_values():
+    fields = parse_summary_fields(
+        "Summary: Destination: Kandy, Sri Lanka, Duration: 10 days, Dates: 20 August, "
+        "Preferences: food, culture, Flight Needs: Yes, Origin: Chennai, "
+        "Hotel Needs: Yes, Special Requirements: None"
+    )
+    assert fields["destination"] == "Kandy, Sri Lanka"
+    assert fields["preferences"] == "food, culture"
+    assert fields["special_requirements"] == "None"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("5 days", 5),
+        ("7-day trip", 7),
+        ("4 nights", 4),
+        ("two weeks", 14),
+        ("a fortnight", 14),
+        ("ten days", 10),
+        ("12", 12),
+        ("flexible", None),
+    ],
+)
+def test_parse_duration_days(text, expected):
+    assert parse_duration_days(text) == expected
+
+
+@pytest.mark.parametrize(
+    "dates, duration, expected",
+    [
+        ("Sep 10", 5, ("2025-09-10", "2025-09-15")),
+        ("10th September 2025", None, ("2025-09-10", None)),
+        ("September 10-15", None, ("2025-09-10", "2025-09-15")),
+        ("10 - 15 Oct, 2025", None, ("2025-10-10", "2025-10-15")),
+        ("Sep 10 to Sep 20, 2025", None, ("2025-09-10", "2025-09-20")),
+        ("2025-09-10 to 2025-09-12", None, ("2025-09-10", "2025-09-12")),
+        ("10/09/2025", 3, ("2025-09-10", "2025-09-13")),
+        ("28 December - 4 January", None, ("2025-12-28", "2026-01-04")),
+        ("March 3", 2, ("2026-03-03", "2026-03-05")),  # already passed this year
+        ("5 September 2023", 2, ("2025-09-05", "2025-09-07")),  # stale year
+        ("sometime in autumn", 5, (None, None)),
+    ],
+)
+def test_parse_trip_dates(dates, duration, expected):
+    depart, ret = parse_trip_dates(dates, duration, today=TODAY)
+    got = (
+        depart.isoformat() if depart else None,
+        ret.isoformat() if ret else None,
+    )
+    assert got == expected
+
+
+def test_parse_summary_resolves_codes_and_return_date():
+    params = parse_summary(
+        "Summary: Destination: Bangkok, Duration: 5 days, Dates: Sep 10, "
+        "Preferences: food & culture, Flight Needs: Yes, Origin: Chennai (MAA), "
+        "Hotel Needs: Yes, Special Requirements: none",
+        today=TODAY,
+    )
+    assert params == {
+        "FLIGHT_ORIGIN": "MAA",
+        "FLIGHT_DESTINATION": "BKK",
+        "FLIGHT_DEPART_DATE": "2025-09-10",
+        "FLIGHT_RETURN_DATE": "2025-09-15",
+    }
+
+
+def test_parse_summary_without_flights_needs_no_origin():
+    params = parse_summary(
+        "Summary: Destination: Paris, Duration: 4 days, Dates: 5 September, "
+        "Preferences: art, Flight Needs: No, Origin: N/A, Hotel Needs: Yes, "
+        "Special Requirements: none",
+        today=TODAY,
+    )
+    assert params["FLIGHT_ORIGIN"] == ""
+    assert params["FLIGHT_DEPART_DATE"] == "2025-09-05"
+
+
+@pytest.mark.parametrize(
+    "summary",
+    [
+        "Ready to provide summary. Please confirm (yes/no).",
+        "Summary: Destination: Bali, Duration: 5 days, Dates: mid September, "
+        "Flight Needs: yes, Origin: Singapore",
+        "Summary: Destination: Bali, Duration: 5 days, Dates: Sep 10, "
+        "Flight Needs: yes, Origin: N/A",
+    ],
+)
+def test_parse_summary_defers_to_llm_when_unsure(summary):
+    assert parse_summary(summary, today=TODAY) is None
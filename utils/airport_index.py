@@ -0,0 +1,253 @@
+import csv
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+AIRPORTS_CSV = os.path.join(DATA_DIR, "airports.csv")
+PLACES_CSV = os.path.join(DATA_DIR, "places.csv")
+
+# Dice similarity over character trigrams a fuzzy match must reach
+FUZZY_THRESHOLD = 0.6
+FUZZY_MIN_LENGTH = 4
+
+_IATA_RE = re.compile(r"^[A-Z]{3}$")
+_IATA_IN_PARENS_RE = re.compile(r"\(([A-Z]{3})\)")
+_AIRPORT_WORDS_RE = re.compile(r"\b(?:international )?airport\b")
+_PART_SPLIT_RE = re.compile(r"[,/;]+|\s+-\s+")
+
+
+class Airport(NamedTuple):
+    iata: str
+    city_code: str
+    name: str
+    city: str
+    country: str
+    lat: float
+    lon: float
+    major: bool
+    aliases: tuple = ()
+
+    @property
+    def code(self) -> str:
+        """Code to search fares with: the metro code when a city has several airports."""
+        return self.city_code or self.iata
+
+
+class Place(NamedTuple):
+    name: str
+    lat: Optional[float]
+    lon: Optional[float]
+    code: str
+    aliases: tuple
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, strip accents and punctuation: "Malé " → "male"."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+    if text.startswith("the "):
+        text = text[4:]
+    return text
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+class AirportIndex:
+    """In-memory name → IATA index over the bundled airport and place data.
+
+    Cities resolve to their metro code (LON, TYO) when they have several
+    airports, airport names to the airport itself, and regions/landmarks to
+    the nearest major airport.
+    """
+
+    def __init__(self, airports: Iterable[Airport], places: Iterable[Place] = ()):
+        self.airports = {}
+        self._codes = set()
+        self._names = {}
+        self._trigram_counts = {}
+        self._trigram_postings = defaultdict(set)
+
+        airports = list(airports)
+        for airport in airports:
+            self.airports[airport.iata] = airport
+            self._codes.add(airport.iata)
+            if airport.city_code:
+                self._codes.add(airport.city_code)
+        self._major = [a for a in self.airports.values() if a.major]
+
+        # Cities first so a city name never resolves to a single airport
+        # of a multi-airport metro
+        for airport in airports:
+            self._add_name(airport.city, airport.code)
+            for alias in airport.aliases:
+                self._add_name(alias, airport.code)
+        for airport in airports:
+            name = normalize_name(airport.name)
+            self._add_name(name, airport.iata)
+            short = _AIRPORT_WORDS_RE.sub("", name).strip()
+            if short:
+                self._add_name(short, airport.iata)
+
+        for place in places:
+            code = place.code
+            if not code and place.lat is not None and place.lon is not None:
+                nearest = self.nearest_airport(place.lat, place.lon)
+                code = nearest.code if nearest else ""
+            if not code:
+                continue
+            for name in (place.name, *place.aliases):
+                self._add_name(name, code)
+
+    def _add_name(self, name: str, code: str) -> None:
+        key = normalize_name(name)
+        if not key or key in self._names:
+            return
+        self._names[key] = code
+        grams = _trigrams(key)
+        self._trigram_counts[key] = len(grams)
+        for gram in grams:
+            self._trigram_postings[gram].add(key)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def is_known_code(self, code: str) -> bool:
+        return code in self._codes
+
+    def nearest_airport(
+        self, lat: float, lon: float, major_only: bool = True
+    ) -> Optional[Airport]:
+        candidates = self._major if major_only else self.airports.values()
+        return min(
+            candidates,
+            key=lambda a: haversine_km(lat, lon, a.lat, a.lon),
+            default=None,
+        )
+
+    def exact(self, name: str) -> str:
+        return self._names.get(normalize_name(name), "")
+
+    def fuzzy(self, name: str) -> str:
+        """Closest known name by trigram similarity, or "" below the threshold."""
+        key = normalize_name(name)
+        if len(key) < FUZZY_MIN_LENGTH:
+            return ""
+        grams = _trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigram_postings.get(gram, ()):
+                shared[candidate] += 1
+        best, best_score = "", 0.0
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + self._trigram_counts[candidate])
+            if score > best_score:
+                best, best_score = candidate, score
+        if best_score < FUZZY_THRESHOLD:
+            return ""
+        return self._names[best]
+
+    def lookup(self, place: str) -> str:
+        """Best IATA code for free text; empty string if nothing matches.
+
+        Tries an explicit "(CODE)" or a bare uppercase code that the index
+        knows, an exact name or alias, then each comma-separated part
+        ("Kandy, Sri Lanka"), and finally a fuzzy match on the same
+        candidates. Unknown codes ("UAE", "(XYZ)") fall through to the names.
+        """
+        if not place:
+            return ""
+        place = place.strip()
+        m = _IATA_IN_PARENS_RE.search(place)
+        if m and self.is_known_code(m.group(1)):
+            return m.group(1)
+        if _IATA_RE.fullmatch(place) and self.is_known_code(place):
+            return place
+
+        parts = [p.strip() for p in _PART_SPLIT_RE.split(place) if p.strip()]
+        candidates = [place] + (parts if len(parts) > 1 else [])
+        for candidate in candidates:
+            code = self.exact(candidate)
+            if code:
+                return code
+        for candidate in candidates:
+            code = self.fuzzy(candidate)
+            if code:
+                return code
+        return ""
+
+
+def _read_csv(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _split_aliases(value: str) -> tuple:
+    return tuple(a.strip() for a in (value or "").split("|") if a.strip())
+
+
+def load_airport_index(
+    airports_path: str = AIRPORTS_CSV, places_path: str = PLACES_CSV
+) -> AirportIndex:
+    airports = [
+        Airport(
+            iata=row["iata"],
+            city_code=row["city_code"],
+            name=row["name"],
+            city=row["city"],
+            country=row["country"],
+            lat=float(row["lat"]),
+            lon=float(row["lon"]),
+            major=row["major"] == "1",
+            aliases=_split_aliases(row["aliases"]),
+        )
+        for row in _read_csv(airports_path)
+    ]
+    places = [
+        Place(
+            name=row["name"],
+            lat=float(row["lat"]) if row["lat"] else None,
+            lon=float(row["lon"]) if row["lon"] else None,
+            code=row["code"],
+            aliases=_split_aliases(row["aliases"]),
+        )
+        for row in (_read_csv(places_path) if places_path else [])
+    ]
+    return AirportIndex(airports, places)
+
+
+_index: Optional[AirportIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index() -> AirportIndex:
+    """Return the shared index, loading the bundled data on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_airport_index()
+    return _index
+
+
+def resolve_iata(place: str) -> str:
+    """Best-effort IATA code for a place name; empty string if unknown."""
+    return get_airport_index().lookup(place)
@@ -1,10 +1,11 @@
-from openai import AsyncOpenAI
-from core.config import settings
 from core.logging import logger
+from services.llm_client import create_chat_completion
+from services.metrics import track
 import asyncio
 import json
 
 
+@track("create_user_friendly_response")
 async def create_user_friendly_response(
     trip_text: str, hotels_text: str | None = None
 ) -> str:
@@ -20,10 +21,6 @@ async def create_user_friendly_response(
 
     logger.info("Creating user-friendly combined response")
 
-    client = AsyncOpenAI(
-        api_key=settings.OPENAI_API_KEY,
-    )
-
     # Minimal: convert inputs to plain strings and let the LLM interpret them.
     # This avoids heavy parsing logic here; chat endpoint can pass either text or
     # a machine-generated dict (stringified). The LLM is instructed below to
@@ -62,7 +59,7 @@ async def create_user_friendly_response(
     ]
 
     try:
-        resp = await client.chat.completions.create(
+        resp = await create_chat_completion(
             model="gpt-3.5-turbo", messages=messages, max_tokens=900
         )
         content = resp.choices[0].message.content.strip()
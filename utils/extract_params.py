@@ -3,14 +3,16 @@ import re
 import json
 import asyncio
 
-from openai import AsyncOpenAI
-from core.config import settings
 from core.logging import logger
-import datetime
+from services.llm_client import create_chat_completion
+from services.metrics import track
+from utils.airport_index import resolve_iata
+from utils.summary_parser import parse_summary
 
-current_year = datetime.datetime.now().year
+current_year = datetime.now().year
 
 
+@track("extract_params_with_llm")
 async def extract_params_with_llm(summary: str) -> dict:
     """Use Azure OpenAI to extract flight params from a one-line summary.
 
@@ -33,17 +35,13 @@ async def extract_params_with_llm(summary: str) -> dict:
         "- Return valid JSON only — no markdown, no explanation, no extra fields.\n"
     )
 
-    client = AsyncOpenAI(
-        api_key=settings.OPENAI_API_KEY,
-    )
-
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": summary},
     ]
 
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(
             model="gpt-3.5-turbo",
             messages=messages,
             max_tokens=200,
@@ -70,9 +68,30 @@ async def extract_params_with_llm(summary: str) -> dict:
         }
 
 
+async def extract_params(summary: str) -> dict:
+    """Extract flight params from a one-line summary, preferring the local parser.
+
+    The "Summary:" line follows a fixed grammar, so `parse_summary` handles it
+    deterministically in most cases; the LLM is only consulted when it cannot.
+    Returns the same keys as `extract_params_with_llm`.
+    """
+    try:
+        params = parse_summary(summary)
+    except Exception as e:
+        logger.error(f"Local summary parsing failed: {e}")
+        params = None
+
+    if params is not None:
+        logger.info("Flight params extracted locally")
+        return params
+
+    logger.info("Local summary parsing inconclusive, falling back to LLM")
+    return normalize_params(await extract_params_with_llm(summary), summary)
+
+
 def normalize_params(params: dict, summary: str) -> dict:
     """Validate/normalize LLM output:
-    - Ensure IATA codes are 3 uppercase letters; if not, try simple mapping from common names in the summary.
+    - Ensure IATA codes are 3 uppercase letters; if not, resolve the place name via the bundled airport index.
     - If depart date year is in the past, roll it forward to the current year preserving month/day.
     - If return date is empty and summary contains a duration (N days), compute return = depart + N days.
     """
@@ -82,14 +101,11 @@ def normalize_params(params: dict, summary: str) -> dict:
     def _ensure_iata(code: str) -> str:
         if not code:
             return ""
-        code = code.strip().upper()
+        code = code.strip()
         if re.fullmatch(r"[A-Z]{3}", code):
             return code
-        # try very small heuristics: if code looks like a city name, take first 3 letters
-        t = re.split(r"[,\s/()\-]+", code)[0]
-        if len(t) >= 3:
-            return t[:3].upper()
-        return ""
+        # a city, region or landmark name ("Colombo", "Himalayas")
+        return resolve_iata(code)
 
     out["FLIGHT_ORIGIN"] = _ensure_iata(out.get("FLIGHT_ORIGIN", ""))
     out["FLIGHT_DESTINATION"] = _ensure_iata(out.get("FLIGHT_DESTINATION", ""))
@@ -1,14 +1,28 @@
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 
+from core.config import settings
+from core.logging import Payload, logger
+from services.provider_client import provider_get_json, provider_get_json_sync
+from services.result_cache import MemoryBackend, ResultCache
+from utils.airport_index import resolve_iata
+
 load_dotenv()
 # ====== CONFIGURATION ======
 API_TOKEN = os.getenv("TRAVELPAYOUTS_API_KEY")
 MARKER = "659627"
 CURRENCY = "USD"
 
+# Travelpayouts already serves these endpoints from its own cache, so a
+# short local TTL only trims repeat calls for popular routes
+flight_cache = ResultCache(
+    "flights",
+    MemoryBackend(
+        maxsize=settings.FLIGHT_CACHE_MAXSIZE, ttl=settings.FLIGHT_CACHE_TTL
+    ),
+)
+
 # ====== FLIGHT DEFAULTS ======
 # FLIGHT_ORIGIN = "MOW"
 # FLIGHT_DESTINATION = "HKT"
@@ -16,7 +30,19 @@ CURRENCY = "USD"
 # FLIGHT_RETURN_DATE = "2025-09-15"
 
 
+def airport_code(place):
+    """IATA code for `place`, resolving city/landmark names via the airport index."""
+    if not place:
+        return place
+    return resolve_iata(place) or place
+
+
+def _flight_cache_key(kind, origin, destination, depart, ret):
+    return (kind, origin, destination, depart or "", ret or "", CURRENCY)
+
+
 def build_flight_link(origin, departure_at, destination, return_at=None):
+    origin, destination = airport_code(origin), airport_code(destination)
     dep_str = ""
     if departure_at:
         try:
@@ -48,20 +74,25 @@ def build_flight_link(origin, departure_at, destination, return_at=None):
     return link
 
 
-def get_cheapest_flight(
+def _cheapest_flight_request(
     FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
 ):
-    print("\n===== Cheapest Flight =====")
-    url = (
-        f"https://api.travelpayouts.com/v1/prices/cheap?"
-        f"origin={FLIGHT_ORIGIN}&destination={FLIGHT_DESTINATION}"
-        f"&depart_date={FLIGHT_DEPART_DATE}&return_date={FLIGHT_RETURN_DATE}"
-        f"&currency={CURRENCY}&token={API_TOKEN}"
-    )
-    res = requests.get(url).json()
+    url = "https://api.travelpayouts.com/v1/prices/cheap"
+    params = {
+        "origin": FLIGHT_ORIGIN,
+        "destination": FLIGHT_DESTINATION,
+        "depart_date": FLIGHT_DEPART_DATE,
+        "return_date": FLIGHT_RETURN_DATE,
+        "currency": CURRENCY,
+        "token": API_TOKEN,
+    }
+    return url, params
+
+
+def _parse_cheapest_flight(res, FLIGHT_ORIGIN, FLIGHT_DESTINATION):
     if not res.get("success"):
-        print("Error:", res)
-        return
+        logger.error("Cheapest flight lookup failed: %s", Payload(res))
+        return None
     flights = list(res["data"].get(FLIGHT_DESTINATION, {}).values())
     if flights:
         f = flights[0]
@@ -70,27 +101,50 @@ def get_cheapest_flight(
         link = build_flight_link(
             FLIGHT_ORIGIN, f.get("departure_at"), FLIGHT_DESTINATION, f.get("return_at")
         )
-        print(
-            f"{FLIGHT_ORIGIN} → {FLIGHT_DESTINATION} | Airline: {airline} | Price: {price} {CURRENCY} | Link: {link}"
+        logger.debug(
+            "%s → %s | Airline: %s | Price: %s %s | Link: %s",
+            FLIGHT_ORIGIN,
+            FLIGHT_DESTINATION,
+            airline,
+            price,
+            CURRENCY,
+            link,
         )
+        return {
+            "origin": FLIGHT_ORIGIN,
+            "destination": FLIGHT_DESTINATION,
+            "airline": airline,
+            "price": price,
+            "currency": CURRENCY,
+            "link": link,
+        }
     else:
-        print("No flights found.")
+        logger.debug("No flights found for %s → %s", FLIGHT_ORIGIN, FLIGHT_DESTINATION)
+        return None
 
 
-def get_multiple_flights(FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION):
-    print("\n===== Multiple Flight Options =====")
+def _multiple_flights_request(FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION):
     beginning_of_period = FLIGHT_DEPART_DATE[:7] + "-01"
-    url = (
-        f"https://api.travelpayouts.com/v2/prices/latest?"
-        f"origin={FLIGHT_ORIGIN}&destination={FLIGHT_DESTINATION}"
-        f"&currency={CURRENCY}&token={API_TOKEN}&limit=5"
-        f"&period_type=month&beginning_of_period={beginning_of_period}"
-        f"&one_way=false&show_to_affiliates=true"
-    )
-    res = requests.get(url).json()
+    url = "https://api.travelpayouts.com/v2/prices/latest"
+    params = {
+        "origin": FLIGHT_ORIGIN,
+        "destination": FLIGHT_DESTINATION,
+        "currency": CURRENCY,
+        "token": API_TOKEN,
+        "limit": 5,
+        "period_type": "month",
+        "beginning_of_period": beginning_of_period,
+        "one_way": "false",
+        "show_to_affiliates": "true",
+    }
+    return url, params
+
+
+def _parse_multiple_flights(res, FLIGHT_ORIGIN, FLIGHT_DESTINATION):
     if not res.get("success"):
-        print("Error:", res)
-        return
+        logger.error("Flight options lookup failed: %s", Payload(res))
+        return []
+    options = []
     for f in res.get("data", []):
         airline = "N/A"
         price = f.get("value") or "N/A"
@@ -100,6 +154,124 @@ def get_multiple_flights(FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION):
             FLIGHT_DESTINATION,
             f.get("return_date"),
         )
-        print(
-            f"{FLIGHT_ORIGIN} → {FLIGHT_DESTINATION} | Airline: {airline} | Price: {price} {CURRENCY} | Link: {link}"
+        logger.debug(
+            "%s → %s | Airline: %s | Price: %s %s | Link: %s",
+            FLIGHT_ORIGIN,
+            FLIGHT_DESTINATION,
+            airline,
+            price,
+            CURRENCY,
+            link,
+        )
+        options.append(
+            {
+                "origin": FLIGHT_ORIGIN,
+                "destination": FLIGHT_DESTINATION,
+                "airline": airline,
+                "price": price,
+                "currency": CURRENCY,
+                "link": link,
+            }
         )
+    return options
+
+
+def get_cheapest_flight(
+    FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
+):
+    FLIGHT_ORIGIN = airport_code(FLIGHT_ORIGIN)
+    FLIGHT_DESTINATION = airport_code(FLIGHT_DESTINATION)
+    key = _flight_cache_key(
+        "cheap", FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
+    )
+    found, cached = flight_cache.get(key)
+    if found:
+        return cached
+    url, params = _cheapest_flight_request(
+        FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
+    )
+    try:
+        res = provider_get_json_sync(url, params)
+    except Exception as e:
+        logger.error("Error fetching cheapest flight: %s", e)
+        return None
+    flight = _parse_cheapest_flight(res, FLIGHT_ORIGIN, FLIGHT_DESTINATION)
+    if flight:
+        flight_cache.set(key, flight)
+    return flight
+
+
+def get_multiple_flights(FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION):
+    FLIGHT_ORIGIN = airport_code(FLIGHT_ORIGIN)
+    FLIGHT_DESTINATION = airport_code(FLIGHT_DESTINATION)
+    url, params = _multiple_flights_request(
+        FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION
+    )
+    # v2/prices/latest is queried per month, so all dates in it share an entry
+    key = _flight_cache_key(
+        "latest", FLIGHT_ORIGIN, FLIGHT_DESTINATION, params["beginning_of_period"], ""
+    )
+    found, cached = flight_cache.get(key)
+    if found:
+        return cached
+    try:
+        res = provider_get_json_sync(url, params)
+    except Exception as e:
+        logger.error("Error fetching flight options: %s", e)
+        return []
+    options = _parse_multiple_flights(res, FLIGHT_ORIGIN, FLIGHT_DESTINATION)
+    if options:
+        flight_cache.set(key, options)
+    return options
+
+
+async def async_get_cheapest_flight(
+    FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
+):
+    """Non-blocking `get_cheapest_flight` on the shared provider client."""
+    FLIGHT_ORIGIN = airport_code(FLIGHT_ORIGIN)
+    FLIGHT_DESTINATION = airport_code(FLIGHT_DESTINATION)
+    key = _flight_cache_key(
+        "cheap", FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
+    )
+    found, cached = flight_cache.get(key)
+    if found:
+        return cached
+    url, params = _cheapest_flight_request(
+        FLIGHT_ORIGIN, FLIGHT_DESTINATION, FLIGHT_DEPART_DATE, FLIGHT_RETURN_DATE
+    )
+    try:
+        res = await provider_get_json(url, params)
+    except Exception as e:
+        logger.error("Error fetching cheapest flight: %s", e)
+        return None
+    flight = _parse_cheapest_flight(res, FLIGHT_ORIGIN, FLIGHT_DESTINATION)
+    if flight:
+        flight_cache.set(key, flight)
+    return flight
+
+
+async def async_get_multiple_flights(
+    FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION
+):
+    """Non-blocking `get_multiple_flights` on the shared provider client."""
+    FLIGHT_ORIGIN = airport_code(FLIGHT_ORIGIN)
+    FLIGHT_DESTINATION = airport_code(FLIGHT_DESTINATION)
+    url, params = _multiple_flights_request(
+        FLIGHT_DEPART_DATE, FLIGHT_ORIGIN, FLIGHT_DESTINATION
+    )
+    key = _flight_cache_key(
+        "latest", FLIGHT_ORIGIN, FLIGHT_DESTINATION, params["beginning_of_period"], ""
+    )
+    found, cached = flight_cache.get(key)
+    if found:
+        return cached
+    try:
+        res = await provider_get_json(url, params)
+    except Exception as e:
+        logger.error("Error fetching flight options: %s", e)
+        return []
+    options = _parse_multiple_flights(res, FLIGHT_ORIGIN, FLIGHT_DESTINATION)
+    if options:
+        flight_cache.set(key, options)
+    return options
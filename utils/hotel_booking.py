@@ -1,8 +1,16 @@
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 import json
+import asyncio
+import logging
+
+from core.config import settings
+from core.logging import logger
+from services.metrics import track
+from services.provider_client import provider_get_json, provider_get_json_sync
+from services.result_cache import MemoryBackend, ResultCache
+from utils.hotel_ranking import rank_hotels
 
 load_dotenv()
 
@@ -13,50 +21,61 @@ CURRENCY = "USD"
 HOTEL_LIMIT = 5
 HOTEL_CURRENCY = "USD"
 
+# Raw Hotellook results per stay; budget filtering is applied per request
+hotel_cache = ResultCache(
+    "hotels",
+    MemoryBackend(maxsize=settings.HOTEL_CACHE_MAXSIZE, ttl=settings.HOTEL_CACHE_TTL),
+)
 
-def get_hotels_by_budget(
-    HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION, budget_preference=None
-):
-    """Get hotel details for a specific destination, date range, and budget preference"""
-    print(
-        f"\n===== Hotels for {HOTEL_DESTINATION} ({HOTEL_CHECKIN} to {HOTEL_CHECKOUT}) ====="
+
+def _hotel_cache_key(HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION):
+    return (
+        HOTEL_DESTINATION.strip().lower(),
+        HOTEL_CHECKIN,
+        HOTEL_CHECKOUT,
+        HOTEL_CURRENCY,
     )
 
-    if budget_preference:
-        print(f"Budget preference: {budget_preference}")
 
-    if not HOTEL_CHECKIN or not HOTEL_CHECKOUT:
-        print("Missing check-in or check-out dates.")
-        return []
+def _is_hotel_list(res):
+    return isinstance(res, list) and len(res) > 0
+
 
+def _hotel_search_request(HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION):
     url = "https://engine.hotellook.com/api/v2/cache.json"
     params = {
         "location": HOTEL_DESTINATION,
         "currency": HOTEL_CURRENCY,
         "checkIn": HOTEL_CHECKIN,
         "checkOut": HOTEL_CHECKOUT,
-        "limit": 20,  # Get more hotels for filtering
+        "limit": settings.HOTEL_CANDIDATE_LIMIT,  # Wide pool for ranking
         "token": API_TOKEN,
     }
+    return url, params
 
-    try:
-        res = requests.get(url, params=params).json()
-        if not res:
-            print("No hotel data found.")
-            return []
-
-        all_hotels = []
-        for hotel in res:
-            name = hotel.get("hotelName", "Unknown Hotel")
-            stars = hotel.get("stars", 0)
-            price = hotel.get("priceFrom")
-            hotel_id = hotel.get("hotelId", "")
 
-            link = f"https://search.hotellook.com/?marker={MARKER}&currency={HOTEL_CURRENCY}&destination={HOTEL_DESTINATION}&checkIn={HOTEL_CHECKIN}&checkOut={HOTEL_CHECKOUT}"
-            if hotel_id:
-                link += f"&hotelId={hotel_id}"
+def _parse_hotels(
+    res, HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION, budget_preference
+):
+    if not res:
+        logger.debug("No hotel data found for %s", HOTEL_DESTINATION)
+        return []
 
-            hotel_info = {
+    # Rank the whole candidate pool, then build entries for the top few only
+    filtered_hotels = []
+    for index in rank_hotels(res, budget_preference, k=HOTEL_LIMIT):
+        hotel = res[index]
+        name = hotel.get("hotelName", "Unknown Hotel")
+        stars = hotel.get("stars", 0)
+        price = hotel.get("priceFrom")
+        hotel_id = hotel.get("hotelId", "")
+
+        link = f"https://search.hotellook.com/?marker={MARKER}&currency={HOTEL_CURRENCY}&destination={HOTEL_DESTINATION}&checkIn={HOTEL_CHECKIN}&checkOut={HOTEL_CHECKOUT}"
+        if hotel_id:
+            link += f"&hotelId={hotel_id}"
+
+        filtered_hotels.append(
+            {
                 "name": name,
                 "stars": stars,
                 "price": price or 0,
@@ -64,95 +83,233 @@ def get_hotels_by_budget(
                 "link": link,
                 "hotel_id": hotel_id,
             }
-            all_hotels.append(hotel_info)
-
-        # Filter hotels based on budget preference
-        filtered_hotels = filter_hotels_by_budget(all_hotels, budget_preference)
-
-        # Limit to top 5 after filtering
-        filtered_hotels = filtered_hotels[:HOTEL_LIMIT]
+        )
 
+    if logger.isEnabledFor(logging.DEBUG):
         for hotel in filtered_hotels:
-            print(
-                f"{hotel['name']} ({hotel['stars']}⭐) | From {hotel['price']} {hotel['currency'] if hotel['price'] else ''} | Link: {hotel['link']}"
+            logger.debug(
+                "%s (%s⭐) | From %s %s | Link: %s",
+                hotel["name"],
+                hotel["stars"],
+                hotel["price"],
+                hotel["currency"],
+                hotel["link"],
             )
 
-        return filtered_hotels
+    return filtered_hotels
+
+
+def get_hotels_by_budget(
+    HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION, budget_preference=None
+):
+    """Get hotel details for a specific destination, date range, and budget preference"""
+    logger.debug(
+        "Hotels for %s (%s to %s), budget %s",
+        HOTEL_DESTINATION,
+        HOTEL_CHECKIN,
+        HOTEL_CHECKOUT,
+        budget_preference,
+    )
+
+    if not HOTEL_CHECKIN or not HOTEL_CHECKOUT:
+        logger.warning("Missing check-in or check-out dates for %s", HOTEL_DESTINATION)
+        return []
+
+    url, params = _hotel_search_request(
+        HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION
+    )
+
+    try:
+        key = _hotel_cache_key(HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION)
+        found, res = hotel_cache.get(key)
+        if not found:
+            res = provider_get_json_sync(url, params)
+            if _is_hotel_list(res):
+                hotel_cache.set(key, res)
+        return _parse_hotels(
+            res, HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION, budget_preference
+        )
 
     except Exception as e:
-        print(f"Error fetching hotel data for {HOTEL_DESTINATION}:", e)
+        logger.error("Error fetching hotel data for %s: %s", HOTEL_DESTINATION, e)
         return []
 
 
-def filter_hotels_by_budget(hotels, budget_preference):
-    """Filter hotels based on budget preference"""
-    if not budget_preference or not hotels:
-        return hotels
-
-    # Remove hotels with no price data
-    hotels_with_price = [h for h in hotels if h["price"] > 0]
-
-    if not hotels_with_price:
-        return hotels[:5]  # Return original if no price data
-
-    # Sort by price
-    hotels_with_price.sort(key=lambda x: x["price"])
-
-    budget_lower = budget_preference.lower()
-
-    if any(
-        word in budget_lower
-        for word in ["budget", "cheap", "affordable", "low cost", "economical"]
-    ):
-        # Budget-friendly: lowest 60% of prices
-        budget_count = max(1, int(len(hotels_with_price) * 0.6))
-        return hotels_with_price[:budget_count]
-
-    elif any(
-        word in budget_lower
-        for word in [
-            "luxury",
-            "premium",
-            "high-end",
-            "expensive",
-            "5 star",
-            "five star",
-        ]
-    ):
-        # Luxury: highest 40% of prices
-        luxury_count = max(1, int(len(hotels_with_price) * 0.4))
-        return hotels_with_price[-luxury_count:]
-
-    elif any(word in budget_lower for word in ["mid", "medium", "moderate", "average"]):
-        # Mid-range: middle 60% of prices
-        total = len(hotels_with_price)
-        start = int(total * 0.2)  # Skip bottom 20%
-        end = int(total * 0.8)  # Skip top 20%
-        return hotels_with_price[start:end]
-
-    # Check for specific price ranges (e.g., "under 100", "less than 150", "below 200")
-    price_keywords = ["under", "less than", "below", "maximum", "max", "up to"]
-    for keyword in price_keywords:
-        if keyword in budget_lower:
-            try:
-                # Extract number from the budget preference
-                import re
+async def async_get_hotels_by_budget(
+    HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION, budget_preference=None
+):
+    """Non-blocking `get_hotels_by_budget` on the shared provider client."""
+    logger.debug(
+        "Hotels for %s (%s to %s), budget %s",
+        HOTEL_DESTINATION,
+        HOTEL_CHECKIN,
+        HOTEL_CHECKOUT,
+        budget_preference,
+    )
+
+    if not HOTEL_CHECKIN or not HOTEL_CHECKOUT:
+        logger.warning("Missing check-in or check-out dates for %s", HOTEL_DESTINATION)
+        return []
+
+    url, params = _hotel_search_request(
+        HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION
+    )
+
+    try:
+        # Concurrent sessions searching the same stay share one Hotellook call
+        res = await hotel_cache.get_or_load(
+            _hotel_cache_key(HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION),
+            lambda: provider_get_json(url, params),
+            cacheable=_is_hotel_list,
+        )
+        return _parse_hotels(
+            res, HOTEL_CHECKIN, HOTEL_CHECKOUT, HOTEL_DESTINATION, budget_preference
+        )
+
+    except Exception as e:
+        logger.error("Error fetching hotel data for %s: %s", HOTEL_DESTINATION, e)
+        return []
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
 
-                numbers = re.findall(r"\d+", budget_preference)
-                if numbers:
-                    max_price = int(numbers[0])
-                    return [h for h in hotels_with_price if h["price"] <= max_price]
-            except:
-                pass
+class StayCoalescer:
+    """Incremental `coalesce_stays`: feed days in order, collect closed stays.
+
+    A stay is closed once a day arrives that cannot extend it, so its hotel
+    search can start before the rest of the trip is known.
+    """
+
+    def __init__(self):
+        self._current = None
+
+    def add(self, day_key, day_info):
+        """Add one day; returns the stays (0-2) that are now complete."""
+        # Validate day_info structure
+        if not isinstance(day_info, dict):
+            logger.warning("%s data is not a dictionary. Skipping.", day_key)
+            return []
+
+        checkin = day_info.get("HOTEL_CHECKIN")
+        checkout = day_info.get("HOTEL_CHECKOUT")
+        destination = day_info.get("HOTEL_DESTINATION")
+
+        # Validate required fields
+        if not all([checkin, checkout, destination]):
+            logger.warning(
+                "Missing hotel data for %s (check-in: %s, check-out: %s, "
+                "destination: %s). Skipping.",
+                day_key,
+                checkin,
+                checkout,
+                destination,
+            )
+            return []
+
+        current = self._current
+        checkin_date, checkout_date = _parse_date(checkin), _parse_date(checkout)
+        if (
+            current is not None
+            and current["destination"].strip().lower() == destination.strip().lower()
+            and checkin_date is not None
+            and checkout_date is not None
+            and current["_checkin"] <= checkin_date <= current["_checkout"]
+        ):
+            if checkout_date > current["_checkout"]:
+                current["_checkout"] = checkout_date
+                current["checkout"] = checkout
+            current["days"].append(day_key)
+            return []
+
+        closed = self.finish()
+        self._current = {
+            "destination": destination,
+            "checkin": checkin,
+            "checkout": checkout,
+            "days": [day_key],
+            "_checkin": checkin_date,
+            "_checkout": checkout_date,
+        }
+        # Unparseable dates never merge, but still get their own search
+        if checkin_date is None or checkout_date is None:
+            closed += self.finish()
+        return closed
+
+    def finish(self):
+        """Close the open stay, if any; returns it as a one-item list."""
+        stay, self._current = self._current, None
+        if stay is None:
+            return []
+        checkin_date, checkout_date = stay.pop("_checkin"), stay.pop("_checkout")
+        stay["nights"] = (
+            (checkout_date - checkin_date).days
+            if checkin_date and checkout_date
+            else None
+        )
+        return [stay]
 
-    # Default: return all hotels sorted by price
-    return hotels_with_price
 
+def coalesce_stays(days_map):
+    """
+    Merge consecutive days in the same destination into multi-night stays
+
+    The trip planner emits one HOTEL_CHECKIN/HOTEL_CHECKOUT pair per day, so a
+    five-night stay in Kandy arrives as five one-night entries. A day extends
+    the current stay when it is in the same destination and checks in no later
+    than the stay checks out (back-to-back or repeated nights).
+
+    Returns:
+        List of stays in day order, each {"destination", "checkin", "checkout",
+        "nights", "days"}, where "days" lists the day keys the stay covers.
+        Days with missing or malformed hotel data are skipped.
+    """
+    coalescer = StayCoalescer()
+    stays = []
+    for day_key, day_info in (days_map or {}).items():
+        stays += coalescer.add(day_key, day_info)
+    return stays + coalescer.finish()
+
+
+def _stay_result(stay, hotels, error=None):
+    result = {
+        "destination": stay["destination"],
+        "checkin": stay["checkin"],
+        "checkout": stay["checkout"],
+        "nights": stay["nights"],
+        "hotels": hotels,
+        "hotel_count": len(hotels),
+    }
+    if error is not None:
+        result["error"] = error
+    return result
+
+
+def _log_stays(stays):
+    for stay in stays:
+        if len(stay["days"]) > 1:
+            logger.debug(
+                "Merged %s into one stay in %s (%s to %s)",
+                ", ".join(stay["days"]),
+                stay["destination"],
+                stay["checkin"],
+                stay["checkout"],
+            )
 
+
+@track("process_days_hotels")
 def process_days_hotels(days_map, budget_preference=None):
     """
     Process the days map and get hotel details for each day
 
+    Consecutive days in the same destination are merged into one stay (see
+    `coalesce_stays`), searched once, and the stay's result is copied onto
+    each of its days.
+
     Args:
         days_map: Dictionary containing day information with hotel details
                  Format: {
@@ -169,85 +326,151 @@ def process_days_hotels(days_map, budget_preference=None):
         Dictionary with hotel details for each day
     """
     if not days_map:
-        print("No days data provided.")
+        logger.debug("No days data provided.")
         return {}
 
-    all_hotels_data = {}
-    processed_stays = set()  # Track unique stays to avoid duplicates
+    logger.debug("Processing hotel search for each day, budget %s", budget_preference)
 
-    print("Processing hotel search for each day...")
-    if budget_preference:
-        print(f"Budget preference: {budget_preference}")
-    print("=" * 50)
+    stays = coalesce_stays(days_map)
+    _log_stays(stays)
 
-    for day_key, day_info in days_map.items():
+    all_hotels_data = {}
+    for stay in stays:
         try:
-            # Validate day_info structure
-            if not isinstance(day_info, dict):
-                print(f"Warning: {day_key} data is not a dictionary. Skipping.")
-                continue
-
-            checkin = day_info.get("HOTEL_CHECKIN")
-            checkout = day_info.get("HOTEL_CHECKOUT")
-            destination = day_info.get("HOTEL_DESTINATION")
-
-            # Validate required fields
-            if not all([checkin, checkout, destination]):
-                print(f"Warning: Missing hotel data for {day_key}. Skipping.")
-                print(
-                    f"  Check-in: {checkin}, Check-out: {checkout}, Destination: {destination}"
-                )
-                continue
+            hotels = get_hotels_by_budget(
+                stay["checkin"], stay["checkout"], stay["destination"], budget_preference
+            )
+            result = _stay_result(stay, hotels)
+        except Exception as e:
+            logger.error("Error processing stay in %s: %s", stay["destination"], e)
+            result = _stay_result(stay, [], error=str(e))
+        for day_key in stay["days"]:
+            all_hotels_data[day_key] = result.copy()
+
+    logger.info(
+        "Hotel processing completed: %d days with %d unique stays",
+        len(all_hotels_data),
+        len(stays),
+    )
+
+    return all_hotels_data
+
+
+class HotelStayLookup:
+    """Hotel searches that start as soon as each stay is known.
+
+    Feed days with `add_day` while the trip planner is still streaming;
+    consecutive days are merged as in `coalesce_stays` and each completed
+    stay is searched right away, at most `concurrency` at a time (defaults
+    to `settings.HOTEL_LOOKUP_CONCURRENCY`). `results` then waits for the
+    rest.
+    """
+
+    def __init__(self, budget_preference=None, concurrency=None):
+        self.budget_preference = budget_preference
+        self._semaphore = asyncio.Semaphore(
+            concurrency or settings.HOTEL_LOOKUP_CONCURRENCY
+        )
+        self._reset()
+
+    def _reset(self):
+        self._coalescer = StayCoalescer()
+        self._seen = []
+        self._lookups = []
 
-            # Create a unique stay identifier to avoid duplicate API calls
-            stay_key = f"{destination}_{checkin}_{checkout}"
+    @property
+    def stay_count(self):
+        return len(self._lookups)
 
-            if stay_key in processed_stays:
-                print(
-                    f"Skipping {day_key} - already processed stay in {destination} ({checkin} to {checkout})"
+    def add_day(self, day_key, day_info):
+        self._seen.append((day_key, day_info))
+        for stay in self._coalescer.add(day_key, day_info):
+            self._start(stay)
+
+    def _start(self, stay):
+        _log_stays([stay])
+        self._lookups.append((stay, asyncio.ensure_future(self._lookup(stay))))
+
+    async def _lookup(self, stay):
+        async with self._semaphore:
+            try:
+                hotels = await async_get_hotels_by_budget(
+                    stay["checkin"],
+                    stay["checkout"],
+                    stay["destination"],
+                    self.budget_preference,
                 )
-                # Copy hotel data from the first day with same stay details
-                for existing_day, existing_data in all_hotels_data.items():
-                    if (
-                        existing_data.get("destination") == destination
-                        and existing_data.get("checkin") == checkin
-                        and existing_data.get("checkout") == checkout
-                    ):
-                        all_hotels_data[day_key] = existing_data.copy()
-                        break
-                continue
-
-            # Get hotel data for this stay
-            hotels = get_hotels_by_budget(
-                checkin, checkout, destination, budget_preference
-            )
+                return _stay_result(stay, hotels)
+            except Exception as e:
+                logger.error("Error processing stay in %s: %s", stay["destination"], e)
+                return _stay_result(stay, [], error=str(e))
+
+    def cancel(self):
+        for _, task in self._lookups:
+            task.cancel()
+
+    async def results(self, days_map):
+        """Hotel details for each day of the final `days_map`, in its order.
+
+        Days that were never streamed in are added now. If the streamed days
+        differ from `days_map`, the stays are rebuilt from `days_map`; the
+        hotel cache still serves searches that already ran.
+        """
+        days_map = days_map or {}
+        streamed = dict(self._seen)
+        if any(
+            key in streamed and streamed[key] != info for key, info in days_map.items()
+        ):
+            self.cancel()
+            self._reset()
+            streamed = {}
+        for day_key, day_info in days_map.items():
+            if day_key not in streamed:
+                self.add_day(day_key, day_info)
+        for stay in self._coalescer.finish():
+            self._start(stay)
+
+        results = await asyncio.gather(*(task for _, task in self._lookups))
+
+        # Map stay results back onto days, in the original order
+        day_results = {
+            day_key: result
+            for (stay, _), result in zip(self._lookups, results)
+            for day_key in stay["days"]
+        }
+        return {
+            day_key: day_results[day_key].copy()
+            for day_key in days_map
+            if day_key in day_results
+        }
+
+
+@track("process_days_hotels")
+async def async_process_days_hotels(
+    days_map, budget_preference=None, concurrency=None, lookup=None
+):
+    """Non-blocking `process_days_hotels`.
 
-            # Store the results
-            all_hotels_data[day_key] = {
-                "destination": destination,
-                "checkin": checkin,
-                "checkout": checkout,
-                "hotels": hotels,
-                "hotel_count": len(hotels),
-            }
+    Stays are searched concurrently, at most `concurrency` at a time
+    (defaults to `settings.HOTEL_LOOKUP_CONCURRENCY`). The returned dict keeps
+    the day order of `days_map`. Pass the `HotelStayLookup` that was fed
+    while the itinerary streamed in to reuse the searches it already started.
+    """
+    if not days_map:
+        logger.debug("No days data provided.")
+        if lookup is not None:
+            lookup.cancel()
+        return {}
 
-            processed_stays.add(stay_key)
+    logger.debug("Processing hotel search for each day, budget %s", budget_preference)
 
-        except Exception as e:
-            print(f"Error processing {day_key}: {e}")
-            all_hotels_data[day_key] = {
-                "destination": day_info.get("HOTEL_DESTINATION", "Unknown"),
-                "checkin": day_info.get("HOTEL_CHECKIN", "Unknown"),
-                "checkout": day_info.get("HOTEL_CHECKOUT", "Unknown"),
-                "hotels": [],
-                "hotel_count": 0,
-                "error": str(e),
-            }
+    lookup = lookup or HotelStayLookup(budget_preference, concurrency)
+    all_hotels_data = await lookup.results(days_map)
 
-    print("\n" + "=" * 50)
-    print("Hotel processing completed!")
-    print(
-        f"Processed {len(all_hotels_data)} days with {len(processed_stays)} unique stays."
+    logger.info(
+        "Hotel processing completed: %d days with %d unique stays",
+        len(all_hotels_data),
+        lookup.stay_count,
     )
 
     return all_hotels_data
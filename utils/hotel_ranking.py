@@ -0,0 +1,162 @@
+import re
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+BUDGET_WORDS = ("budget", "cheap", "affordable", "low cost", "economical")
+LUXURY_WORDS = (
+    "luxury",
+    "premium",
+    "high-end",
+    "expensive",
+    "5 star",
+    "five star",
+)
+MID_WORDS = ("mid", "medium", "moderate", "average")
+MAX_PRICE_WORDS = ("under", "less than", "below", "maximum", "max", "up to")
+
+# Price percentile band kept per tier, and (price, stars, distance) weights
+# for the value score within it
+TIERS = {
+    "budget": ((0.0, 60.0), (0.6, 0.25, 0.15)),
+    "mid": ((20.0, 80.0), (0.35, 0.45, 0.2)),
+    "luxury": ((60.0, 100.0), (0.1, 0.7, 0.2)),
+    "any": ((0.0, 100.0), (0.4, 0.4, 0.2)),
+}
+
+
+def parse_budget_preference(budget_preference: Optional[str]):
+    """Map free text to (tier, max_price): "under 100" → ("any", 100.0)."""
+    text = (budget_preference or "").lower()
+    if any(word in text for word in BUDGET_WORDS):
+        return "budget", None
+    if any(word in text for word in LUXURY_WORDS):
+        return "luxury", None
+    if any(word in text for word in MID_WORDS):
+        return "mid", None
+    if any(word in text for word in MAX_PRICE_WORDS):
+        m = re.search(r"\d+(?:\.\d+)?", text)
+        if m:
+            return "any", float(m.group(0))
+    return "any", None
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _haversine_km(lat, lon, lat0, lon0):
+    lat, lon, lat0, lon0 = map(np.radians, (lat, lon, lat0, lon0))
+    a = (
+        np.sin((lat - lat0) / 2) ** 2
+        + np.cos(lat) * np.cos(lat0) * np.sin((lon - lon0) / 2) ** 2
+    )
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+
+class HotelTable:
+    """Columnar view of hotel search rows: price, stars and distance (km).
+
+    Missing values are NaN. When the provider does not report a distance,
+    it is measured from the median position of the candidate set, which
+    stands in for the centre of the searched area.
+    """
+
+    __slots__ = ("price", "stars", "distance")
+
+    def __init__(self, price, stars, distance):
+        self.price = np.asarray(price, dtype=np.float64)
+        self.stars = np.asarray(stars, dtype=np.float64)
+        self.distance = np.asarray(distance, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict]) -> "HotelTable":
+        """Build from Hotellook `cache.json` rows."""
+        n = len(rows)
+        def column(field):
+            return np.fromiter((_number(r.get(field)) for r in rows), np.float64, n)
+
+        price = column("priceFrom")
+        stars = column("stars")
+        distance = column("distance")
+        if n and np.isnan(distance).all():
+            geo = [((r.get("location") or {}).get("geo") or {}) for r in rows]
+            lat = np.fromiter((_number(g.get("lat")) for g in geo), np.float64, n)
+            lon = np.fromiter((_number(g.get("lon")) for g in geo), np.float64, n)
+            known = ~(np.isnan(lat) | np.isnan(lon))
+            if known.any():
+                distance = _haversine_km(
+                    lat, lon, np.median(lat[known]), np.median(lon[known])
+                )
+        return cls(price, stars, distance)
+
+
+def _percentile_rank(values: np.ndarray) -> np.ndarray:
+    """0-100 rank of each value among the non-NaN values; ties share a rank."""
+    pct = np.full(values.shape, np.nan)
+    known = ~np.isnan(values)
+    count = int(known.sum())
+    if count:
+        ordered = np.sort(values[known])
+        below = np.searchsorted(ordered, values[known], side="left")
+        pct[known] = 100.0 * below / max(count - 1, 1)
+    return pct
+
+
+def rank_hotels(
+    rows: Sequence[dict], budget_preference: Optional[str] = None, k: int = 5
+) -> list:
+    """Indices of the best `k` rows for the budget preference, best first.
+
+    Priced hotels are kept within the tier's price percentile band (or under
+    the stated maximum) and ordered by a value score of cheapness, stars and
+    closeness. Ties fall back to price, then the provider's order, so the
+    result is deterministic. Hotels without a price are only considered when
+    none have one.
+    """
+    table = rows if isinstance(rows, HotelTable) else HotelTable.from_rows(rows)
+    n = len(table)
+    if n == 0 or k <= 0:
+        return []
+
+    tier, max_price = parse_budget_preference(budget_preference)
+    (low, high), (w_price, w_stars, w_distance) = TIERS[tier]
+
+    priced = ~np.isnan(table.price) & (table.price > 0)
+    price_pct = _percentile_rank(np.where(priced, table.price, np.nan))
+    if not priced.any():
+        candidates = np.ones(n, dtype=bool)
+    elif max_price is not None:
+        candidates = priced & (table.price <= max_price)
+    else:
+        candidates = priced & (price_pct >= low) & (price_pct <= high)
+        if not candidates.any():
+            candidates = priced
+
+    if not candidates.any():
+        return []
+
+    price_score = 1.0 - np.nan_to_num(price_pct, nan=100.0) / 100
+    star_score = np.nan_to_num(table.stars, nan=0.0).clip(0, 5) / 5
+    distance_score = (
+        1.0 - np.nan_to_num(_percentile_rank(table.distance), nan=50.0) / 100
+    )
+    score = w_price * price_score + w_stars * star_score + w_distance * distance_score
+    score = np.where(candidates, score, -np.inf)
+
+    k = min(k, int(candidates.sum()))
+    top = np.argpartition(-score, k - 1)[:k]
+    # Widen to every row tied with the k-th score so ties break on price and
+    # provider order rather than partition order
+    top = np.flatnonzero(score >= score[top].min())
+    # lexsort keys are least-significant first: provider order, price, score
+    price_key = np.nan_to_num(table.price[top], nan=np.inf)
+    order = np.lexsort((top, price_key, -score[top]))
+    return [int(i) for i in top[order][:k]]
@@ -0,0 +1,212 @@
+import re
+from typing import Iterable, Iterator, Union
+
+
+class Node:
+    """One rendered block of an itinerary; `content` is ReportLab markup."""
+
+    __slots__ = ("content",)
+    kind = "node"
+
+    def __init__(self, content: str):
+        self.content = content
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, s) == getattr(other, s) for s in _all_slots(type(self))
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{s}={getattr(self, s)!r}" for s in _all_slots(type(self)))
+        return f"{type(self).__name__}({fields})"
+
+
+class Section(Node):
+    __slots__ = ()
+    kind = "section"
+
+
+class Day(Node):
+    __slots__ = ()
+    kind = "day"
+
+
+class TimeOfDay(Node):
+    """A Morning/Afternoon/Evening line; `period` is the lowercase label."""
+
+    __slots__ = ("period",)
+    kind = "time_of_day"
+
+    def __init__(self, period: str, content: str):
+        super().__init__(content)
+        self.period = period
+
+
+class Link(Node):
+    __slots__ = ()
+    kind = "link"
+
+
+class Stay(Node):
+    __slots__ = ()
+    kind = "stay"
+
+
+class Activity(Node):
+    __slots__ = ()
+    kind = "activity"
+
+
+def _all_slots(cls) -> tuple:
+    return tuple(s for c in reversed(cls.__mro__) for s in c.__dict__.get("__slots__", ()))
+
+
+FLIGHT_SECTION = "✈️ FLIGHT INFORMATION"
+PERIODS = ("morning", "afternoon", "evening")
+HOTEL_LINK_WORDS = ("hotel", "resort", "spa", "albar", "diamond", "maison", "booking")
+MIN_ACTIVITY_LENGTH = 15  # shorter free-text lines are usually stray labels
+
+# "**" opens bold text rather than a double bullet
+_PREFIX_RE = re.compile(r"^(?:(?:[-•]|\*(?!\*))\s*){1,3}|^Booking:\s*")
+_BOOKING_PREFIX_RE = re.compile(r"^Booking:\s*")
+_DAY_RE = re.compile(r"^(?:\*\*)?Day ")
+# "Morning:", "🌅 Morning:", "**Evening:**"
+_PERIOD_LABEL_RE = re.compile(
+    r"^[\W_]*(?:morning|afternoon|evening)\s*:\s*(?:\*\*)?\s*", re.IGNORECASE
+)
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_URL_RE = re.compile(r"https?://[^\s\)\]\}]+")
+
+_FLIGHT_COLOR = "#e74c3c"
+_HOTEL_COLOR = "#27ae60"
+_LINK_COLOR = "#3498db"
+
+
+def _anchor(url: str, display_text: str, color: str) -> str:
+    # ReportLab's paragraph markup only needs bare ampersands escaped
+    safe_url = url.replace("&", "&amp;")
+    return f'<a href="{safe_url}" color="{color}"><u><b>{display_text}</b></u></a>'
+
+
+def _replace_md_link(match) -> str:
+    link_text, url = match.group(1), match.group(2)
+    lower = link_text.lower()
+    if "flight" in lower or "aviasales" in url.lower():
+        return _anchor(url, "✈️ Book Flight", _FLIGHT_COLOR)
+    if any(word in lower for word in HOTEL_LINK_WORDS):
+        return _anchor(url, f"🏨 {link_text}", _HOTEL_COLOR)
+    return _anchor(url, link_text, _LINK_COLOR)
+
+
+def _replace_url(match) -> str:
+    url = match.group(0)
+    if "aviasales" in url:
+        return _anchor(url, "✈️ Book Flight", _FLIGHT_COLOR)
+    if "booking.com" in url or "hotel" in url.lower():
+        return _anchor(url, "🏨 Book Hotel", _HOTEL_COLOR)
+    return _anchor(url, "🔗 Visit Link", _LINK_COLOR)
+
+
+def _strip_prefix(text: str) -> str:
+    """Drop leading bullets (up to three) followed by an optional "Booking:"."""
+    m = _PREFIX_RE.match(text)
+    if m:
+        text = _BOOKING_PREFIX_RE.sub("", text[m.end():], count=1)
+    return text
+
+
+def format_inline(text: str) -> str:
+    """Markdown bold, links and bare URLs → ReportLab paragraph markup."""
+    text = _strip_prefix(text.strip()).strip()
+    if not text:
+        return ""
+
+    text = _BOLD_RE.sub(r"<b>\1</b>", text)
+    if "<a href=" in text:
+        return text
+
+    text, n = _MD_LINK_RE.subn(_replace_md_link, text)
+    if not n:
+        text = _URL_RE.sub(_replace_url, text)
+    return text
+
+
+def tokenize_itinerary(lines: Union[str, Iterable[str]]) -> Iterator[Node]:
+    """Classify itinerary markdown into typed nodes in a single pass.
+
+    `lines` may be the whole text or any iterable of lines (an open file, a
+    generator over a streamed response), so long itineraries are consumed
+    lazily. Repeated links and free-text activities are dropped once per
+    day: the set of seen content resets at each "Day N" header.
+    """
+    if isinstance(lines, str):
+        lines = lines.split("\n")
+
+    seen = set()
+    since_booking = 2  # nodes emitted since one mentioning "booking"
+
+    def emit(node):
+        nonlocal since_booking
+        since_booking = 0 if "booking" in node.content.lower() else since_booking + 1
+        return node
+
+    for raw in lines:
+        original = raw.strip()
+        if not original:
+            continue
+        line = _strip_prefix(original)
+        if not line.strip():
+            continue
+        lower = line.lower()
+
+        if "Flight Details:" in original or (
+            "flight" in lower and ("book" in lower or "https://" in line)
+        ):
+            yield emit(Section(FLIGHT_SECTION))
+            content = format_inline(line.replace("Flight Details:", ""))
+            if content and "book" in content.lower() and content not in seen:
+                seen.add(content)
+                yield emit(Link(content))
+            continue
+
+        if _DAY_RE.match(line) and (":" in line or "—" in line):
+            seen.clear()
+            yield emit(Day(format_inline(line)))
+            continue
+
+        period = next(
+            (p for p in PERIODS if p in lower and (":" in line or lower.startswith(p))),
+            None,
+        )
+        if period is not None:
+            label = _PERIOD_LABEL_RE.match(line)
+            if label:
+                content = format_inline(line[label.end():])
+            else:
+                content = format_inline(line.replace(f"{period.capitalize()}:", ""))
+            if content:
+                yield emit(TimeOfDay(period, content))
+            continue
+
+        if "https://" in line and ("booking" in original.lower() or "book" in lower):
+            content = format_inline(line)
+            if content and content not in seen:
+                seen.add(content)
+                yield emit(Link(content))
+            continue
+
+        if "overnight" in lower or "stay" in lower:
+            content = format_inline(line)
+            if content:
+                yield emit(Stay(content))
+            continue
+
+        content = format_inline(line)
+        if (
+            len(content) > MIN_ACTIVITY_LENGTH
+            and since_booking >= 2
+            and content not in seen
+        ):
+            seen.add(content)
+            yield emit(Activity(content))
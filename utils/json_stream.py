@@ -0,0 +1,87 @@
+import json
+from typing import List, Tuple
+
+
+class ObjectEntryStream:
+    """Incrementally pick entries of one top-level JSON field out of a stream.
+
+    Feed it the text of a JSON object as it arrives, e.g. the trip planner's
+    `{"response": "...", "days": {"Day 1": {...}, ...}}`. Each container
+    entry of `field` (`"Day 1": {...}`) is returned as soon as its closing
+    brace arrives, without waiting for the rest of the document. Text
+    before the root object (a ```json fence) and after it is ignored.
+    Scalar entries are skipped; malformed entries end the stream silently,
+    leaving the caller's final `json.loads` to report the error.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self._text = ""
+        self._pos = 0
+        # One frame per open container: [is_object, key, is_field, expect_key]
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._entry_start = None
+        self._entry_key = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        """Consume `chunk`; return `(key, value)` for entries completed by it."""
+        entries = []
+        if self._done or not chunk:
+            return entries
+        self._text += chunk
+        text, stack = self._text, self._stack
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    top = stack[-1]
+                    if top[0] and top[3]:
+                        top[1] = json.loads(text[self._string_start : i + 1])
+                continue
+
+            if not stack:
+                if c == "{":
+                    stack.append([True, None, False, True])
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                top = stack[-1]
+                in_field = top[2] and not top[3]
+                if in_field and self._entry_start is None:
+                    self._entry_start, self._entry_key = i, top[1]
+                is_field = len(stack) == 1 and c == "{" and top[1] == self.field
+                stack.append([c == "{", None, is_field, c == "{"])
+            elif c in "}]":
+                stack.pop()
+                if not stack:
+                    self._done = True
+                    break
+                if stack[-1][2] and self._entry_start is not None:
+                    raw = text[self._entry_start : i + 1]
+                    self._entry_start = None
+                    try:
+                        value = json.loads(raw)
+                    except ValueError:
+                        self._done = True
+                        break
+                    entries.append((self._entry_key, value))
+            elif c == ":":
+                stack[-1][3] = False
+            elif c == ",":
+                if stack[-1][0]:
+                    stack[-1][3] = True
+        self._pos = len(text)
+        return entries
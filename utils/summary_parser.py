@@ -0,0 +1,235 @@
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+from utils.airport_index import resolve_iata
+
+
+SUMMARY_FIELDS = {
+    "destination": "Destination",
+    "duration": "Duration",
+    "dates": "Dates",
+    "preferences": "Preferences",
+    "flight_needs": "Flight Needs",
+    "origin": "Origin",
+    "hotel_needs": "Hotel Needs",
+    "special_requirements": "Special Requirements",
+}
+
+_LABEL_RE = re.compile(
+    r"\b(" + "|".join(re.escape(label) for label in SUMMARY_FIELDS.values()) + r")\s*:",
+    re.IGNORECASE,
+)
+_FIELD_BY_LABEL = {label.lower(): field for field, label in SUMMARY_FIELDS.items()}
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20,
+    "twenty-one": 21, "thirty": 30,
+}
+
+_MONTH = r"(?:" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\b\.?"
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_YEAR = r"\d{4}"
+_TO = r"\s*(?:-|–|—|to|until|till|through)\s*"
+
+_DATE_RE = re.compile(
+    "|".join(
+        [
+            # 2025-09-10
+            rf"(?P<iso>(?P<iso_y>{_YEAR})-(?P<iso_m>\d{{1,2}})-(?P<iso_d>\d{{1,2}}))",
+            # 10/09/2025 (day first)
+            rf"(?P<num>(?P<num_d>\d{{1,2}})[/.](?P<num_m>\d{{1,2}})[/.](?P<num_y>\d{{4}}))",
+            # 10-15 September [2025]
+            rf"(?P<dr>(?P<dr_d1>{_DAY}){_TO}(?P<dr_d2>{_DAY})\s+(?:of\s+)?(?P<dr_m>{_MONTH})(?:,?\s*(?P<dr_y>{_YEAR}))?)",
+            # September 10-15[, 2025]
+            rf"(?P<mr>(?P<mr_m>{_MONTH})\s+(?P<mr_d1>{_DAY}){_TO}(?P<mr_d2>{_DAY})\b(?:,?\s*(?P<mr_y>{_YEAR}))?)",
+            # 10 September [2025]
+            rf"(?P<dm>(?P<dm_d>{_DAY})\s+(?:of\s+)?(?P<dm_m>{_MONTH})(?:,?\s*(?P<dm_y>{_YEAR}))?)",
+            # September 10[, 2025]
+            rf"(?P<md>(?P<md_m>{_MONTH})\s+(?P<md_d>{_DAY})\b(?:,?\s*(?P<md_y>{_YEAR}))?)",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+_DURATION_RE = re.compile(
+    r"\b(?P<n>\d+|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")"
+    r"[\s-]*(?P<unit>days?|nights?|weeks?)\b",
+    re.IGNORECASE,
+)
+_FORTNIGHT_RE = re.compile(r"\bfortnight\b", re.IGNORECASE)
+
+_NOT_APPLICABLE = {"", "n/a", "na", "none", "not applicable", "-", "no"}
+
+
+def parse_summary_fields(summary: str) -> dict:
+    """Split a "Summary: ..." line into its labelled fields.
+
+    Values may contain commas (e.g. "Kandy, Sri Lanka"); a field runs until
+    the next known label. Unknown/missing fields are absent from the result.
+    """
+    text = summary.strip()
+    if text.lower().startswith("summary:"):
+        text = text[len("summary:") :]
+
+    matches = list(_LABEL_RE.finditer(text))
+    fields = {}
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        value = text[m.end() : end].strip().strip(",;.").strip()
+        fields[_FIELD_BY_LABEL[m.group(1).lower()]] = value
+    return fields
+
+
+def parse_duration_days(text: str) -> Optional[int]:
+    """"5 days" → 5, "7 nights" → 7, "two weeks" → 14, "a fortnight" → 14."""
+    if not text:
+        return None
+    if _FORTNIGHT_RE.search(text):
+        return 14
+    m = _DURATION_RE.search(text)
+    if not m:
+        return int(text) if text.strip().isdigit() else None
+    raw = m.group("n").lower()
+    n = int(raw) if raw.isdigit() else NUMBER_WORDS[raw]
+    return n * 7 if m.group("unit").lower().startswith("week") else n
+
+
+def _int_day(value: str) -> int:
+    return int(re.match(r"\d+", value).group(0))
+
+
+def _month(value: str) -> int:
+    return MONTHS[value.lower().rstrip(".")]
+
+
+def _date_parts(text: str) -> list:
+    """All (day, month, year-or-None) mentions in `text`, in order."""
+    parts = []
+    for m in _DATE_RE.finditer(text):
+        g = m.groupdict()
+        if g["iso"]:
+            parts.append((int(g["iso_d"]), int(g["iso_m"]), int(g["iso_y"])))
+        elif g["num"]:
+            parts.append((int(g["num_d"]), int(g["num_m"]), int(g["num_y"])))
+        elif g["dr"]:
+            month, year = _month(g["dr_m"]), g["dr_y"] and int(g["dr_y"])
+            parts.append((_int_day(g["dr_d1"]), month, year))
+            parts.append((_int_day(g["dr_d2"]), month, year))
+        elif g["mr"]:
+            month, year = _month(g["mr_m"]), g["mr_y"] and int(g["mr_y"])
+            parts.append((_int_day(g["mr_d1"]), month, year))
+            parts.append((_int_day(g["mr_d2"]), month, year))
+        elif g["dm"]:
+            parts.append((_int_day(g["dm_d"]), _month(g["dm_m"]), g["dm_y"] and int(g["dm_y"])))
+        elif g["md"]:
+            parts.append((_int_day(g["md_d"]), _month(g["md_m"]), g["md_y"] and int(g["md_y"])))
+    return parts
+
+
+def parse_trip_dates(
+    dates: str, duration_days: Optional[int] = None, today: Optional[date] = None
+) -> tuple:
+    """Resolve the Dates field to `(depart, return)` dates.
+
+    - Without a year, the current year is assumed, or next year if the date
+      has already passed. Explicit past years roll forward to the current
+      year, as `normalize_params` does.
+    - Without a second date, return = depart + duration_days.
+    - A return date before departure is moved into the following year.
+
+    Either value may be None if it cannot be determined.
+    """
+    today = today or date.today()
+    parts = _date_parts(dates or "")
+    if not parts:
+        return None, None
+
+    # "Sep 10 - Sep 15, 2025": a trailing year applies to earlier dates too
+    resolved = []
+    next_year = None
+    for day, month, year in reversed(parts[:2]):
+        year = year or next_year
+        next_year = year
+        resolved.append((day, month, year))
+    resolved.reverse()
+
+    def _to_date(day, month, year):
+        if year is None:
+            candidate = date(today.year, month, day)
+            return candidate if candidate >= today else candidate.replace(year=today.year + 1)
+        if year < today.year:
+            year = today.year
+        return date(year, month, day)
+
+    try:
+        depart = _to_date(*resolved[0])
+        if len(resolved) > 1:
+            ret = _to_date(*resolved[1])
+            if resolved[1][2] is None and resolved[0][2] is not None:
+                ret = ret.replace(year=depart.year)
+            if ret < depart:
+                ret = ret.replace(year=depart.year + 1)
+        elif duration_days:
+            ret = depart + timedelta(days=duration_days)
+        else:
+            ret = None
+    except ValueError:  # e.g. 31 September
+        return None, None
+    return depart, ret
+
+
+def _is_yes(value: str) -> bool:
+    return value.strip().lower().startswith(("y", "true"))
+
+
+def parse_summary(summary: str, today: Optional[date] = None) -> Optional[dict]:
+    """Parse a "Summary: ..." line into FLIGHT_* params without the LLM.
+
+    The chat assistant is instructed to emit exactly
+    "Summary: Destination: [destination], Duration: [duration], Dates: [dates],
+    Preferences: [...], Flight Needs: [yes/no], Origin: [origin], Hotel Needs:
+    [yes/no], Special Requirements: [...]".
+
+    Returns the same keys as `extract_params_with_llm`, or None when the
+    line does not follow the expected grammar or a required value (dates,
+    or airports when flights are needed) cannot be resolved.
+    """
+    if not summary or "summary:" not in summary.lower():
+        return None
+    fields = parse_summary_fields(summary)
+    if "destination" not in fields or "dates" not in fields:
+        return None
+
+    duration_days = parse_duration_days(fields.get("duration", ""))
+    depart, ret = parse_trip_dates(fields["dates"], duration_days, today=today)
+    if depart is None:
+        return None
+
+    flight_needed = _is_yes(fields.get("flight_needs", "yes"))
+    origin = fields.get("origin", "")
+    origin_code = ""
+    destination_code = resolve_iata(fields["destination"])
+    if flight_needed:
+        if origin.strip().lower() in _NOT_APPLICABLE:
+            return None
+        origin_code = resolve_iata(origin)
+        if not origin_code or not destination_code:
+            return None
+
+    return {
+        "FLIGHT_ORIGIN": origin_code,
+        "FLIGHT_DESTINATION": destination_code,
+        "FLIGHT_DEPART_DATE": depart.isoformat(),
+        "FLIGHT_RETURN_DATE": ret.isoformat() if ret else "",
+    }